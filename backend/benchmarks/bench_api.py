@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the API
+Boots server.py under uvicorn in a child process against a throwaway
+database seeded with --tools generated tools. The database is a local
+mongod, or mongomock-motor with --mongo memory. The benchmark then drives the
+public and admin endpoints with a fixed, seeded request mix and reports
+throughput and latency percentiles per endpoint as JSON, so runs on
+different commits can be compared (see compare.py).
+
+Usage:
+    python benchmarks/bench_api.py --tools 5000 --concurrency 32 --duration 30 --output bench_api.json
+    python benchmarks/bench_api.py --mongo memory      # no mongod needed (pip install mongomock-motor)
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+from sync_metrics import percentile
+from catalog_generator import CATEGORIES, insert_catalog, tool_id
+
+DEFAULT_MONGO_URL = "mongodb://localhost:27017"
+DEFAULT_DB_NAME = "aitools_bench_api"
+MEMORY = 'memory'
+SEED = 42  # catalog seed: the workload derives tool ids from it
+
+SEARCH_TERMS = ['gpt', 'image', 'writer', 'video', 'code', 'voice', 'seo', 'chat', 'zzz-no-match']
+
+# Request mix (weights): what the homepage and tool pages actually call
+MIX = {
+    'list': 30,            # /tools first page, default sort
+    'search': 12,          # /tools?search=
+    'category': 18,        # /tools?category=
+    'deep_page': 8,        # /tools?page=N (pagination depth)
+    'detail': 20,          # /tools/{id}
+    'featured': 6,         # /tools/featured
+    'categories': 4,       # /categories
+    'admin_stats': 1,      # /admin/stats
+    'admin_sync_status': 1,
+}
+
+
+class Workload:
+    """Seeded request generator following MIX"""
+
+    def __init__(self, tool_count, rng=None):
+        self.rng = rng or random.Random(SEED)
+        self.tool_count = tool_count
+        self.names = list(MIX)
+        self.weights = [MIX[name] for name in self.names]
+
+    def next(self):
+        """(endpoint name, path, needs admin token)"""
+        rng = self.rng
+        name = rng.choices(self.names, self.weights)[0]
+        if name == 'list':
+            return name, '/api/tools?page=1&page_size=60', False
+        if name == 'search':
+            return name, f'/api/tools?search={rng.choice(SEARCH_TERMS)}&page_size=60', False
+        if name == 'category':
+            return name, f'/api/tools?category={rng.choice(CATEGORIES).replace(" ", "%20")}&page_size=60', False
+        if name == 'deep_page':
+            last_page = max(1, self.tool_count // 60)
+            return name, f'/api/tools?page={rng.randint(2, max(2, last_page))}&page_size=60', False
+        if name == 'detail':
+            return name, f'/api/tools/{tool_id(SEED, rng.randrange(max(1, self.tool_count)))}', False
+        if name == 'featured':
+            return name, '/api/tools/featured', False
+        if name == 'categories':
+            return name, '/api/categories', False
+        if name == 'admin_stats':
+            return name, '/api/admin/stats', True
+        return name, '/api/admin/sync-status', True
+
+
+def summarize(samples, errors, duration):
+    """{requests, errors, throughput_rps, p50_ms, p90_ms, p99_ms, max_ms, db_calls_avg}"""
+    latencies = [sample['ms'] for sample in samples]
+    db_calls = [sample['db_calls'] for sample in samples if sample['db_calls'] is not None]
+    result = {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(samples) / duration, 1) if duration else 0.0,
+    }
+    if latencies:
+        for pct in (50, 90, 99):
+            result[f'p{pct}_ms'] = round(percentile(latencies, pct), 2)
+        result['max_ms'] = round(max(latencies), 2)
+    if db_calls:
+        result['db_calls_avg'] = round(sum(db_calls) / len(db_calls), 2)
+    return result
+
+
+async def drive(base_url, token, workload, concurrency, duration, warmup):
+    """Closed-loop load: concurrency clients, each sending its next request as soon as one returns"""
+    import aiohttp
+    from request_timing import parse_server_timing
+
+    samples = {name: [] for name in MIX}
+    errors = {name: 0 for name in MIX}
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async def client(session):
+        while time.perf_counter() < deadline:
+            name, path, admin = workload.next()
+            sent = time.perf_counter()
+            try:
+                async with session.get(base_url + path, headers=headers if admin else None) as response:
+                    await response.read()
+                    ok = response.status < 400 or (name == 'detail' and response.status == 404)
+                    timing = response.headers.get('Server-Timing')
+            except aiohttp.ClientError:
+                ok, timing = False, None
+            if sent < measure_from:
+                continue
+            if not ok:
+                errors[name] += 1
+                continue
+            db = parse_server_timing(timing).get('db', {}).get('desc') if timing else None
+            samples[name].append({
+                'ms': (time.perf_counter() - sent) * 1000,
+                'db_calls': int(db.split()[0]) if db else None,
+            })
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+
+    measured = time.perf_counter() - measure_from
+    all_samples = [sample for endpoint in samples.values() for sample in endpoint]
+    return {
+        'overall': summarize(all_samples, sum(errors.values()), measured),
+        'endpoints': {name: summarize(samples[name], errors[name], measured) for name in MIX if samples[name] or errors[name]},
+    }
+
+
+def serve(args):
+    """Child process: seed the database, then run the API under uvicorn"""
+    import uvicorn
+    import database
+
+    if args.mongo == MEMORY:
+        from mongomock_motor import AsyncMongoMockClient
+        database._client = AsyncMongoMockClient()  # stays for uvicorn: the data lives in this process
+        asyncio.run(insert_catalog(database.get_db(), args.tools, seed=SEED, pages=0))
+    else:
+        asyncio.run(insert_catalog(database.get_db(), args.tools, seed=SEED, pages=0))
+        database.close_client()  # the API opens its own pool on its own event loop
+
+    from server import app
+    uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning', access_log=False)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(base_url, process, timeout=120):
+    import aiohttp
+
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"API process exited with {process.returncode}")
+            try:
+                async with session.get(base_url + '/api/') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise SystemExit("API did not start in time")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def drop_database(args):
+    if args.mongo == MEMORY:
+        return
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(args.mongo)
+    await client.drop_database(args.db_name)
+    client.close()
+
+
+def run(args):
+    from auth import create_access_token
+
+    port = args.port or free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    command = [sys.executable, os.path.abspath(__file__), 'serve', '--port', str(port),
+               '--tools', str(args.tools), '--mongo', args.mongo, '--db-name', args.db_name]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+    try:
+        asyncio.run(wait_until_up(base_url, process))
+        token = create_access_token({'sub': 'bench'})
+        workload = Workload(args.tools, random.Random(args.seed))
+        results = asyncio.run(drive(base_url, token, workload, args.concurrency, args.duration, args.warmup))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        asyncio.run(drop_database(args))
+    return {
+        'config': {
+            'commit': git_commit(),
+            'tools': args.tools,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'mongo': MEMORY if args.mongo == MEMORY else 'mongod',
+            'seed': args.seed,
+            'mix': MIX,
+        },
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API against a seeded throwaway database")
+    parser.add_argument('mode', nargs='?', default='run', choices=['run', 'serve'])
+    parser.add_argument('--tools', type=int, default=5000, help='tools to seed')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds of load before measuring')
+    parser.add_argument('--seed', type=int, default=SEED, help='request mix seed')
+    parser.add_argument('--mongo', default=os.environ.get('BENCH_MONGO_URL', DEFAULT_MONGO_URL),
+                        help=f"mongod URL, or '{MEMORY}' for the in-memory stand-in")
+    parser.add_argument('--db-name', default=DEFAULT_DB_NAME)
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    # Keep server.py, and everything it imports, off the real database
+    os.environ['MONGO_URL'] = DEFAULT_MONGO_URL if args.mongo == MEMORY else args.mongo
+    os.environ['DB_NAME'] = args.db_name
+    os.environ['ENABLE_SCHEDULER'] = '0'
+    os.environ.setdefault('SECRET_KEY', 'bench-secret')
+
+    if args.mode == 'serve':
+        serve(args)
+        return
+
+    output = json.dumps(run(args), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Scraper benchmark against recorded fixtures (no network)
+Times discovery, extraction and persistence for AIToolsScraper and
+PlaywrightScraper using the replay server from scraper_fixtures.py and a
+throwaway database on a local mongod
+
+Usage:
+    python benchmarks/bench_scrapers.py --repeat 3 --output bench_scrapers.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from statistics import median
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_MONGO_URL = "mongodb://localhost:27017"
+DEFAULT_DB_NAME = "aitools_bench"
+
+
+class Stopwatch:
+    """Accumulates wall time per phase"""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+async def block_external_requests(page, local_url):
+    """Abort anything not served by the fixture server (CDN images, analytics)"""
+    async def handle(route):
+        if route.request.url.startswith(local_url):
+            await route.continue_()
+        else:
+            await route.abort()
+    await page.route('**/*', handle)
+
+
+async def bench_aiohttp(server_url, database):
+    import sync_tools
+    from http_cache import HttpCache
+    from throttle import AdaptiveThrottle
+
+    watch = Stopwatch()
+    async with sync_tools.AIToolsScraper(source_url=server_url, cache=HttpCache(enabled=False),
+                                         database=database) as scraper:
+        scraper.throttle = AdaptiveThrottle(0, min_delay=0)  # local fixtures: no politeness delay
+        with watch.phase('discovery'):
+            tools = await scraper.scrape_tools_list()
+        with watch.phase('persistence'):
+            for tool in tools:
+                await scraper.save_tool_to_db(tool)
+    return {'tools': len(tools), **watch.phases}
+
+
+async def bench_playwright(server_url, database, max_tools):
+    import sync_tools_playwright
+    from http_cache import HttpCache
+    from page_archive import PageArchive
+    from throttle import AdaptiveThrottle
+
+    sync_tools_playwright.MAX_TOOLS_PER_RUN = max_tools
+    watch = Stopwatch()
+    with tempfile.TemporaryDirectory(prefix='bench-archive-') as archive_dir:
+        async with sync_tools_playwright.PlaywrightScraper(source_url=server_url, cache=HttpCache(enabled=False),
+                                                           database=database,
+                                                           archive=PageArchive(archive_dir)) as scraper:
+            scraper.throttle = AdaptiveThrottle(0, min_delay=0)
+            await block_external_requests(scraper.page, server_url)
+            with watch.phase('discovery'):
+                tools = await scraper.discover_tools()
+            with watch.phase('extraction'):
+                for tool in tools:
+                    tool.update(await scraper.extract_tool_details(tool['website_url']))
+            with watch.phase('persistence'):
+                for tool in tools:
+                    await scraper.save_tool_to_db(tool)
+    return {'tools': len(tools), **watch.phases}
+
+
+def summarize(runs):
+    """Median of each timed phase across repeats"""
+    keys = sorted({k for run in runs for k in run if k != 'tools'})
+    result = {'tools': runs[-1]['tools'], 'runs': len(runs)}
+    for key in keys:
+        result[f"{key}_s"] = round(median(run.get(key, 0.0) for run in runs), 4)
+    return result
+
+
+async def run_benchmarks(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from scraper_fixtures import FixtureServer
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    database = client[args.db_name]
+    results = {}
+    try:
+        with FixtureServer(args.fixtures) as server:
+            if not server.manifest['pages']:
+                raise SystemExit(f"No fixtures in {args.fixtures} - run scraper_fixtures.py record first")
+            for name in args.scrapers:
+                runs = []
+                for _ in range(args.repeat):
+                    await database.tools.delete_many({})
+                    if name == 'aiohttp':
+                        runs.append(await bench_aiohttp(server.url, database))
+                    else:
+                        runs.append(await bench_playwright(server.url, database, args.max_tools))
+                results[name] = summarize(runs)
+    finally:
+        from browser_pool import get_browser_pool
+        await get_browser_pool().close()
+        await client.drop_database(args.db_name)
+        client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scrapers against recorded fixtures")
+    parser.add_argument('--fixtures', default=None, help='fixture directory (default: SCRAPER_FIXTURES_DIR)')
+    parser.add_argument('--scrapers', nargs='+', default=['aiohttp', 'playwright'],
+                        choices=['aiohttp', 'playwright'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-tools', type=int, default=20)
+    parser.add_argument('--mongo-url', default=os.environ.get('BENCH_MONGO_URL', DEFAULT_MONGO_URL))
+    parser.add_argument('--db-name', default=DEFAULT_DB_NAME)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    # database.py reads these at import, and anything falling back to the shared client
+    # must land in the throwaway database rather than the real one
+    os.environ['MONGO_URL'] = args.mongo_url
+    os.environ['DB_NAME'] = args.db_name
+    if args.fixtures is None:
+        from scraper_fixtures import FIXTURES_DIR
+        args.fixtures = str(FIXTURES_DIR)
+
+    results = {'scrapers': asyncio.run(run_benchmarks(args))}
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
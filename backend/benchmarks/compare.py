@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Performance regression gate
+Runs the API and scraper benchmarks, or reads existing result files, and
+compares the results with a stored baseline. Each metric kind has a
+tolerance: latencies and phase times may grow, throughput may drop, and DB
+calls per request and error counts must not go up. The exit status is 1 when
+anything regresses, with a table of every change.
+
+Usage:
+    python benchmarks/compare.py run                      # benchmark this commit, compare with baseline.json
+    python benchmarks/compare.py check results.json      # compare a saved result
+    python benchmarks/compare.py run --update-baseline   # accept this commit's numbers
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Tolerances (a baseline file may override them under "tolerances")
+TOLERANCES = {
+    'latency_pct': 15.0,       # *_ms may grow by this much...
+    'latency_floor_ms': 2.0,   # ...or by this many ms, whichever is larger (noise on fast endpoints)
+    'throughput_pct': 10.0,    # throughput_rps may drop by this much
+    'phase_pct': 20.0,         # scraper phase times (*_s)
+    'db_calls': 0.5,           # db_calls_avg may grow by this many round trips
+    'errors': 0,               # errors may grow by this many
+}
+IGNORED = {'requests', 'tools', 'runs'}
+
+# Statuses
+OK = 'ok'
+IMPROVED = 'improved'
+REGRESSED = 'REGRESSED'
+MISSING = 'missing'
+NEW = 'new'
+
+
+def flatten(results, prefix=''):
+    """{'api': {'overall': {'p99_ms': 3}}} -> {'api.overall.p99_ms': 3}; run config is skipped"""
+    flat = {}
+    for key, value in results.items():
+        if key in ('config', 'tolerances'):
+            continue
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in IGNORED:
+            flat[path] = value
+    return flat
+
+
+def judge(metric, base, current, tolerances):
+    """Status of one metric change"""
+    name = metric.rsplit('.', 1)[-1]
+    if name.endswith('_ms'):
+        allowed = max(base * tolerances['latency_pct'] / 100, tolerances['latency_floor_ms'])
+        return REGRESSED if current > base + allowed else IMPROVED if current < base - allowed else OK
+    if name == 'throughput_rps':
+        allowed = base * tolerances['throughput_pct'] / 100
+        return REGRESSED if current < base - allowed else IMPROVED if current > base + allowed else OK
+    if name.endswith('_s'):
+        allowed = base * tolerances['phase_pct'] / 100
+        return REGRESSED if current > base + allowed else IMPROVED if current < base - allowed else OK
+    if name == 'db_calls_avg':
+        allowed = tolerances['db_calls']
+        return REGRESSED if current > base + allowed else IMPROVED if current < base - allowed else OK
+    if name == 'errors':
+        return REGRESSED if current > base + tolerances['errors'] else IMPROVED if current < base else OK
+    return OK
+
+
+def compare(baseline, current, tolerances=None):
+    """Rows {metric, base, current, change_pct, status}, regressions first"""
+    tolerances = {**TOLERANCES, **(baseline.get('tolerances') or {}), **(tolerances or {})}
+    base_flat, current_flat = flatten(baseline), flatten(current)
+    rows = []
+    for metric in sorted(set(base_flat) | set(current_flat)):
+        base, value = base_flat.get(metric), current_flat.get(metric)
+        if value is None:
+            status = MISSING
+        elif base is None:
+            status = NEW
+        else:
+            status = judge(metric, base, value, tolerances)
+        change = round((value - base) / base * 100, 1) if base and value is not None else None
+        rows.append({'metric': metric, 'base': base, 'current': value, 'change_pct': change, 'status': status})
+    order = {REGRESSED: 0, MISSING: 1, IMPROVED: 2, NEW: 3, OK: 4}
+    rows.sort(key=lambda row: (order[row['status']], row['metric']))
+    return rows
+
+
+def format_report(rows, verbose=False):
+    """Readable table; unchanged metrics only with verbose"""
+    shown = [row for row in rows if verbose or row['status'] != OK]
+    if not shown:
+        return f"✅ {len(rows)} metrics within tolerance"
+    width = max(len(row['metric']) for row in shown)
+    lines = [f"{'metric':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}  status"]
+    for row in shown:
+        base = '-' if row['base'] is None else f"{row['base']:.2f}"
+        current = '-' if row['current'] is None else f"{row['current']:.2f}"
+        change = '' if row['change_pct'] is None else f"{row['change_pct']:+.1f}%"
+        lines.append(f"{row['metric']:<{width}}  {base:>10}  {current:>10}  {change:>8}  {row['status']}")
+    regressed = sum(1 for row in rows if row['status'] == REGRESSED)
+    lines.append(f"\n{'❌' if regressed else '✅'} {regressed} regressions in {len(rows)} metrics")
+    return '\n'.join(lines)
+
+
+def _run_json(command):
+    """Run a benchmark script that writes --output JSON; return the parsed result"""
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        output = f.name
+    try:
+        subprocess.run([sys.executable, *command, '--output', output], cwd=os.path.dirname(BENCH_DIR),
+                       check=True, stdout=subprocess.DEVNULL)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.unlink(output)
+
+
+def run_benchmarks(args):
+    """{'api': bench_api result, 'scrapers': bench_scrapers result}"""
+    results = {}
+    if 'api' in args.suites:
+        print("⏱️  Running API benchmark...")
+        results['api'] = _run_json([os.path.join(BENCH_DIR, 'bench_api.py'), '--tools', str(args.tools),
+                                    '--duration', str(args.duration), '--mongo', args.mongo])
+    if 'scrapers' in args.suites:
+        print("⏱️  Running scraper benchmark...")
+        results['scrapers'] = _run_json([os.path.join(BENCH_DIR, 'bench_scrapers.py')])['scrapers']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when benchmarks regress against the baseline")
+    parser.add_argument('mode', choices=['run', 'check'])
+    parser.add_argument('results', nargs='?', help='result JSON to check (check mode)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--suites', nargs='+', default=['api', 'scrapers'], choices=['api', 'scrapers'])
+    parser.add_argument('--tools', type=int, default=5000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--mongo', default=os.environ.get('BENCH_MONGO_URL', 'mongodb://localhost:27017'))
+    parser.add_argument('--update-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--verbose', action='store_true', help='also list metrics within tolerance')
+    args = parser.parse_args()
+
+    if args.mode == 'check':
+        if not args.results:
+            parser.error('check needs a results file')
+        with open(args.results) as f:
+            current = json.load(f)
+    else:
+        current = run_benchmarks(args)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            f.write(json.dumps(current, indent=2, sort_keys=True) + '\n')
+        print(f"📌 Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(baseline, current)
+    print(format_report(rows, args.verbose))
+    return 1 if any(row['status'] == REGRESSED for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
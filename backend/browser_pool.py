@@ -0,0 +1,168 @@
+"""
+Long-lived Chromium shared by Playwright sync runs
+The browser is launched once per process and kept warm between runs; each run
+leases its own browser context, which is recycled after a number of page
+navigations or when Chromium's memory grows past a threshold
+"""
+import asyncio
+import os
+import time
+
+from playwright.async_api import async_playwright
+
+try:
+    import psutil
+except ImportError:  # optional - only needed for memory-based recycling
+    psutil = None
+
+# Configuration
+BROWSER_MAX_PAGES_PER_CONTEXT = int(os.environ.get('BROWSER_MAX_PAGES_PER_CONTEXT', 50))
+BROWSER_MEMORY_LIMIT_MB = int(os.environ.get('BROWSER_MEMORY_LIMIT_MB', 1024))
+BROWSER_HEADLESS = os.environ.get('BROWSER_HEADLESS', '1') != '0'
+
+
+def chromium_rss_mb():
+    """Resident memory of all Chromium processes started by this process, in MB"""
+    if psutil is None:
+        return None
+    total = 0
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                name = child.name().lower()
+                if 'chrom' in name or 'headless_shell' in name:
+                    total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except psutil.Error:
+        return None
+    return round(total / (1024 * 1024), 1)
+
+
+class BrowserPool:
+    """One warm browser, one recyclable context per leased page"""
+
+    def __init__(self, max_pages_per_context=BROWSER_MAX_PAGES_PER_CONTEXT,
+                 memory_limit_mb=BROWSER_MEMORY_LIMIT_MB, headless=BROWSER_HEADLESS):
+        self.max_pages_per_context = max_pages_per_context
+        self.memory_limit_mb = memory_limit_mb
+        self.headless = headless
+        self.playwright = None
+        self.browser = None
+        self._loop = None
+        self._lock = asyncio.Lock()
+        self._navigations = {}  # context -> page navigations served
+        self.stats = {
+            'browser_launches': 0,
+            'contexts_created': 0,
+            'context_recycles': 0,
+            'memory_recycles': 0,
+            'pages_served': 0,
+            'started_at': None,
+            'last_recycle_at': None,
+            'last_recycle_reason': None,
+        }
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Playwright objects are bound to the loop that created them
+            self.playwright = None
+            self.browser = None
+            self._navigations = {}
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+    async def _ensure_browser(self):
+        if self.browser and self.browser.is_connected():
+            return
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        print("🧭 Launching shared Chromium...")
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self._navigations = {}
+        self.stats['browser_launches'] += 1
+        self.stats['started_at'] = time.time()
+
+    async def acquire_page(self):
+        """Lease a fresh page in its own browser context"""
+        self._bind_loop()
+        async with self._lock:
+            await self._ensure_browser()
+            context = await self.browser.new_context()
+        self._navigations[context] = 0
+        self.stats['contexts_created'] += 1
+        return await context.new_page()
+
+    async def release_page(self, page):
+        """Return a leased page; its context is closed"""
+        if page is None:
+            return
+        context = page.context
+        self._navigations.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass  # browser already gone
+
+    async def recycle_if_needed(self, page):
+        """Count a navigation on page and swap in a new context when limits are hit"""
+        context = page.context
+        self._navigations[context] = self._navigations.get(context, 0) + 1
+        self.stats['pages_served'] += 1
+
+        reason = None
+        if self._navigations[context] >= self.max_pages_per_context:
+            reason = 'page_limit'
+        elif self.memory_limit_mb:
+            rss = chromium_rss_mb()
+            if rss is not None and rss > self.memory_limit_mb:
+                reason = 'memory'
+                self.stats['memory_recycles'] += 1
+        if reason is None:
+            return page
+
+        print(f"♻️  Recycling browser context ({reason})")
+        await self.release_page(page)
+        self.stats['context_recycles'] += 1
+        self.stats['last_recycle_at'] = time.time()
+        self.stats['last_recycle_reason'] = reason
+        return await self.acquire_page()
+
+    async def close(self):
+        """Shut the browser down (process exit / app shutdown)"""
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+        if self.playwright:
+            await self.playwright.stop()
+        self.browser = None
+        self.playwright = None
+        self._navigations = {}
+
+    def health(self):
+        """Pool status for the admin API"""
+        running = bool(self.browser and self.browser.is_connected())
+        started_at = self.stats['started_at']
+        return {
+            'running': running,
+            'active_contexts': len(self._navigations),
+            'uptime_seconds': round(time.time() - started_at) if running and started_at else 0,
+            'chromium_rss_mb': chromium_rss_mb() if running else None,
+            'max_pages_per_context': self.max_pages_per_context,
+            'memory_limit_mb': self.memory_limit_mb,
+            **self.stats,
+        }
+
+
+_pool = None
+
+
+def get_browser_pool():
+    """Process-wide browser pool"""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
@@ -0,0 +1,276 @@
+"""
+Static catalog snapshot for CDN hosting
+Writes the public catalog reads as JSON files, in the same shape as the API
+responses, so the frontend's host (or any CDN) can serve them without
+FastAPI or Mongo:
+
+    manifest.json                            current version, categories, page counts (short cache)
+    v/<version>/categories.json              GET /api/categories
+    v/<version>/featured.json                GET /api/tools/featured
+    v/<version>/tools/<category>/<n>.json    GET /api/tools?category=&page=n ('all' for every tool)
+    v/<version>/tool/<id>.json               GET /api/tools/{id}
+
+Each file also has a gzip twin (.json.gz). Versioned files never change, so
+they can be cached as immutable. A new version is published by replacing
+manifest.json once all of its files are written. Tool documents that did not
+change are hard-linked from the previous version instead of being
+re-encoded.
+
+Sync runs export inline after they finish; admin edits schedule a debounced
+export in the background (see catalog_hooks.py).
+
+Usage:
+    python catalog_export.py
+"""
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+
+# Configuration
+EXPORT_DIR = os.environ.get('CATALOG_EXPORT_DIR',
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog_export'))
+EXPORT_PAGE_SIZE = 24  # HomePage.js PAGE_SIZE
+EXPORT_FEATURED_LIMIT = 10  # as GET /tools/featured
+EXPORT_KEEP_VERSIONS = 3  # older versions stay for clients holding an old manifest
+EXPORT_DEBOUNCE_SECONDS = float(os.environ.get('CATALOG_EXPORT_DEBOUNCE_SECONDS', 5))
+GZIP_LEVEL = 9  # compressed once, served many times
+WRITE_BATCH = 200  # files encoded and written per worker-thread round trip
+
+MANIFEST = 'manifest.json'
+VERSIONS = 'v'
+ALL = 'all'
+
+# Fields and defaults of models.Tool, in its order
+TOOL_FIELDS = {
+    'name': None, 'description': None, 'description_full': None, 'category': None, 'tags': [],
+    'price_type': None, 'website_url': None, 'image_url': None, 'is_featured': False,
+    'featured_order': None, 'is_active': True, 'id': None, 'created_at': None, 'updated_at': None,
+    'synced_from': None, 'synced_at': None,
+}
+
+logger = logging.getLogger(__name__)
+_sequence = itertools.count()
+
+
+def tool_document(tool):
+    """The Tool response body of a stored tool"""
+    document = {}
+    for field, default in TOOL_FIELDS.items():
+        value = tool.get(field, default)
+        document[field] = value.isoformat() if isinstance(value, datetime) else value
+    return document
+
+
+def encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def category_slug(name, taken):
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'category'
+    candidate, number = slug, 2
+    while candidate in taken or candidate == ALL:
+        candidate, number = f'{slug}-{number}', number + 1
+    taken.add(candidate)
+    return candidate
+
+
+class SnapshotWriter:
+    """Files of one export version, plus their gzip twins"""
+
+    def __init__(self, root, version, previous=None):
+        self.root = root
+        self.version = version
+        self.directory = os.path.join(root, VERSIONS, version)
+        self.previous = os.path.join(root, VERSIONS, previous) if previous else None
+        self.files = 0
+        self.linked = 0
+        self.pending = []
+
+    async def write(self, relative, data):
+        """Queue one file; encoding, gzip and disk I/O run in a worker thread, off the event loop"""
+        self.pending.append((relative, data))
+        if len(self.pending) >= WRITE_BATCH:
+            await self.flush()
+
+    async def flush(self):
+        pending, self.pending = self.pending, []
+        if pending:
+            await asyncio.to_thread(self._write_all, pending)
+
+    def _write_all(self, pending):
+        for relative, data in pending:
+            self._write(relative, data)
+
+    def _write(self, relative, data):
+        body = encode(data)
+        path = os.path.join(self.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.previous and self._link_unchanged(relative, path, body):
+            return
+        with open(path, 'wb') as f:
+            f.write(body)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(body, GZIP_LEVEL, mtime=0))
+        self.files += 1
+
+    def _link_unchanged(self, relative, path, body):
+        old = os.path.join(self.previous, relative)
+        try:
+            with open(old, 'rb') as f:
+                if f.read() != body:
+                    return False
+            os.link(old, path)
+            os.link(old + '.gz', path + '.gz')
+        except OSError:
+            return False
+        self.files += 1
+        self.linked += 1
+        return True
+
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def publish_manifest(root, manifest):
+    path = os.path.join(root, MANIFEST)
+    temp = f'{path}.{os.getpid()}.tmp'
+    with open(temp, 'wb') as f:
+        f.write(encode(manifest))
+    os.replace(temp, path)  # the new version goes live in one step
+
+
+def prune_versions(root, current, keep=EXPORT_KEEP_VERSIONS):
+    """Remove all but the newest keep versions (see version_name)"""
+    versions = sorted(os.listdir(os.path.join(root, VERSIONS)))
+    for version in versions[:-keep]:
+        if version != current:
+            shutil.rmtree(os.path.join(root, VERSIONS, version), ignore_errors=True)
+
+
+def version_name(started):
+    """Microsecond timestamp plus a per-process counter, so names sort in creation order"""
+    return f"{started.strftime('%Y%m%dT%H%M%S%fZ')}-{next(_sequence):06d}"
+
+
+async def export_catalog(database, root=EXPORT_DIR, page_size=EXPORT_PAGE_SIZE):
+    """Write a new version of the snapshot and publish it; returns the manifest"""
+    started = datetime.now(timezone.utc)
+    version = version_name(started)
+    previous = read_manifest(root)
+    writer = SnapshotWriter(root, version, previous['version'] if previous else None)
+
+    totals = {}
+    async for group in database.tools.aggregate([{'$group': {'_id': '$category', 'total': {'$sum': 1}}}]):
+        if group['_id'] is not None:
+            totals[group['_id']] = group['total']
+    categories = sorted(totals)
+    taken = set()
+    slugs = {name: category_slug(name, taken) for name in categories}
+    grand_total = sum(totals.values())
+
+    # One pass in the API's default order (created_at desc) fills every listing
+    listings = {ALL: {'total': grand_total, 'page': 1, 'items': []}}
+    for name in categories:
+        listings[slugs[name]] = {'total': totals[name], 'page': 1, 'items': []}
+
+    async def flush(slug):
+        listing = listings[slug]
+        await writer.write(f"tools/{slug}/{listing['page']}.json", {
+            'items': listing['items'], 'total': listing['total'], 'page': listing['page'], 'page_size': page_size,
+        })
+        listing['page'] += 1
+        listing['items'] = []
+
+    async for tool in database.tools.find({}, {'_id': 0}).sort('created_at', -1):
+        document = tool_document(tool)
+        await writer.write(f"tool/{document['id']}.json", document)
+        for slug in (ALL, slugs.get(tool.get('category'))):
+            if slug is None:
+                continue
+            listings[slug]['items'].append(document)
+            if len(listings[slug]['items']) == page_size:
+                await flush(slug)
+    for slug, listing in listings.items():
+        if listing['items'] or listing['page'] == 1:
+            await flush(slug)  # the last partial page, or an empty first page
+
+    featured = await database.tools.find({'is_featured': True}, {'_id': 0}).sort('featured_order', 1) \
+        .to_list(EXPORT_FEATURED_LIMIT)
+    await writer.write('featured.json', [tool_document(tool) for tool in featured])
+    await writer.write('categories.json', categories)
+    await writer.flush()
+
+    manifest = {
+        'version': version,
+        'generated_at': started.isoformat(),
+        'base': f'{VERSIONS}/{version}',
+        'page_size': page_size,
+        'all': {'total': grand_total, 'pages': listings[ALL]['page'] - 1},
+        'categories': [{'name': name, 'slug': slugs[name], 'total': totals[name],
+                        'pages': listings[slugs[name]]['page'] - 1} for name in categories],
+    }
+    await asyncio.to_thread(publish_manifest, root, manifest)
+    await asyncio.to_thread(prune_versions, root, version)
+    print(f"📤 Exported catalog {version}: {writer.files} files ({writer.linked} unchanged, linked)")
+    return manifest
+
+
+# --- Triggers ---
+
+_dirty = False
+_task = None
+
+
+async def _debounced_export(database, delay):
+    global _dirty
+    while _dirty:
+        await asyncio.sleep(delay)  # a burst of admin edits becomes one export
+        _dirty = False
+        try:
+            await export_catalog(database)
+        except Exception as e:
+            logger.error(f"Catalog export failed: {str(e)}")
+
+
+def schedule_export(database, delay=EXPORT_DEBOUNCE_SECONDS):
+    """Export soon, in the background; changes made while an export runs trigger one more"""
+    global _dirty, _task
+    _dirty = True
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_debounced_export(database, delay))
+    return _task
+
+
+async def on_catalog_change(database, kind, ids):
+    """catalog_hooks listener"""
+    from catalog_hooks import TOOLS
+    if kind != TOOLS:
+        return  # pages and settings are not part of the snapshot
+    if ids is None:
+        await export_catalog(database)  # sync runs: finish before the process exits
+    else:
+        schedule_export(database)
+
+
+async def main():
+    from database import get_db, close_client
+    try:
+        manifest = await export_catalog(get_db())
+        print(f"✅ {EXPORT_DIR}/{MANIFEST} -> {manifest['version']}")
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
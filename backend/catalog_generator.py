@@ -0,0 +1,173 @@
+"""
+Synthetic catalog generator
+Builds production-scale catalogs (10k-1M tools plus CMS pages) for
+benchmarks and index tuning.
+- Categories and tags follow Zipf distributions, like the real catalog.
+- description_full is long HTML.
+- A featured subset is ordered.
+- Everything derives from the seed, so the same seed always produces the same
+  documents, including tool ids.
+- Tools are streamed into Mongo with batched, unordered insert_many.
+
+Usage:
+    python seed_data.py --tools 100000 --seed 7
+"""
+import hashlib
+import random
+import uuid
+from datetime import datetime, timedelta
+
+# Configuration
+DEFAULT_SEED = 42
+BATCH_SIZE = 2000
+FEATURED_COUNT = 24
+PAGE_COUNT = 40
+EPOCH = datetime(2025, 1, 1)  # fixed, so timestamps are reproducible too
+CATEGORY_SKEW = 1.1  # Zipf exponents: a few categories/tags hold most tools
+TAG_SKEW = 1.0
+
+CATEGORIES = [
+    'Chatbot', 'Image Generation', 'Writing', 'Productivity', 'Coding', 'Marketing', 'Video Generation',
+    'Audio', 'Design', 'Search', 'Education', 'Research', 'SEO', 'Data Analysis', 'Customer Support',
+    'Social Media', 'Translation', 'Music', 'Voice', 'Sales', 'Finance', 'Health', 'Legal', 'HR',
+    'E-commerce', 'Gaming', '3D', 'Avatars', 'Presentations', 'Spreadsheets', 'Email', 'Browser',
+    'Developer Tools', 'Automation', 'Summarizer', 'Transcription', 'Photo Editing', 'Real Estate',
+    'Travel', 'Fashion',
+]
+PRICE_TYPES = ['Freemium', 'Free', 'Paid']
+PRICE_WEIGHTS = [50, 25, 25]
+SYLLABLES = ['ai', 'bo', 'ca', 'da', 'flo', 'gen', 'io', 'ka', 'lu', 'mi', 'nex', 'or', 'pix', 'qu',
+             'ra', 'sy', 'ta', 'vo', 'wiz', 'xa', 'yo', 'ze']
+SUFFIXES = ['AI', 'GPT', 'Studio', 'Labs', 'Pro', 'Copilot', 'Flow', 'Hub', '', '', '']
+WORDS = ('generate write create automate analyze summarize translate design edit record transcribe '
+         'optimize schedule research search chat code image video audio voice content team workflow '
+         'prompt model data insight report campaign customer product lesson story brand meeting').split()
+TAGS = list(dict.fromkeys(['AI', 'Chat', 'Writing', 'Image', 'Productivity'] + [word.capitalize() for word in WORDS] + CATEGORIES))
+
+
+def zipf_weights(count, skew):
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def tool_id(seed, index):
+    """Id of the index-th tool of a seeded catalog (random access, for benchmark workloads)"""
+    digest = hashlib.md5(f'{seed}:tool:{index}'.encode()).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+class CatalogGenerator:
+    """Deterministic tool and page documents for one seed"""
+
+    def __init__(self, seed=DEFAULT_SEED, featured=FEATURED_COUNT):
+        self.seed = seed
+        self.featured = featured
+        self.category_weights = zipf_weights(len(CATEGORIES), CATEGORY_SKEW)
+        self.tag_weights = zipf_weights(len(TAGS), TAG_SKEW)
+
+    def _rng(self, kind, index):
+        return random.Random(f'{self.seed}:{kind}:{index}')  # per document, so batches can be regenerated alone
+
+    def _sentence(self, rng, low=8, high=18):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+        return ' '.join(words).capitalize() + '.'
+
+    def description_html(self, rng, name):
+        """1-10 KB of headings, paragraphs and lists, like a scraped detail page"""
+        parts = [f'<h2>What is {name}?</h2>']
+        for _ in range(rng.randint(3, 12)):
+            parts.append('<p>' + ' '.join(self._sentence(rng) for _ in range(rng.randint(3, 8))) + '</p>')
+            if rng.random() < 0.4:
+                items = ''.join(f'<li>{self._sentence(rng, 3, 8)}</li>' for _ in range(rng.randint(3, 7)))
+                parts.append(f'<h3>Key features</h3><ul>{items}</ul>')
+        return ''.join(parts)
+
+    def tool(self, index):
+        """The index-th tool document"""
+        rng = self._rng('tool', index)
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        suffix = rng.choice(SUFFIXES)
+        name = f'{name} {suffix} {index}' if suffix else f'{name} {index}'
+        slug = name.lower().replace(' ', '-')
+        category = rng.choices(CATEGORIES, self.category_weights)[0]
+        tags = []
+        tag_count = rng.randint(2, 6)
+        while len(tags) < tag_count:
+            tag = rng.choices(TAGS, self.tag_weights)[0]
+            if tag not in tags:
+                tags.append(tag)
+        created = EPOCH - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))
+        updated = created + timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+        synced = rng.random() < 0.7
+        featured = index < self.featured
+        tool = {
+            'id': tool_id(self.seed, index),
+            'name': name,
+            'description': f"{name} helps you {self._sentence(rng, 6, 14).lower()}"[:200],
+            'description_full': self.description_html(rng, name),
+            'category': category,
+            'tags': tags,
+            'price_type': rng.choices(PRICE_TYPES, PRICE_WEIGHTS)[0],
+            'website_url': f'https://{slug}.example.com',
+            'image_url': f'https://cdn.example.com/tools/{slug}.png',
+            'is_featured': featured,
+            'featured_order': index + 1 if featured else None,
+            'is_active': rng.random() >= 0.03,
+            'created_at': created,
+            'updated_at': updated,
+        }
+        if synced:
+            # Admin-created tools have no sync fields at all (the server checks $exists)
+            tool['synced_from'] = 'https://aitoolsdirectory.com'
+            tool['synced_at'] = updated
+        return tool
+
+    def tools(self, count, start=0):
+        for index in range(start, start + count):
+            yield self.tool(index)
+
+    def page(self, index):
+        rng = self._rng('page', index)
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+        created = EPOCH - timedelta(days=rng.randint(0, 720))
+        return {
+            'id': str(uuid.UUID(bytes=hashlib.md5(f'{self.seed}:page:{index}'.encode()).digest(), version=4)),
+            'title': title,
+            'slug': f"{title.lower().replace(' ', '-')}-{index}",
+            'content': self.description_html(rng, title),
+            'is_published': rng.random() < 0.9,
+            'created_at': created,
+            'updated_at': created + timedelta(days=rng.randint(0, 60)),
+        }
+
+    def pages(self, count):
+        for index in range(count):
+            yield self.page(index)
+
+
+def batched(documents, size):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def insert_catalog(database, tools, seed=DEFAULT_SEED, pages=PAGE_COUNT, featured=FEATURED_COUNT,
+                         batch_size=BATCH_SIZE, replace=True):
+    """Bulk-insert a generated catalog; returns {'tools', 'pages'}"""
+    generator = CatalogGenerator(seed, featured)
+    if replace:
+        await database.tools.delete_many({})
+        await database.pages.delete_many({})
+    inserted = 0
+    for batch in batched(generator.tools(tools), batch_size):
+        await database.tools.insert_many(batch, ordered=False)
+        inserted += len(batch)
+        if inserted % (batch_size * 25) == 0 or inserted == tools:
+            print(f"   📦 {inserted}/{tools} tools")
+    if pages:
+        await database.pages.insert_many(list(generator.pages(pages)), ordered=False)
+    return {'tools': inserted, 'pages': pages}
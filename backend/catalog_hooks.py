@@ -0,0 +1,46 @@
+"""
+Catalog change notifications
+Admin writes and sync runs call catalog_changed() after they modify tools,
+pages or site settings. The derived artifacts listed in CATALOG_LISTENERS
+(sitemap, page snapshots, static export, ...) then update themselves, so they
+are never rebuilt by scanning the database on a read.
+"""
+import importlib
+import logging
+
+# Change kinds
+TOOLS = 'tools'
+PAGES = 'pages'
+SETTINGS = 'settings'
+
+# Listeners, as 'module.function'; each is awaited as listener(database, kind, ids)
+CATALOG_LISTENERS = [
+    'sitemap.on_catalog_change',
+    'prerender.on_catalog_change',
+    'catalog_export.on_catalog_change',
+]
+
+logger = logging.getLogger(__name__)
+_resolved = {}
+
+
+def _listener(path):
+    if path not in _resolved:
+        module, _, name = path.rpartition('.')
+        _resolved[path] = getattr(importlib.import_module(module), name)
+    return _resolved[path]
+
+
+async def catalog_changed(database, kind, ids=None):
+    """Tell every listener that documents of kind changed
+
+    ids lists the changed (or deleted) document ids; None means a bulk change
+    such as a sync run, after which listeners resynchronize fully.
+    """
+    ids = list(ids) if ids is not None else None
+    for path in CATALOG_LISTENERS:
+        try:
+            await _listener(path)(database, kind, ids)
+        except Exception as e:
+            # A stale derived artifact must never fail the write that triggered it
+            logger.error(f"Catalog listener {path} failed for {kind}: {str(e)}")
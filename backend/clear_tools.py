@@ -3,18 +3,7 @@ Clear all tools from database
 Use this to test sync from scratch
 """
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
-
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
-
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+from database import get_db, close_client
 
 
 async def clear_tools():
@@ -23,6 +12,7 @@ async def clear_tools():
     print("🗑️  Clear All Tools from Database")
     print("="*60)
     
+    db = get_db()
     try:
         # Count current tools
         count = await db.tools.count_documents({})
@@ -57,7 +47,7 @@ async def clear_tools():
         import traceback
         traceback.print_exc()
     finally:
-        client.close()
+        close_client()
 
 
 if __name__ == "__main__":
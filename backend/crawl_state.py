@@ -0,0 +1,219 @@
+"""
+Persisted crawl state for resumable Playwright syncs
+A sync run is a document in `sync_runs`; every discovered detail URL is a
+document in `crawl_urls` with its status and partial result, so a run that is
+killed or runs out of time continues where it stopped on the next schedule.
+`crawl_urls` doubles as the work queue: workers (possibly in several
+processes, see crawl_worker.py) atomically claim a URL under a lease, and a
+lease left behind by a crashed worker expires and is claimed again.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument, UpdateOne
+
+# Configuration
+SYNC_TIME_BUDGET_SECONDS = int(os.environ.get('SYNC_TIME_BUDGET_SECONDS', 0))  # 0 = no limit
+MAX_URL_ATTEMPTS = 3  # failed URLs are retried, after fresh ones, up to this many times
+RETRY_BACKOFF_SECONDS = int(os.environ.get('CRAWL_RETRY_BACKOFF_SECONDS', 60))  # before a failed URL is retried
+CRAWL_LEASE_SECONDS = int(os.environ.get('CRAWL_LEASE_SECONDS', 300))  # claim lifetime before another worker may take it
+CLAIM_POLL_SECONDS = 5  # wait between claims while other workers still hold every remaining URL
+MAX_URL_CLAIMS = MAX_URL_ATTEMPTS * 2  # a URL that keeps killing its worker is given up on
+
+# URL statuses
+PENDING = 'pending'
+EXTRACTED = 'extracted'  # details scraped, not saved yet
+DONE = 'done'
+FAILED = 'failed'
+
+# Claim order: finish extracted-but-unsaved URLs, then fresh ones, then retries
+PRIORITY = {EXTRACTED: 0, PENDING: 1, FAILED: 2}
+
+# Run statuses
+RUNNING = 'running'
+PAUSED = 'paused'
+COMPLETED = 'completed'
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class CrawlState:
+    """Checkpointed state of one sync run"""
+
+    def __init__(self, database, run, resumed=False):
+        self.db = database
+        self.run = run
+        self.run_id = run['id']
+        self.resumed = resumed
+
+    @staticmethod
+    async def ensure_indexes(database):
+        await database.crawl_urls.create_index([('run_id', 1), ('url', 1)], unique=True)
+        await database.crawl_urls.create_index([('run_id', 1), ('priority', 1), ('order', 1)])
+        await database.crawl_urls.create_index([('run_id', 1), ('lease_expires', 1)])
+        await database.sync_runs.create_index([('source_url', 1), ('status', 1), ('started_at', -1)])
+
+    @classmethod
+    async def resume_or_start(cls, database, source_url):
+        """Pick up the latest unfinished run for source_url, or open a new one
+
+        Syncs are single-flight (sync_lock.py), so leases still held on a
+        resumed run belong to a process that died; they are dropped rather
+        than left to expire. Their claims still count towards MAX_URL_CLAIMS.
+        """
+        await cls.ensure_indexes(database)
+        run = await database.sync_runs.find_one(
+            {'source_url': source_url, 'status': {'$in': [RUNNING, PAUSED]}},
+            sort=[('started_at', -1)]
+        )
+        if run:
+            await database.sync_runs.update_one(
+                {'id': run['id']},
+                {'$set': {'status': RUNNING, 'updated_at': _now()}, '$inc': {'resumes': 1}}
+            )
+            await database.crawl_urls.update_many(
+                {'run_id': run['id'], 'lease_owner': {'$ne': None}},
+                {'$set': {'lease_owner': None, 'lease_expires': None}}
+            )
+            return cls(database, run, resumed=True)
+
+        run = {
+            'id': str(uuid.uuid4()),
+            'source_url': source_url,
+            'status': RUNNING,
+            'started_at': _now(),
+            'updated_at': _now(),
+            'finished_at': None,
+            'resumes': 0,
+            'discovered': 0,
+            'processed': 0,
+            'saved': 0,
+            'failed': 0,
+        }
+        await database.sync_runs.insert_one(run)
+        return cls(database, run)
+
+    @classmethod
+    async def load(cls, database, run_id):
+        """Attach to an existing run (crawl worker processes)"""
+        run = await database.sync_runs.find_one({'id': run_id})
+        if not run:
+            raise ValueError(f"Unknown sync run: {run_id}")
+        return cls(database, run, resumed=True)
+
+    async def add_urls(self, tools):
+        """Record discovered tools (listing data) as pending URLs"""
+        operations = [
+            UpdateOne(
+                {'run_id': self.run_id, 'url': tool['website_url']},
+                {'$setOnInsert': {
+                    'run_id': self.run_id,
+                    'url': tool['website_url'],
+                    'order': order,
+                    'status': PENDING,
+                    'priority': PRIORITY[PENDING],
+                    'listing': tool,
+                    'result': None,
+                    'attempts': 0,
+                    'error': None,
+                    'updated_at': _now(),
+                }},
+                upsert=True
+            )
+            for order, tool in enumerate(tools)
+        ]
+        if operations:
+            await self.db.crawl_urls.bulk_write(operations, ordered=False)
+        self.run['discovered'] = len(tools)
+        await self.checkpoint(discovered=len(tools))
+
+    @property
+    def needs_discovery(self):
+        """New runs, and resumed runs that stopped before discovery finished"""
+        return not self.resumed or not self.run.get('discovered')
+
+    def _workable(self):
+        return {
+            'run_id': self.run_id,
+            '$or': [
+                {'status': {'$in': [PENDING, EXTRACTED]}},
+                {'status': FAILED, 'attempts': {'$lt': MAX_URL_ATTEMPTS}},
+            ],
+            'claims': {'$not': {'$gte': MAX_URL_CLAIMS}},
+        }
+
+    async def count_remaining(self):
+        return await self.db.crawl_urls.count_documents(self._workable())
+
+    async def claim(self, worker_id, lease_seconds=CRAWL_LEASE_SECONDS):
+        """Atomically lease the next URL to worker_id; None when the queue is drained
+
+        Unleased URLs and URLs whose lease expired (crashed worker) are
+        eligible, in PRIORITY then discovery order.
+        """
+        now = _now()
+        query = self._workable()
+        query['lease_expires'] = {'$not': {'$gt': now}}  # missing, None or expired
+        return await self.db.crawl_urls.find_one_and_update(
+            query,
+            {
+                '$set': {'lease_owner': worker_id, 'lease_expires': now + timedelta(seconds=lease_seconds)},
+                '$inc': {'claims': 1},
+            },
+            sort=[('priority', 1), ('order', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def renew(self, urls, worker_id, lease_seconds=CRAWL_LEASE_SECONDS):
+        """Extend worker_id's leases on urls (claimed URLs waiting in a batch)"""
+        if urls:
+            await self.db.crawl_urls.update_many(
+                {'run_id': self.run_id, 'url': {'$in': list(urls)}, 'lease_owner': worker_id},
+                {'$set': {'lease_expires': _now() + timedelta(seconds=lease_seconds)}}
+            )
+
+    async def release(self, url):
+        """Give a claimed URL back without counting an attempt (clean shutdown)"""
+        await self.db.crawl_urls.update_one(
+            {'run_id': self.run_id, 'url': url},
+            {'$set': {'lease_owner': None, 'lease_expires': None}, '$inc': {'claims': -1}}
+        )
+
+    async def mark_extracted(self, url, tool):
+        await self._set_url(url, {'status': EXTRACTED, 'priority': PRIORITY[EXTRACTED], 'result': tool, 'error': None})
+
+    async def mark_done(self, url, saved):
+        await self._set_url(url, {'status': DONE, 'saved': bool(saved)})
+        await self.db.sync_runs.update_one(
+            {'id': self.run_id},
+            {'$inc': {'processed': 1, 'saved': 1 if saved else 0}, '$set': {'updated_at': _now()}}
+        )
+
+    async def mark_failed(self, url, error):
+        await self.db.crawl_urls.update_one(
+            {'run_id': self.run_id, 'url': url},
+            # The lease doubles as a back-off: retried once it expires, not straight away
+            {'$set': {'status': FAILED, 'priority': PRIORITY[FAILED], 'error': str(error)[:500], 'updated_at': _now(),
+                      'lease_owner': None, 'lease_expires': _now() + timedelta(seconds=RETRY_BACKOFF_SECONDS)},
+             '$inc': {'attempts': 1}}
+        )
+        await self.db.sync_runs.update_one({'id': self.run_id}, {'$inc': {'failed': 1}})
+
+    async def _set_url(self, url, fields):
+        fields['updated_at'] = _now()
+        if fields.get('status') == DONE:
+            fields.update(lease_owner=None, lease_expires=None)
+        await self.db.crawl_urls.update_one({'run_id': self.run_id, 'url': url}, {'$set': fields})
+
+    async def checkpoint(self, **fields):
+        fields['updated_at'] = _now()
+        await self.db.sync_runs.update_one({'id': self.run_id}, {'$set': fields})
+
+    async def pause(self, reason):
+        """Stop cleanly; the next run resumes from here"""
+        await self.checkpoint(status=PAUSED, paused_reason=reason)
+
+    async def finish(self):
+        await self.checkpoint(status=COMPLETED, finished_at=_now())
@@ -0,0 +1,171 @@
+"""
+Multi-process crawl workers for catalog-scale syncs
+The coordinator discovers the run's detail URLs into the `crawl_urls` queue
+(see crawl_state.py), then starts N worker processes, each with its own
+event loop, Mongo client and Chromium. Workers lease URLs one at a time, so
+throughput scales across cores; a crashed worker is restarted and its lease
+is picked up again once it expires. Workers keep polling while other workers
+hold the last URLs, and the run is only closed once the queue is empty.
+
+Usage:
+    python crawl_worker.py --workers 4
+    SYNC_SCRAPER=workers  # scheduler / admin trigger use this instead of the single-page scraper
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+
+from database import get_db, close_client
+from crawl_state import CrawlState, SYNC_TIME_BUDGET_SECONDS, PAUSED
+from page_archive import PageArchive
+from resilience import CircuitOpenError
+from sync_tools_playwright import PlaywrightScraper, SOURCE_URL, DETAIL_PAGE_DELAY
+
+# Configuration
+CRAWL_WORKERS = int(os.environ.get('CRAWL_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+MAX_WORKER_RESTARTS = 3  # per coordinator run
+CIRCUIT_OPEN_EXIT = 3  # worker exit code: the source is down, don't restart
+
+
+async def _work(run_id, worker_id, workers, deadline_wall):
+    from browser_pool import get_browser_pool
+    from throttle import AdaptiveThrottle, THROTTLE_MIN_DELAY
+
+    deadline = time.monotonic() + (deadline_wall - time.time()) if deadline_wall else None
+    state = await CrawlState.load(get_db(), run_id)
+    try:
+        async with PlaywrightScraper() as scraper:
+            # The politeness budget is shared: N workers each go N times slower
+            scraper.throttle = AdaptiveThrottle(DETAIL_PAGE_DELAY * workers, min_delay=THROTTLE_MIN_DELAY * workers)
+            stats = await scraper.work(state, deadline, worker_id)
+            await state.checkpoint(**{f'workers.{worker_id}': {
+                'processed': stats['processed'],
+                'saved': stats['saved'],
+                'throttle': scraper.throttle.report(),
+                'http_cache': scraper.cache.stats,
+                'metrics': scraper.metrics.report(),
+            }})
+    finally:
+        await get_browser_pool().close()
+        close_client()
+
+
+def worker_main(run_id, worker_id, workers, deadline_wall):
+    """Process entry point"""
+    try:
+        asyncio.run(_work(run_id, worker_id, workers, deadline_wall))
+    except CircuitOpenError as e:
+        print(f"🔌 [{worker_id}] Source down, stopping: {str(e)}")
+        sys.exit(CIRCUIT_OPEN_EXIT)
+
+
+def _start_worker(context, run_id, index, workers, deadline_wall):
+    worker_id = f"w{index}-{os.getpid()}"
+    process = context.Process(target=worker_main, args=(run_id, worker_id, workers, deadline_wall),
+                              name=f"crawl-{worker_id}")  # not daemonic: workers run their own sanitize pool
+    process.start()
+    print(f"👷 Started worker {worker_id} (pid {process.pid})")
+    return process
+
+
+async def sync_tools(workers=CRAWL_WORKERS, time_budget=None):
+    """Coordinator: discover, fan the queue out to worker processes, wait, then close the run"""
+    time_budget = SYNC_TIME_BUDGET_SECONDS if time_budget is None else time_budget
+    deadline_wall = time.time() + time_budget if time_budget else None
+
+    print("=" * 60)
+    print(f"🚀 Starting AI Tools Sync with {workers} crawl workers")
+    print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"🌐 Source: {SOURCE_URL}")
+    print("=" * 60)
+
+    db = get_db()
+    state = None
+    try:
+        state = await CrawlState.resume_or_start(db, SOURCE_URL)
+        await PageArchive.ensure_indexes(db)
+        saved_before = state.run.get('saved', 0)
+
+        if state.needs_discovery:
+            from browser_pool import get_browser_pool
+            async with PlaywrightScraper() as scraper:
+                await scraper.discover_into(state)
+            await get_browser_pool().close()  # workers bring their own browsers
+
+        if not await state.count_remaining():
+            print("✅ Nothing to crawl")
+            await state.finish()
+            return 0
+
+        context = multiprocessing.get_context('spawn')  # no forked event loops / browser handles
+        processes = {i: _start_worker(context, state.run_id, i, workers, deadline_wall) for i in range(workers)}
+        restarts = 0
+        source_down = False
+        while processes:
+            await asyncio.sleep(1)
+            for index, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                process.join()
+                del processes[index]
+                if process.exitcode == CIRCUIT_OPEN_EXIT:
+                    source_down = True
+                elif process.exitcode != 0 and not source_down and restarts < MAX_WORKER_RESTARTS:
+                    restarts += 1
+                    print(f"💥 Worker {process.name} died (exit {process.exitcode}), restarting")
+                    processes[index] = _start_worker(context, state.run_id, index, workers, deadline_wall)
+            if source_down:
+                for process in processes.values():
+                    process.terminate()
+
+        run = await db.sync_runs.find_one({'id': state.run_id})
+        saved = run.get('saved', 0) - saved_before
+        left = await state.count_remaining()
+        if source_down:
+            await state.pause("error: source is down (circuit open)")
+        elif left and run.get('status') != PAUSED:
+            # Workers gave up (restart budget spent) with URLs still leased or awaiting retry
+            await state.pause(f"incomplete: {left} URLs left in the queue")
+            run['status'] = PAUSED
+        elif run.get('status') != PAUSED:
+            await state.finish()
+            # Hot-linked source images -> local thumbnails
+            from image_pipeline import mirror_images
+            await mirror_images(db, notify=False)
+            from catalog_hooks import catalog_changed, TOOLS
+            await catalog_changed(db, TOOLS)
+
+        print("\n" + "=" * 60)
+        print(f"✅ Sync {'paused (will resume next run)' if source_down or run.get('status') == PAUSED else 'completed'}!")
+        print(f"📊 New tools added: {saved} (run total {run.get('processed', 0)}/{run.get('discovered', 0)}), "
+              f"{restarts} worker restarts")
+        print("=" * 60)
+        return saved
+
+    except Exception as e:
+        print(f"\n❌ Sync failed: {str(e)}")
+        if state:
+            # Keep the checkpoints so the next run resumes instead of starting over
+            await state.pause(f"error: {str(e)[:200]}")
+        return 0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run a sync with several crawl worker processes")
+    parser.add_argument('--workers', type=int, default=CRAWL_WORKERS)
+    parser.add_argument('--time-budget', type=int, default=None, help='seconds before checkpointing (0 = no limit)')
+    args = parser.parse_args()
+
+    from sync_lock import sync_flight
+    try:
+        await sync_flight.run(get_db(), lambda: sync_tools(args.workers, args.time_budget))
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
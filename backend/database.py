@@ -0,0 +1,71 @@
+"""
+Shared MongoDB client
+One AsyncIOMotorClient per process with explicit pool, timeout and wire
+compression settings. The API opens and warms it in its lifespan and hands
+it to handlers with Depends(get_db); sync code, workers and scripts call
+get_db() too, so a process never holds more than one pool.
+"""
+import asyncio
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Configuration
+MONGO_URL = os.environ['MONGO_URL']
+DB_NAME = os.environ['DB_NAME']
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 50))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 5))  # kept open (and warmed) per process
+MONGO_MAX_IDLE_MS = int(os.environ.get('MONGO_MAX_IDLE_MS', 5 * 60 * 1000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 30000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))  # fail fast when the pool is exhausted
+# zlib ships with Python; add zstd/snappy here once their packages are installed
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zlib')
+MONGO_ZLIB_LEVEL = int(os.environ.get('MONGO_ZLIB_LEVEL', 1))  # cheap CPU, most of the gain on JSON-ish docs
+
+_client = None
+
+
+def get_client():
+    """The process-wide client, created on first use"""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            MONGO_URL,
+            appname='aibox4u',
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=MONGO_MAX_IDLE_MS,
+            connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            compressors=MONGO_COMPRESSORS,
+            zlibCompressionLevel=MONGO_ZLIB_LEVEL,
+        )
+    return _client
+
+
+def get_db():
+    """Application database (also the FastAPI dependency)"""
+    return get_client()[DB_NAME]
+
+
+async def warm_up():
+    """Select a server and open minPoolSize connections before the first request"""
+    database = get_db()
+    await database.command('ping')
+    await asyncio.gather(*(database.command('ping') for _ in range(MONGO_MIN_POOL_SIZE)))
+
+
+def close_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
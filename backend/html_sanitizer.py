@@ -0,0 +1,216 @@
+"""
+Normalize scraped description_full HTML at ingest
+Keeps an allowlist of structural tags and attributes, unwraps layout wrappers,
+collapses whitespace and drops empty elements, so stored documents are small
+and the detail page can render them without any per-request cleanup
+
+Usage (clean up tools saved before this existed):
+    python html_sanitizer.py
+"""
+import asyncio
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from html import escape
+from html.parser import HTMLParser
+
+# Configuration
+SANITIZE_BATCH_SIZE = 10  # tools per process-pool round trip during a sync
+SANITIZE_WORKERS = int(os.environ.get('SANITIZE_WORKERS', 2))
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'strong', 'b', 'em', 'i', 'u', 'a',
+    'blockquote', 'code', 'pre', 'img',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRS = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+REQUIRED_ATTRS = {'a': 'href', 'img': 'src'}
+VOID_TAGS = {'br', 'hr', 'img', 'input', 'meta', 'link', 'source', 'wbr', 'area', 'col', 'embed'}
+# Removed together with everything inside them
+DROP_TAGS = {'script', 'style', 'noscript', 'iframe', 'svg', 'template', 'button', 'form', 'select', 'object'}
+# Unwrapped; their content becomes a paragraph when it has no block children
+CONTAINER_TAGS = {'div', 'section', 'article', 'header', 'footer', 'main', 'aside'}
+BLOCK_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'blockquote', 'pre',
+              'table', 'thead', 'tbody', 'tr', 'th', 'td', 'hr', 'br'}
+SAFE_URL_RE = re.compile(r'^(https?:|mailto:|/|#)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+BLOCK_EDGE_RE = re.compile(r'\s*(</?(?:%s)\b[^>]*>)\s*' % '|'.join(sorted(BLOCK_TAGS)))
+HAS_BLOCK_RE = re.compile(r'<(?:%s)\b' % '|'.join(sorted(BLOCK_TAGS)))
+
+
+class _Node:
+    __slots__ = ('tag', 'attrs', 'children')
+
+    def __init__(self, tag, attrs=None):
+        self.tag = tag
+        self.attrs = attrs or []
+        self.children = []
+
+
+class _TreeBuilder(HTMLParser):
+    """Tolerant parser producing a minimal element tree"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node(None)
+        self.stack = [self.root]
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        node = _Node(tag, attrs)
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in DROP_TAGS or self.skip_depth:
+            return
+        self.stack[-1].children.append(_Node(tag, attrs))
+
+    def handle_endtag(self, tag):
+        if tag in DROP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag in VOID_TAGS:
+            return
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                break
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.stack[-1].children.append(data)
+
+
+def _render_attrs(tag, attrs):
+    allowed = ALLOWED_ATTRS.get(tag, ())
+    parts = []
+    for name, value in attrs:
+        if name not in allowed or value is None:
+            continue
+        value = value.strip()
+        if name in ('href', 'src') and not SAFE_URL_RE.match(value):
+            continue
+        parts.append(f' {name}="{escape(value, quote=True)}"')
+    return ''.join(parts)
+
+
+def _render(node, out, in_pre=False):
+    for child in node.children:
+        if isinstance(child, str):
+            text = escape(child, quote=False)
+            out.append(text if in_pre else WHITESPACE_RE.sub(' ', text))
+            continue
+
+        tag = child.tag
+        if tag in VOID_TAGS:
+            if tag in ALLOWED_TAGS:
+                attrs = _render_attrs(tag, child.attrs)
+                if REQUIRED_ATTRS.get(tag) and f' {REQUIRED_ATTRS[tag]}=' not in attrs:
+                    continue
+                out.append(f'<{tag}{attrs}>')
+            continue
+
+        inner = []
+        _render(child, inner, in_pre or tag == 'pre')
+        inner_html = ''.join(inner)
+        if not inner_html.strip():
+            continue  # empty element (or wrapper) - drop it
+        if tag in ALLOWED_TAGS:
+            attrs = _render_attrs(tag, child.attrs)
+            if REQUIRED_ATTRS.get(tag) and f' {REQUIRED_ATTRS[tag]}=' not in attrs:
+                out.append(inner_html)  # e.g. <a> without a safe href: keep the text
+                continue
+            out.append(f'<{tag}{attrs}>{inner_html}</{tag}>')
+        elif tag in CONTAINER_TAGS and not HAS_BLOCK_RE.search(inner_html):
+            out.append(f'<p>{inner_html.strip()}</p>')
+        else:
+            out.append(inner_html)
+
+
+def sanitize_html(html):
+    """Return allowlisted, whitespace-collapsed HTML without empty nodes"""
+    if not html:
+        return html
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    out = []
+    _render(builder.root, out)
+    cleaned = BLOCK_EDGE_RE.sub(r'\1', ''.join(out))
+    return cleaned.strip()
+
+
+def sanitize_batch(htmls):
+    """Sanitize a list of fragments (one process-pool task per batch)"""
+    return [sanitize_html(html) for html in htmls]
+
+
+_executor = None
+
+
+def get_executor():
+    """Process pool shared by every sync in this process"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=SANITIZE_WORKERS)
+    return _executor
+
+
+async def sanitize_in_pool(htmls):
+    """Sanitize a batch off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), sanitize_batch, list(htmls))
+
+
+async def sanitize_existing_tools(database, batch_size=200):
+    """Re-sanitize description_full of every stored tool"""
+    cursor = database.tools.find({'description_full': {'$nin': [None, '']}}, {'id': 1, 'description_full': 1})
+    updated = 0
+    bytes_before = bytes_after = 0
+    while True:
+        batch = await cursor.to_list(length=batch_size)
+        if not batch:
+            break
+        cleaned = await sanitize_in_pool(tool['description_full'] for tool in batch)
+        for tool, html in zip(batch, cleaned):
+            bytes_before += len(tool['description_full'])
+            bytes_after += len(html)
+            if html != tool['description_full']:
+                await database.tools.update_one({'id': tool['id']}, {'$set': {
+                    'description_full': html,
+                    'updated_at': datetime.now(timezone.utc),
+                }})
+                updated += 1
+    if updated:
+        from catalog_hooks import catalog_changed, TOOLS
+        await catalog_changed(database, TOOLS)
+    print(f"✅ Sanitized {updated} descriptions ({bytes_before / 1024:.0f} KB -> {bytes_after / 1024:.0f} KB)")
+    return updated
+
+
+async def main():
+    from database import get_db, close_client
+    try:
+        await sanitize_existing_tools(get_db())
+    finally:
+        close_client()
+        if _executor:
+            _executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+On-disk HTTP response cache for the scrapers
+Keeps ETag/Last-Modified validators next to a gzip-compressed copy of each
+page so the next sync can revalidate with a conditional request instead of
+downloading (and re-rendering) pages that did not change. A rendered SPA page
+is cached with the validators of the JSON responses it was built from rather
+than those of its HTML shell, which says nothing about the data.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+
+# Configuration
+HTTP_CACHE_DIR = Path(os.environ.get('HTTP_CACHE_DIR', ROOT_DIR / '.cache' / 'http'))
+HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', '1') != '0'
+
+
+def _header(headers, name):
+    """Read a header from aiohttp (case-insensitive) or Playwright (lower-case) headers"""
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.lower())
+
+
+def validators(url, headers):
+    """{'url', 'etag', 'last_modified'} for a response, or None if it has no validators"""
+    etag, last_modified = _header(headers, 'ETag'), _header(headers, 'Last-Modified')
+    if not etag and not last_modified:
+        return None
+    return {'url': url, 'etag': etag, 'last_modified': last_modified}
+
+
+def conditional_headers_for(meta):
+    """If-None-Match / If-Modified-Since headers from a validators dict"""
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+
+class HttpCache:
+    """Persistent response cache keyed by URL"""
+
+    def __init__(self, cache_dir=None, enabled=None):
+        self.cache_dir = Path(cache_dir or HTTP_CACHE_DIR)
+        self.enabled = HTTP_CACHE_ENABLED if enabled is None else enabled
+        self.stats = {
+            'hits': 0,          # 304 Not Modified, served from cache
+            'misses': 0,        # full download
+            'stored': 0,
+            'bytes_saved': 0,   # uncompressed bytes not downloaded thanks to 304s
+        }
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        folder = self.cache_dir / key[:2]
+        return folder / f"{key}.json", folder / f"{key}.html.gz"
+
+    @staticmethod
+    def _write_atomic(path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """Return cached metadata for url, or None"""
+        if not self.enabled:
+            return None
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def read_body(self, url):
+        """Return the cached (decompressed) body for url, or None"""
+        if not self.enabled:
+            return None
+        _, body_path = self._paths(url)
+        try:
+            with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def conditional_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers from the cached validators"""
+        meta = self.get(url)
+        return conditional_headers_for(meta) if meta else {}
+
+    def store(self, url, body, headers=None, extracted=None, sources=None):
+        """Save a freshly downloaded body with its validators (and optional extracted data)
+
+        sources lists validators() of the data responses a rendered page was
+        built from; pass headers=None for such pages.
+        """
+        if not self.enabled or body is None:
+            return
+        meta_path, body_path = self._paths(url)
+        raw = body.encode('utf-8')
+        meta = {
+            'url': url,
+            'etag': _header(headers, 'ETag'),
+            'last_modified': _header(headers, 'Last-Modified'),
+            'size': len(raw),
+            'fetched_at': time.time(),
+            'checked_at': time.time(),
+            'extracted': extracted,
+            'sources': sources,
+        }
+        self._write_atomic(body_path, gzip.compress(raw, compresslevel=6))
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        self.stats['misses'] += 1
+        self.stats['stored'] += 1
+
+    def store_extracted(self, url, extracted):
+        """Attach extracted data to an existing entry so a 304 can skip extraction too"""
+        meta = self.get(url)
+        if not meta:
+            return
+        meta['extracted'] = extracted
+        meta_path, _ = self._paths(url)
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def mark_not_modified(self, url):
+        """Record a 304 for url and return its cached metadata"""
+        meta = self.get(url)
+        if not meta:
+            return None
+        meta['checked_at'] = time.time()
+        meta_path, _ = self._paths(url)
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        self.stats['hits'] += 1
+        self.stats['bytes_saved'] += meta.get('size', 0)
+        return meta
+
+    def summary(self):
+        """One-line summary for the sync output"""
+        s = self.stats
+        return (f"{s['hits']} not modified, {s['misses']} downloaded, "
+                f"{s['bytes_saved'] / 1024:.0f} KB saved")
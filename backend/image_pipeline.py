@@ -0,0 +1,280 @@
+"""
+Mirror tool images and serve resized thumbnails
+Downloads each tool's remote image_url concurrently, renders WebP (and AVIF
+when the plugin is installed) thumbnails in a process pool and stores them
+content-addressed in the `media` GridFS bucket, so every API instance sees
+them and they survive redeploys. MEDIA_DIR is only a local cache of that
+bucket. image_url is then rewritten to the absolute URL of the variant served
+by GET /api/media/{image_id}; the original stays in image_source_url, and
+the media endpoint redirects there if a variant is ever missing.
+
+Usage:
+    MEDIA_BASE_URL=https://api.aibox4u.cc python image_pipeline.py
+"""
+import asyncio
+import hashlib
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Configuration
+MEDIA_DIR = Path(os.environ.get('MEDIA_DIR', ROOT_DIR / 'media'))  # local cache of the GridFS bucket
+MEDIA_BUCKET = 'media'
+# Public API origin, e.g. https://api.aibox4u.cc; required: the frontend is served from another host
+MEDIA_BASE_URL = os.environ.get('MEDIA_BASE_URL', '').rstrip('/')
+THUMBNAIL_WIDTHS = (320, 640)
+DEFAULT_WIDTH = 640  # variant used for image_url (cards are ~300px wide, 2x for retina)
+DOWNLOAD_CONCURRENCY = int(os.environ.get('IMAGE_DOWNLOAD_CONCURRENCY', 8))
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+
+IMAGE_ID_RE = re.compile(r'^[0-9a-f]{64}-\d+$')
+ABSOLUTE_URL_RE = re.compile(r'^https?://[^/]+')
+MEDIA_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+def _avif_supported():
+    try:
+        import pillow_avif  # noqa: F401 - registers the AVIF codec with Pillow
+        return True
+    except ImportError:
+        from PIL import features
+        return bool(features.check('avif'))  # built in from Pillow 11
+
+
+def variant_path(digest, width, fmt):
+    return MEDIA_DIR / 'images' / digest[:2] / f"{digest}-{width}.{fmt}"
+
+
+def media_url(digest, width=DEFAULT_WIDTH):
+    return f"{MEDIA_BASE_URL}/api/media/{digest}-{width}"
+
+
+def render_thumbnails(data, digest):
+    """Resize one image into every width/format (runs in a worker process)"""
+    from PIL import Image
+
+    formats = ['webp'] + (['avif'] if _avif_supported() else [])
+    written = []
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        image = source.convert('RGBA' if source.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for width in THUMBNAIL_WIDTHS:
+            resized = image.copy()
+            # Never upscale; keep aspect ratio
+            resized.thumbnail((width, width * 4), Image.LANCZOS)
+            for fmt in formats:
+                path = variant_path(digest, width, fmt)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(path.suffix + '.tmp')
+                if fmt == 'webp':
+                    resized.save(tmp_path, 'WEBP', quality=WEBP_QUALITY, method=4)
+                else:
+                    resized.save(tmp_path, 'AVIF', quality=AVIF_QUALITY)
+                os.replace(tmp_path, path)
+                written.append(path.name)
+    return written
+
+
+def resolve_variant(image_id, accept=''):
+    """Pick the best file on disk for an image id and Accept header"""
+    if not IMAGE_ID_RE.match(image_id):
+        return None, None
+    digest, width = image_id.rsplit('-', 1)
+    preferred = ['avif', 'webp'] if 'image/avif' in (accept or '') else ['webp']
+    for fmt in preferred:
+        path = variant_path(digest, width, fmt)
+        if path.exists():
+            return path, MEDIA_TYPES[fmt]
+    return None, None
+
+
+class MediaStore:
+    """Thumbnail variants in the GridFS bucket, cached under MEDIA_DIR"""
+
+    def __init__(self, database):
+        self.database = database
+        self.files = database[f'{MEDIA_BUCKET}.files']
+
+    def _bucket(self):
+        from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+        return AsyncIOMotorGridFSBucket(self.database, bucket_name=MEDIA_BUCKET)
+
+    async def stored(self, digests):
+        """The digests whose default variant is in the bucket"""
+        names = {variant_path(digest, DEFAULT_WIDTH, 'webp').name: digest for digest in digests}
+        if not names:
+            return set()
+        cursor = self.files.find({'filename': {'$in': list(names)}}, {'filename': 1})
+        return {names[doc['filename']] async for doc in cursor}
+
+    async def save(self, digest):
+        """Upload the locally rendered variants of one image"""
+        bucket = self._bucket()
+        for width in THUMBNAIL_WIDTHS:
+            for fmt in MEDIA_TYPES:
+                path = variant_path(digest, width, fmt)
+                if not path.exists() or await self.files.find_one({'filename': path.name}, {'_id': 1}):
+                    continue
+                await bucket.upload_from_stream(path.name, path.read_bytes(),
+                                                metadata={'hash': digest, 'width': width, 'format': fmt})
+
+    async def restore(self, image_id, accept=''):
+        """Fetch a variant missing from the local cache; (path, media type) or (None, None)"""
+        if not IMAGE_ID_RE.match(image_id):
+            return None, None
+        digest, width = image_id.rsplit('-', 1)
+        preferred = ['avif', 'webp'] if 'image/avif' in (accept or '') else ['webp']
+        for fmt in preferred:
+            path = variant_path(digest, width, fmt)
+            doc = await self.files.find_one({'filename': path.name}, {'_id': 1})
+            if not doc:
+                continue
+            stream = await self._bucket().open_download_stream(doc['_id'])
+            data = await stream.read()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + f'.{os.getpid()}.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            return path, MEDIA_TYPES[fmt]
+        return None, None
+
+
+async def source_url_for(database, image_id):
+    """Original URL of a mirrored image, for when its variants are gone"""
+    if not IMAGE_ID_RE.match(image_id):
+        return None
+    tool = await database.tools.find_one({'image_mirror.hash': image_id.rsplit('-', 1)[0]},
+                                         {'image_source_url': 1})
+    return tool.get('image_source_url') if tool else None
+
+
+async def _download(session, semaphore, url):
+    import aiohttp
+
+    async with semaphore:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            if response.status != 200:
+                raise ValueError(f"status {response.status}")
+            data = await response.content.read(MAX_IMAGE_BYTES + 1)
+            if len(data) > MAX_IMAGE_BYTES:
+                raise ValueError("image too large")
+            return data
+
+
+async def _mirror_one(tool, source_url, session, semaphore, executor, database, store):
+    """Mirror one tool's image; returns (ok, whether image_url changed)"""
+    now = datetime.now(timezone.utc)
+    mirror = {'source_url': source_url, 'mirrored_at': now}
+    update = {}
+    try:
+        data = await _download(session, semaphore, source_url)
+        digest = hashlib.sha256(data).hexdigest()
+        # Content-addressed: identical images across tools are rendered once
+        if not await store.stored({digest}):
+            if not variant_path(digest, DEFAULT_WIDTH, 'webp').exists():
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(executor, render_thumbnails, data, digest)
+            await store.save(digest)
+        local_url = media_url(digest)
+        mirror.update({'hash': digest, 'url': local_url, 'widths': list(THUMBNAIL_WIDTHS)})
+        update = {'image_url': local_url, 'image_source_url': source_url}
+        ok = True
+    except Exception as e:
+        # Remember the failure against this URL so it is not retried every run;
+        # a lost mirror falls back to the original URL
+        mirror.update({'url': source_url, 'error': str(e)[:200]})
+        update = {'image_url': source_url}
+        ok = False
+    changed = update['image_url'] != tool['image_url']
+    if changed:
+        update['updated_at'] = now  # re-keys the prerendered page and the static export
+    update['image_mirror'] = mirror
+    await database.tools.update_one({'id': tool['id']}, {'$set': update})
+    return ok, changed
+
+
+async def lost_mirrors(database, store):
+    """Mirrored tools whose variants are in neither the bucket nor the local cache
+
+    Variants only found locally (mirrored before the bucket existed) are uploaded
+    on the way.
+    """
+    cursor = database.tools.find({'image_mirror.hash': {'$exists': True}, 'image_source_url': {'$exists': True}},
+                                 {'id': 1, 'image_url': 1, 'image_source_url': 1, 'image_mirror.hash': 1})
+    tools = [tool async for tool in cursor if tool['image_url'] == media_url(tool['image_mirror']['hash'])]
+    stored = await store.stored({tool['image_mirror']['hash'] for tool in tools})
+    lost = []
+    for tool in tools:
+        digest = tool['image_mirror']['hash']
+        if digest in stored:
+            continue
+        if variant_path(digest, DEFAULT_WIDTH, 'webp').exists():
+            await store.save(digest)
+            stored.add(digest)
+        else:
+            lost.append(tool)
+    return lost
+
+
+async def mirror_images(database, limit=None, notify=True):
+    """Mirror every tool whose image_url is remote and not mirrored yet, or whose mirror was lost
+
+    Tools whose image_url changed are passed to catalog_changed unless notify is
+    False (sync runs notify once for the whole run).
+    """
+    import aiohttp
+
+    if not ABSOLUTE_URL_RE.match(MEDIA_BASE_URL):
+        # A relative image_url would resolve against the frontend host
+        print("⚠️  MEDIA_BASE_URL is not an absolute URL; images are not mirrored")
+        return {'mirrored': 0, 'failed': 0, 'changed': []}
+
+    store = MediaStore(database)
+    query = {
+        'image_url': {'$regex': '^https?://', '$not': re.compile('^' + re.escape(MEDIA_BASE_URL))},
+        # Re-mirror when image_url no longer matches the last mirrored/attempted URL
+        '$expr': {'$ne': ['$image_url', '$image_mirror.url']},
+    }
+    cursor = database.tools.find(query, {'id': 1, 'image_url': 1})
+    jobs = [(tool, tool['image_url']) for tool in await cursor.to_list(length=limit)]
+    jobs += [(tool, tool['image_source_url']) for tool in await lost_mirrors(database, store)]
+    if not jobs:
+        return {'mirrored': 0, 'failed': 0, 'changed': []}
+
+    print(f"🖼️  Mirroring {len(jobs)} tool images...")
+    semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    with ProcessPoolExecutor() as executor:
+        async with aiohttp.ClientSession() as session:
+            results = await asyncio.gather(*[
+                _mirror_one(tool, source_url, session, semaphore, executor, database, store)
+                for tool, source_url in jobs
+            ])
+    mirrored = sum(ok for ok, _ in results)
+    changed = [tool['id'] for (tool, _), (_, tool_changed) in zip(jobs, results) if tool_changed]
+    print(f"   ✅ {mirrored} mirrored, {len(results) - mirrored} failed")
+    if notify and changed:
+        from catalog_hooks import catalog_changed, TOOLS
+        await catalog_changed(database, TOOLS, changed)
+    return {'mirrored': mirrored, 'failed': len(results) - mirrored, 'changed': changed}
+
+
+async def main():
+    from database import get_db, close_client
+    try:
+        await mirror_images(get_db())
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+Prometheus metrics for the API
+GET /metrics exposes:
+- request counts and latency histograms per route template
+- in-flight requests
+- Mongo command durations by collection and operation
+- sync job gauges, including the HTTP cache hit ratio of the latest sync run
+
+Mongo timings come from a pymongo CommandListener, so they also cover syncs
+running inside the API process.
+"""
+import os
+import time
+from datetime import timezone
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+from starlette.responses import Response
+
+# Configuration
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+IGNORED_COMMANDS = {'hello', 'ismaster', 'isMaster', 'ping', 'endSessions', 'saslStart', 'saslContinue', 'buildInfo'}
+UNMATCHED_ROUTE = 'unmatched'  # 404s and scanners must not create a label per path
+
+HTTP_REQUESTS = Counter('aibox_http_requests_total', 'HTTP requests', ['method', 'route', 'status'])
+HTTP_LATENCY = Histogram('aibox_http_request_duration_seconds', 'HTTP request latency',
+                         ['method', 'route'], buckets=HTTP_BUCKETS)
+HTTP_IN_FLIGHT = Gauge('aibox_http_requests_in_flight', 'HTTP requests being served', ['method'])
+MONGO_LATENCY = Histogram('aibox_mongo_command_duration_seconds', 'Mongo command latency',
+                          ['collection', 'command'], buckets=MONGO_BUCKETS)
+MONGO_FAILURES = Counter('aibox_mongo_command_failures_total', 'Failed Mongo commands', ['collection', 'command'])
+SYNC_RUNNING = Gauge('aibox_sync_running', 'Sync runs currently running')
+SYNC_LAST_STARTED = Gauge('aibox_sync_last_run_started_timestamp_seconds', 'Start time of the latest sync run')
+SYNC_LAST_DURATION = Gauge('aibox_sync_last_run_duration_seconds', 'Duration of the latest finished sync run')
+SYNC_LAST_TOOLS = Gauge('aibox_sync_last_run_tools', 'Tools in the latest sync run', ['state'])
+SYNC_CACHE_HIT_RATIO = Gauge('aibox_sync_http_cache_hit_ratio',
+                             'Share of detail pages answered 304 Not Modified in the latest sync run')
+
+
+def route_template(scope):
+    """'/api/tools/{tool_id}' for a matched route, else UNMATCHED_ROUTE"""
+    route = scope.get('route')  # set by FastAPI's router on the shared scope
+    return getattr(route, 'path', None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] == '/metrics':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        HTTP_IN_FLIGHT.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.labels(method).dec()
+            route = route_template(scope)
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+
+
+def command_collection(command_name, command):
+    """Collection a command targets ('getMore' names it in 'collection')"""
+    if command_name == 'getMore':
+        target = command.get('collection')
+    else:
+        target = command.get(command_name)
+    return target if isinstance(target, str) else '-'
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times Mongo commands by collection and operation"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self._collections[(event.connection_id, event.request_id)] = command_collection(
+                event.command_name, event.command)
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), None)
+        if collection is not None:
+            MONGO_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), None)
+        if collection is not None:
+            MONGO_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+            MONGO_FAILURES.labels(collection, event.command_name).inc()
+
+
+def _cache_stats(run):
+    """HTTP cache counters of a run (summed over crawl workers)"""
+    stats = [run['http_cache']] if run.get('http_cache') else [
+        worker['http_cache'] for worker in (run.get('workers') or {}).values() if worker.get('http_cache')
+    ]
+    return sum(s.get('hits', 0) for s in stats), sum(s.get('misses', 0) for s in stats)
+
+
+async def refresh_sync_gauges(database):
+    """Sync gauges are read from sync_runs at scrape time (syncs may run in other processes)"""
+    SYNC_RUNNING.set(await database.sync_runs.count_documents({'status': 'running'}))
+    run = await database.sync_runs.find_one({}, {'_id': 0}, sort=[('started_at', -1)])
+    if not run:
+        return
+    if run.get('started_at'):
+        SYNC_LAST_STARTED.set(run['started_at'].replace(tzinfo=timezone.utc).timestamp())  # stored as naive UTC
+        if run.get('finished_at'):
+            SYNC_LAST_DURATION.set((run['finished_at'] - run['started_at']).total_seconds())
+    for state in ('discovered', 'processed', 'saved', 'failed'):
+        if state in run:
+            SYNC_LAST_TOOLS.labels(state).set(run[state])
+    hits, misses = _cache_stats(run)
+    if hits + misses:
+        SYNC_CACHE_HIT_RATIO.set(hits / (hits + misses))
+
+
+def install_metrics(app, get_db):
+    """Add the middleware, the Mongo listener and GET /metrics to app
+
+    Call before the first Mongo client is created: pymongo only attaches
+    globally registered listeners to new clients.
+    """
+    if not METRICS_ENABLED:
+        return
+    monitoring.register(MongoCommandMetrics())
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get('/metrics', include_in_schema=False)
+    async def metrics():
+        try:
+            await refresh_sync_gauges(get_db())
+        except Exception:
+            pass  # still serve the request metrics if Mongo is down
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,111 @@
+"""
+Content-addressed archive of fetched page DOMs
+Every rendered listing/detail page is stored once per distinct content as
+gzip under archive/objects/ab/<sha256>.html.gz; the `page_archive` collection
+maps URLs to the snapshots seen, so extractors can be re-run offline
+(see reextract.py) when the source's markup or our selectors change.
+"""
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+
+# Configuration
+PAGE_ARCHIVE_DIR = Path(os.environ.get('PAGE_ARCHIVE_DIR', ROOT_DIR / 'archive'))
+PAGE_ARCHIVE_ENABLED = os.environ.get('PAGE_ARCHIVE_ENABLED', '1') == '1'
+COMPRESS_LEVEL = 9  # written once, read rarely
+
+# Snapshot kinds
+LISTING = 'listing'
+DETAIL = 'detail'
+
+
+class PageArchive:
+    """Deduplicating gzip store for page snapshots"""
+
+    def __init__(self, archive_dir=None, enabled=None):
+        self.archive_dir = Path(archive_dir or PAGE_ARCHIVE_DIR)
+        self.enabled = PAGE_ARCHIVE_ENABLED if enabled is None else enabled
+        self.stats = {'stored': 0, 'deduplicated': 0, 'bytes_raw': 0, 'bytes_compressed': 0}
+
+    def path_for(self, digest):
+        return self.archive_dir / 'objects' / digest[:2] / f"{digest}.html.gz"
+
+    def put(self, html):
+        """Store html (if new) and return its sha256"""
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self.path_for(digest)
+        if path.exists():
+            self.stats['deduplicated'] += 1
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = gzip.compress(raw, COMPRESS_LEVEL)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(compressed)
+        os.replace(tmp, path)  # never leave a truncated object behind
+        self.stats['stored'] += 1
+        self.stats['bytes_raw'] += len(raw)
+        self.stats['bytes_compressed'] += len(compressed)
+        return digest
+
+    def read(self, digest):
+        try:
+            return gzip.decompress(self.path_for(digest).read_bytes()).decode('utf-8')
+        except (OSError, EOFError):
+            return None
+
+    async def save(self, database, url, kind, html, source_url=None):
+        """Archive a page snapshot and index it under url; returns the digest"""
+        if not self.enabled or not html:
+            return None
+        try:
+            digest = self.put(html)
+            now = datetime.now(timezone.utc)
+            await database.page_archive.update_one(
+                {'url': url, 'sha256': digest},
+                {
+                    '$set': {'kind': kind, 'source_url': source_url, 'last_seen': now},
+                    '$setOnInsert': {'first_seen': now, 'size': len(html)},
+                },
+                upsert=True
+            )
+            return digest
+        except Exception as e:
+            # Archiving is best effort, never fail a sync over it
+            print(f"      ⚠️  Could not archive {url}: {str(e)}")
+            return None
+
+    @staticmethod
+    async def ensure_indexes(database):
+        await database.page_archive.create_index([('url', 1), ('sha256', 1)], unique=True)
+        await database.page_archive.create_index([('kind', 1), ('last_seen', -1)])
+
+    @staticmethod
+    async def latest(database, kind=None, since=None):
+        """Newest snapshot per URL: [{'url', 'kind', 'sha256', 'last_seen'}]"""
+        match = {}
+        if kind:
+            match['kind'] = kind
+        if since:
+            match['last_seen'] = {'$gte': since}
+        pipeline = [
+            {'$match': match},
+            {'$sort': {'last_seen': -1}},
+            {'$group': {
+                '_id': '$url',
+                'kind': {'$first': '$kind'},
+                'sha256': {'$first': '$sha256'},
+                'last_seen': {'$first': '$last_seen'},
+            }},
+            {'$project': {'_id': 0, 'url': '$_id', 'kind': 1, 'sha256': 1, 'last_seen': 1}},
+        ]
+        return await database.page_archive.aggregate(pipeline).to_list(length=None)
+
+    def summary(self):
+        saved = self.stats['bytes_raw'] - self.stats['bytes_compressed']
+        return (f"{self.stats['stored']} new snapshots, {self.stats['deduplicated']} unchanged, "
+                f"{saved // 1024} KB saved by compression")
@@ -0,0 +1,385 @@
+"""
+Pre-rendered HTML snapshots of the tool detail pages
+The detail page is a client-rendered route, so crawlers and link previews see
+an empty shell. This module renders each active tool into the frontend's
+index.html: title, description, Open Graph and JSON-LD tags from the tool and
+the site settings, plus the page content, which React then replaces on load.
+
+Snapshots are stored gzipped under PRERENDER_DIR, keyed by the tool's and the
+settings' updated_at, and the hottest are kept in memory. Admin edits and
+sync runs re-render the tools they touched (see catalog_hooks.py); anything
+else that went stale renders again on its next request.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from html import escape
+from urllib.parse import quote
+
+from html_sanitizer import SAFE_URL_RE, sanitize_html
+from request_timing import record_cache
+from sitemap import SITE_URL, TOOL_PATH
+
+# Configuration
+PRERENDER_DIR = os.environ.get('PRERENDER_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prerender'))
+PRERENDER_TEMPLATE = os.environ.get('PRERENDER_TEMPLATE')  # the built frontend index.html; a bare shell if unset
+PRERENDER_MEMORY_SIZE = int(os.environ.get('PRERENDER_MEMORY_SIZE', 1000))  # snapshots kept in memory
+SETTINGS_CHECK_SECONDS = 30  # site settings re-read interval (other processes' edits)
+PRERENDER_CACHE_CONTROL = 'public, max-age=3600, s-maxage=86400, stale-while-revalidate=604800'
+RENDER_VERSION = 1  # bump when the markup below changes, to re-key every snapshot
+GZIP_LEVEL = 6
+
+MARK_FILE = '.rendered_through'  # last bulk render, per snapshot directory
+VALID_TOOL_ID = re.compile(r'^[A-Za-z0-9_-]+$')
+DEFAULT_SETTINGS = {
+    'site_name': 'AI Tools Directory',
+    'meta_description': 'Discover the best AI tools for your needs',
+}
+
+SHELL_TEMPLATE = """<!doctype html>
+<html lang="en">
+    <head>
+        <meta charset="utf-8" />
+        <meta name="viewport" content="width=device-width, initial-scale=1" />
+        <title>AI BOX FOR YOU</title>
+    </head>
+    <body>
+        <div id="root"></div>
+    </body>
+</html>
+"""
+
+TITLE_TAG = re.compile(r'<title>.*?</title>', re.S)
+DESCRIPTION_TAG = re.compile(r'\s*<meta name="description"[^>]*>')
+ROOT_DIV = re.compile(r'<div id="root">\s*</div>')
+
+
+def _iso(value):
+    if value is None:
+        return ''
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # Mongo hands back naive UTC
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _absolute(url):
+    return SITE_URL + url if url and url.startswith('/') else url
+
+
+def _safe_url(url):
+    """url if its scheme is safe to link (http(s), mailto, relative), else None"""
+    url = (url or '').strip()
+    return url if url and SAFE_URL_RE.match(url) else None
+
+
+def load_template(path=PRERENDER_TEMPLATE):
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    return SHELL_TEMPLATE
+
+
+_template = None
+
+
+def template():
+    global _template
+    if _template is None:
+        _template = load_template()
+    return _template
+
+
+def snapshot_key(tool, settings):
+    """Changes whenever the tool, the site settings, the template or the markup change"""
+    parts = [str(RENDER_VERSION), _iso(tool.get('updated_at') or tool.get('created_at')),
+             _iso(settings.get('updated_at')), hashlib.sha1(template().encode('utf-8')).hexdigest()]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+# --- Rendering ---
+
+def head_tags(tool, settings):
+    site_name = settings.get('site_name') or DEFAULT_SETTINGS['site_name']
+    title = f"{tool['name']} - {site_name}"
+    description = tool.get('description') or settings.get('meta_description') or ''
+    url = SITE_URL + TOOL_PATH.format(id=tool['id'])
+    image = _absolute(_safe_url(tool.get('image_url')))
+    tags = [
+        f'<title>{escape(title)}</title>',
+        f'<meta name="description" content="{escape(description)}" />',
+        f'<link rel="canonical" href="{escape(url)}" />',
+        '<meta property="og:type" content="website" />',
+        f'<meta property="og:site_name" content="{escape(site_name)}" />',
+        f'<meta property="og:title" content="{escape(title)}" />',
+        f'<meta property="og:description" content="{escape(description)}" />',
+        f'<meta property="og:url" content="{escape(url)}" />',
+        f'<meta name="twitter:card" content="{"summary_large_image" if image else "summary"}" />',
+    ]
+    if tool.get('tags'):
+        tags.append(f'<meta name="keywords" content="{escape(", ".join(tool["tags"]))}" />')
+    if image:
+        tags.append(f'<meta property="og:image" content="{escape(image)}" />')
+    structured = {
+        '@context': 'https://schema.org',
+        '@type': 'SoftwareApplication',
+        'name': tool['name'],
+        'description': description,
+        'url': _safe_url(tool.get('website_url')) or url,
+        'applicationCategory': tool.get('category'),
+    }
+    if image:
+        structured['image'] = image
+    if tool.get('price_type') == 'Free':
+        structured['offers'] = {'@type': 'Offer', 'price': '0', 'priceCurrency': 'USD'}
+    # '</' would close the script element early
+    ld_json = json.dumps(structured, ensure_ascii=False).replace('</', '<\\/')
+    tags.append(f'<script type="application/ld+json">{ld_json}</script>')
+    return '\n        '.join(tags)
+
+
+def body_html(tool):
+    """The detail page content, for crawlers and the first paint"""
+    category = escape(tool.get('category') or '')
+    parts = [
+        f'<nav><a href="/">Home</a> / <a href="/?category={escape(quote(tool.get("category") or ""))}">{category}</a>'
+        f' / <span>{escape(tool["name"])}</span></nav>',
+        '<main>',
+    ]
+    # Admin-entered URLs: a javascript: link would live as long as the cached snapshot
+    image_url = _safe_url(tool.get('image_url'))
+    website_url = _safe_url(tool.get('website_url'))
+    if image_url:
+        parts.append(f'<img src="{escape(image_url)}" alt="{escape(tool["name"])}" />')
+    parts.append(f'<h1>{escape(tool["name"])}</h1>')
+    parts.append(f'<p>{category} · {escape(tool.get("price_type") or "")}</p>')
+    if tool.get('tags'):
+        parts.append('<ul>' + ''.join(f'<li>{escape(tag)}</li>' for tag in tool['tags']) + '</ul>')
+    if tool.get('description'):
+        parts.append(f'<p>{escape(tool["description"])}</p>')
+    if tool.get('description_full'):
+        parts.append(f'<div>{sanitize_html(tool["description_full"])}</div>')  # admin input is not sanitized at ingest
+    if website_url:
+        parts.append(f'<a href="{escape(website_url)}" rel="noopener">Visit website</a>')
+    parts.append('</main>')
+    return ''.join(parts)
+
+
+def render_tool(tool, settings, page=None):
+    """The full HTML document of one tool's detail page"""
+    page = page or template()
+    page = DESCRIPTION_TAG.sub('', page, count=1)
+    head = head_tags(tool, settings)
+    page = TITLE_TAG.sub(lambda _: head, page, count=1) if TITLE_TAG.search(page) \
+        else page.replace('</head>', f'{head}\n</head>', 1)
+    return ROOT_DIV.sub(lambda _: f'<div id="root">{body_html(tool)}</div>', page, count=1)
+
+
+# --- Storage ---
+
+class SnapshotStore:
+    """Gzipped snapshots on disk, one current key per tool, the hottest also in memory"""
+
+    def __init__(self, directory=PRERENDER_DIR, memory_size=PRERENDER_MEMORY_SIZE):
+        self.directory = directory
+        self.memory_size = memory_size
+        self.memory = OrderedDict()  # tool id -> (key, body)
+
+    def _path(self, tool_id, key):
+        return os.path.join(self.directory, tool_id, f'{key}.html.gz')  # a directory per tool keeps pruning cheap
+
+    def _remember(self, tool_id, key, body):
+        self.memory[tool_id] = (key, body)
+        self.memory.move_to_end(tool_id)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get(self, tool_id, key):
+        cached = self.memory.get(tool_id)
+        if cached and cached[0] == key:
+            self.memory.move_to_end(tool_id)
+            return cached[1]
+        try:
+            with open(self._path(tool_id, key), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(tool_id, key, body)
+        return body
+
+    def put(self, tool_id, key, body):
+        path = self._path(tool_id, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f'{path}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as f:
+            f.write(body)
+        os.replace(temp, path)  # readers in other processes never see a partial file
+        self._remove(tool_id, keep=path)
+        self._remember(tool_id, key, body)
+
+    def _remove(self, tool_id, keep=None):
+        folder = os.path.join(self.directory, tool_id)
+        if not os.path.isdir(folder):
+            return
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if name.endswith('.html.gz') and path != keep:
+                os.remove(path)
+
+    def drop(self, tool_id):
+        self.memory.pop(tool_id, None)
+        self._remove(tool_id)
+        try:
+            os.rmdir(os.path.join(self.directory, tool_id))
+        except OSError:
+            pass
+
+    def tool_ids(self):
+        if not os.path.isdir(self.directory):
+            return set()
+        return {name for name in os.listdir(self.directory) if os.path.isdir(os.path.join(self.directory, name))}
+
+    def clear_memory(self):
+        self.memory.clear()
+
+    def read_mark(self):
+        try:
+            with open(os.path.join(self.directory, MARK_FILE)) as f:
+                return datetime.fromisoformat(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_mark(self, value):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, MARK_FILE), 'w') as f:
+            f.write(value.isoformat())
+
+
+class SettingsCache:
+    """The site settings document, re-read at most every check_seconds"""
+
+    def __init__(self, check_seconds=SETTINGS_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self.settings = None
+        self.checked_at = 0.0
+
+    async def current(self, database):
+        stale = self.settings is None or time.monotonic() - self.checked_at >= self.check_seconds
+        record_cache(not stale)
+        if stale:
+            self.settings = await database.site_settings.find_one({}, {'_id': 0}) or dict(DEFAULT_SETTINGS)
+            self.checked_at = time.monotonic()
+        return self.settings
+
+    def reset(self):
+        self.settings = None
+
+
+snapshot_store = SnapshotStore()
+settings_cache = SettingsCache()
+
+
+def store_snapshot(tool, settings, store=None):
+    """Render and store one tool; returns (key, gzip body)"""
+    store = store or snapshot_store
+    key = snapshot_key(tool, settings)
+    body = gzip.compress(render_tool(tool, settings).encode('utf-8'), GZIP_LEVEL)
+    store.put(tool['id'], key, body)
+    return key, body
+
+
+async def snapshot(database, tool_id, store=None):
+    """(key, gzip body) of an active tool's page, rendered on a miss; None when there is no such tool"""
+    store = store or snapshot_store
+    tool = await database.tools.find_one({'id': tool_id},
+                                         {'_id': 0, 'id': 1, 'is_active': 1, 'updated_at': 1, 'created_at': 1})
+    if not tool or not tool.get('is_active', True):
+        return None
+    settings = await settings_cache.current(database)
+    key = snapshot_key(tool, settings)
+    body = store.get(tool_id, key)
+    record_cache(body is not None)
+    if body is not None:
+        return key, body
+    tool = await database.tools.find_one({'id': tool_id}, {'_id': 0})
+    if not tool:
+        return None
+    return store_snapshot(tool, settings, store)
+
+
+# --- Regeneration ---
+
+async def update_tools(database, ids, store=None):
+    """Re-render (or drop) the snapshots of the given tools"""
+    store = store or snapshot_store
+    settings = await settings_cache.current(database)
+    for tool_id in ids:
+        tool = await database.tools.find_one({'id': tool_id}, {'_id': 0})
+        if tool and tool.get('is_active', True):
+            store_snapshot(tool, settings, store)
+        else:
+            store.drop(tool_id)
+
+
+async def render_changed(database, store=None):
+    """After a bulk change: render tools updated since the last run, drop inactive and deleted ones"""
+    store = store or snapshot_store
+    started = datetime.now(timezone.utc)
+    since = store.read_mark()
+    settings = await settings_cache.current(database)
+    query = {'is_active': {'$ne': False}}
+    if since is not None:
+        query['updated_at'] = {'$gte': since}
+    rendered = 0
+    async for tool in database.tools.find(query, {'_id': 0}):
+        store_snapshot(tool, settings, store)
+        rendered += 1
+    active = {tool['id'] async for tool in database.tools.find({'is_active': {'$ne': False}}, {'_id': 0, 'id': 1})}
+    stale = store.tool_ids() - active
+    for tool_id in stale:
+        store.drop(tool_id)
+    store.write_mark(started)
+    print(f"🖼️  Pre-rendered {rendered} tool pages, dropped {len(stale)}")
+
+
+async def on_catalog_change(database, kind, ids):
+    """catalog_hooks listener"""
+    from catalog_hooks import TOOLS, SETTINGS
+    if kind == SETTINGS:
+        # Every key changes with the settings; pages re-render as they are requested
+        settings_cache.reset()
+        snapshot_store.clear_memory()
+    elif kind == TOOLS:
+        if ids is None:
+            await render_changed(database)
+        else:
+            await update_tools(database, ids)
+
+
+# --- Serving ---
+
+async def snapshot_response(request, database, tool_id):
+    """Gzip (or plain for clients that refuse gzip) HTML with ETag revalidation"""
+    from starlette.responses import Response
+
+    found = await snapshot(database, tool_id) if VALID_TOOL_ID.match(tool_id) else None
+    if found is None:
+        return Response(status_code=404)
+    key, body = found
+    etag = f'"{key}"'
+    headers = {
+        'Cache-Control': PRERENDER_CACHE_CONTROL,
+        'ETag': etag,
+        'Vary': 'Accept-Encoding',
+    }
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+    else:
+        body = gzip.decompress(body)
+    return Response(content=body, media_type='text/html', headers=headers)
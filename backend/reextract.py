@@ -0,0 +1,191 @@
+"""
+Re-run the page extractors over the archived DOM snapshots
+Each worker process keeps its own headless Chromium and replays snapshots
+from page_archive.py with every network request blocked, so fixing a
+selector in sync_tools_playwright.py can be applied to all known tools
+without re-scraping the source.
+
+Usage:
+    python reextract.py                      # latest snapshot of every page
+    python reextract.py --kind detail --since 2025-10-01 --workers 8
+    python reextract.py --dry-run            # report changes, write nothing
+"""
+import argparse
+import asyncio
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from browser_pool import BROWSER_HEADLESS
+from catalog_hooks import catalog_changed, TOOLS
+from html_sanitizer import sanitize_html
+from page_archive import PageArchive, PAGE_ARCHIVE_DIR, LISTING, DETAIL
+from scraper_fixtures import SCRIPT_RE
+
+# Configuration
+REEXTRACT_WORKERS = int(os.environ.get('REEXTRACT_WORKERS', 4))
+
+_playwright = None
+_browser = None
+
+
+def _init_worker(headless):
+    """Process pool initializer: one browser per worker, reused for every snapshot"""
+    global _playwright, _browser
+    from playwright.sync_api import sync_playwright
+    _playwright = sync_playwright().start()
+    _browser = _playwright.chromium.launch(headless=headless)
+    atexit.register(_close_worker)
+
+
+def _close_worker():
+    if _browser:
+        _browser.close()
+    if _playwright:
+        _playwright.stop()
+
+
+def extract_snapshot(entry, archive_dir):
+    """Load one archived DOM under its original URL (offline) and run its extractor"""
+    from sync_tools_playwright import DETAIL_EXTRACTOR_JS, LISTING_EXTRACTOR_JS
+
+    html = PageArchive(archive_dir).read(entry['sha256'])
+    if html is None:
+        return {**entry, 'error': 'snapshot missing from archive'}
+    # The snapshot is already rendered; its scripts must not run again
+    html = SCRIPT_RE.sub('', html)
+
+    context = _browser.new_context()
+    try:
+        page = context.new_page()
+
+        def handle(route):
+            request = route.request
+            if request.is_navigation_request() and request.frame.parent_frame is None:
+                route.fulfill(status=200, content_type='text/html; charset=utf-8', body=html)
+            else:
+                route.abort()  # images, styles, XHR: never leave the machine
+
+        page.route('**/*', handle)
+        page.goto(entry['url'], wait_until='domcontentloaded')
+        script = DETAIL_EXTRACTOR_JS if entry['kind'] == DETAIL else LISTING_EXTRACTOR_JS
+        result = page.evaluate(script)
+        if entry['kind'] == DETAIL:
+            result['description_full'] = sanitize_html(result.get('description_full') or '')
+        return {**entry, 'result': result}
+    except Exception as e:
+        return {**entry, 'error': str(e)}
+    finally:
+        context.close()
+
+
+async def apply_details(database, url, details, modifier, dry_run=False):
+    """Update the tool behind a detail page; True if anything changed"""
+    tool = await database.tools.find_one(
+        {'website_url': url},
+        {'_id': 0, 'id': 1, 'name': 1, 'category': 1, 'price_type': 1, 'description_full': 1, 'needs_refetch': 1}
+    )
+    if not tool:
+        return False
+    changed = tool.get('needs_refetch') or any(
+        tool.get(field) != details[field] for field in ('category', 'price_type', 'description_full')
+    )
+    if not changed:
+        return False
+    print(f"🔄 {tool['name']}: {tool.get('category')} -> {details['category']}, "
+          f"{tool.get('price_type')} -> {details['price_type']}")
+    if dry_run:
+        return True
+    await database.tools.update_one(
+        {'id': tool['id']},
+        {
+            '$set': {
+                'category': details['category'],
+                'price_type': details['price_type'],
+                'description': modifier.modify_description(details['description_short'])[:200],
+                'description_full': details['description_full'],
+                'updated_at': datetime.now(timezone.utc),
+                'reextracted_at': datetime.now(timezone.utc),
+            },
+            '$unset': {'needs_refetch': '', 'refetch_reason': ''},
+        }
+    )
+    return True
+
+
+async def apply_listing(database, tools, dry_run=False):
+    """Fill in images/tags the live listing scrape missed; returns (updated, unknown)"""
+    updated = unknown = 0
+    for listed in tools:
+        tool = await database.tools.find_one({'website_url': listed['website_url']},
+                                             {'_id': 0, 'id': 1, 'image_url': 1, 'tags': 1})
+        if not tool:
+            unknown += 1
+            continue
+        fields = {}
+        if not tool.get('image_url') and listed.get('image_url'):
+            fields['image_url'] = listed['image_url']
+        if not tool.get('tags') and listed.get('tags'):
+            fields['tags'] = listed['tags'][:10]
+        if fields:
+            updated += 1
+            if not dry_run:
+                fields['updated_at'] = datetime.now(timezone.utc)
+                await database.tools.update_one({'id': tool['id']}, {'$set': fields})
+    return updated, unknown
+
+
+async def reextract(database, kind=None, since=None, workers=REEXTRACT_WORKERS,
+                    archive_dir=PAGE_ARCHIVE_DIR, dry_run=False):
+    """Re-run extractors over the newest snapshot of each archived page"""
+    from sync_tools_playwright import ContentModifier
+
+    entries = await PageArchive.latest(database, kind, since)
+    print(f"🗄️  {len(entries)} archived pages to re-extract with {workers} workers")
+    stats = {'pages': len(entries), 'tools_updated': 0, 'unknown_tools': 0, 'errors': 0}
+    if not entries:
+        return stats
+
+    modifier = ContentModifier()
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(BROWSER_HEADLESS,)) as pool:
+        futures = [loop.run_in_executor(pool, extract_snapshot, entry, str(archive_dir)) for entry in entries]
+        for future in asyncio.as_completed(futures):
+            outcome = await future
+            if outcome.get('error'):
+                stats['errors'] += 1
+                print(f"⚠️  {outcome['url']}: {outcome['error']}")
+            elif outcome['kind'] == DETAIL:
+                stats['tools_updated'] += int(await apply_details(database, outcome['url'], outcome['result'],
+                                                                  modifier, dry_run))
+            elif outcome['kind'] == LISTING:
+                updated, unknown = await apply_listing(database, outcome['result'], dry_run)
+                stats['tools_updated'] += updated
+                stats['unknown_tools'] += unknown
+
+    if stats['tools_updated'] and not dry_run:
+        await catalog_changed(database, TOOLS)
+    print(f"✅ Re-extraction {'(dry run) ' if dry_run else ''}done: {stats}")
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Re-run extractors over archived pages, offline")
+    parser.add_argument('--kind', choices=[DETAIL, LISTING])
+    parser.add_argument('--since', type=lambda value: datetime.fromisoformat(value).replace(tzinfo=timezone.utc),
+                        help='only snapshots seen since this date (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=REEXTRACT_WORKERS)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    from database import get_db, close_client
+    try:
+        await reextract(get_db(), args.kind, args.since, args.workers, dry_run=args.dry_run)
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,221 @@
+"""
+Per-request timing breakdown
+Every API response gets a Server-Timing header that splits the request into:
+- parse: routing, body parsing, request validation and dependencies
+- app: the endpoint itself, minus its Mongo time
+- db: Mongo round trips, with their count
+- serialize: response_model validation and JSON encoding
+- cache: cache hits and misses, when anything reports them
+
+Mongo calls are attributed to the request through a contextvar, which Motor
+carries into its executor threads, where the pymongo CommandListener runs.
+REQUEST_TIMING_LOG=1 also logs one JSON line per request.
+
+Tests can catch N+1 regressions with assert_max_db_calls(response, n).
+"""
+import inspect
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+# Configuration
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING', '1') == '1'
+REQUEST_TIMING_LOG = os.environ.get('REQUEST_TIMING_LOG', '0') == '1'
+
+logger = logging.getLogger(__name__)
+_current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Timestamps and counters of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.endpoint_started = None
+        self.endpoint_ended = None
+        self.response_started = None
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record_db(self, seconds):
+        self.db_calls += 1
+        self.db_seconds += seconds
+
+    def phases(self):
+        """{name: milliseconds} of the phases seen so far"""
+        end = self.response_started or time.perf_counter()
+        phases = {}
+        if self.endpoint_started is not None:
+            phases['parse'] = self.endpoint_started - self.started
+            if self.endpoint_ended is not None:
+                phases['app'] = max(0.0, self.endpoint_ended - self.endpoint_started - self.db_seconds)
+                phases['serialize'] = end - self.endpoint_ended
+        phases['db'] = self.db_seconds
+        phases['total'] = end - self.started
+        return {name: round(seconds * 1000, 2) for name, seconds in phases.items()}
+
+    def server_timing(self):
+        """Server-Timing header value"""
+        entries = []
+        for name, ms in self.phases().items():
+            entry = f"{name};dur={ms}"
+            if name == 'db':
+                entry += f';desc="{self.db_calls} calls"'
+            entries.append(entry)
+        if self.cache_hits or self.cache_misses:
+            entries.append(f'cache;desc="{self.cache_hits} hits / {self.cache_misses} misses"')
+        return ', '.join(entries)
+
+    def log_record(self, method, path, status):
+        return {
+            'method': method,
+            'path': path,
+            'status': status,
+            'db_calls': self.db_calls,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            **{f'{name}_ms': ms for name, ms in self.phases().items()},
+        }
+
+
+def current_timing():
+    """Timing of the request being served, or None outside a request"""
+    return _current.get()
+
+
+def record_cache(hit):
+    """Count a cache lookup against the current request (no-op outside one)"""
+    timing = _current.get()
+    if timing is not None:
+        if hit:
+            timing.cache_hits += 1
+        else:
+            timing.cache_misses += 1
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware adding the Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                timing.response_started = time.perf_counter()
+                status = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', timing.server_timing().encode('latin-1')))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if REQUEST_TIMING_LOG:
+                logger.info(json.dumps(timing.log_record(scope['method'], scope['path'], status)))
+
+
+def _timed_endpoint(call):
+    """Wrap an endpoint so the timing knows where it starts and ends"""
+    if inspect.iscoroutinefunction(call):
+        @wraps(call)
+        async def timed(*args, **kwargs):
+            timing = _current.get()
+            if timing is not None:
+                timing.endpoint_started = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                if timing is not None:
+                    timing.endpoint_ended = time.perf_counter()
+    else:
+        @wraps(call)
+        def timed(*args, **kwargs):  # runs in the threadpool; the contextvar is copied there
+            timing = _current.get()
+            if timing is not None:
+                timing.endpoint_started = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                if timing is not None:
+                    timing.endpoint_ended = time.perf_counter()
+    return timed
+
+
+def install_request_timing(app):
+    """Time app's routes and register the Mongo listener
+
+    Call after the routers are included (routes are copied on include) and
+    before the Mongo client is created.
+    """
+    if not REQUEST_TIMING_ENABLED:
+        return
+    from pymongo import monitoring
+
+    class DbCallListener(monitoring.CommandListener):
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            timing = _current.get()
+            if timing is not None:
+                timing.record_db(event.duration_micros / 1e6)
+
+        def failed(self, event):
+            self.succeeded(event)
+
+    monitoring.register(DbCallListener())
+    for route in app.router.routes:
+        dependant = getattr(route, 'dependant', None)
+        if dependant is not None and dependant.call is not None:
+            # The request handler looks the endpoint up on the dependant per call
+            dependant.call = _timed_endpoint(dependant.call)
+    app.add_middleware(RequestTimingMiddleware)
+
+
+def parse_server_timing(value):
+    """'db;dur=1.5;desc="2 calls", total;dur=3' -> {'db': {'dur': 1.5, 'desc': '2 calls'}, ...}"""
+    metrics = {}
+    for entry in filter(None, (part.strip() for part in value.split(','))):
+        name, *params = [piece.strip() for piece in entry.split(';')]
+        fields = {}
+        for param in params:
+            key, _, raw = param.partition('=')
+            raw = raw.strip('"')
+            fields[key] = float(raw) if key == 'dur' else raw
+        metrics[name] = fields
+    return metrics
+
+
+def db_calls(response):
+    """Mongo round trips a response's request made (from its Server-Timing header)"""
+    header = response.headers.get('server-timing')
+    if header is None:
+        raise AssertionError("Response has no Server-Timing header (is REQUEST_TIMING enabled?)")
+    desc = parse_server_timing(header).get('db', {}).get('desc', '0 calls')
+    return int(desc.split()[0])
+
+
+def assert_max_db_calls(response, max_calls):
+    """Fail when an endpoint makes more Mongo round trips than its budget (N+1 guard)"""
+    calls = db_calls(response)
+    if calls > max_calls:
+        raise AssertionError(f"{calls} DB calls, expected at most {max_calls} "
+                             f"(Server-Timing: {response.headers.get('server-timing')})")
+    return calls
@@ -0,0 +1,141 @@
+"""
+Retries, deadlines and a circuit breaker for scraper network calls
+A transient failure (timeout, connection error, 429/5xx) is retried with
+bounded exponential backoff; when the source keeps failing the breaker opens
+and the run is aborted instead of saving a pile of degraded tools.
+"""
+import asyncio
+import os
+import random
+import time
+
+# Configuration
+FETCH_ATTEMPTS = int(os.environ.get('FETCH_ATTEMPTS', 3))
+FETCH_TIMEOUT_SECONDS = float(os.environ.get('FETCH_TIMEOUT_SECONDS', 45))  # per attempt
+FETCH_DEADLINE_SECONDS = float(os.environ.get('FETCH_DEADLINE_SECONDS', 120))  # all attempts together
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))  # consecutive failed attempts
+CIRCUIT_RESET_SECONDS = 60
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A request failed for good (retries exhausted or not retryable)"""
+
+
+class TransientHTTPError(FetchError):
+    """Retryable HTTP status"""
+
+    def __init__(self, url, status):
+        super().__init__(f"Status {status} for {url}")
+        self.url = url
+        self.status = status
+
+
+class PermanentHTTPError(FetchError):
+    """HTTP status that retrying will not fix (404, 410, ...)"""
+
+    def __init__(self, url, status):
+        super().__init__(f"Status {status} for {url}")
+        self.url = url
+        self.status = status
+
+
+class CircuitOpenError(Exception):
+    """The source is considered down; abort instead of calling it"""
+
+
+def check_status(url, status):
+    """Raise the matching error for a non-2xx/304 status"""
+    if status is None or status < 400:
+        return
+    if status in RETRYABLE_STATUSES or status >= 500:
+        raise TransientHTTPError(url, status)
+    raise PermanentHTTPError(url, status)
+
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Full-jitter exponential backoff for the given (1-based) failed attempt"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Opens after N consecutive failures, lets one probe through after a cooldown"""
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        if self.state == 'open':
+            raise CircuitOpenError(
+                f"{self.name} is failing ({self.failures} consecutive errors, last: {self.last_error})"
+            )
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self, error):
+        self.failures += 1
+        self.last_error = str(error)[:200]
+        if self.state == 'half-open' or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            print(f"🔌 Circuit open for {self.name} after {self.failures} failures")
+
+
+async def call_with_retries(func, description='request', breaker=None, attempts=FETCH_ATTEMPTS,
+                            timeout=FETCH_TIMEOUT_SECONDS, deadline=FETCH_DEADLINE_SECONDS, before=None):
+    """Await func() with a per-attempt timeout, retrying transient failures
+
+    before() (e.g. a throttle wait) is awaited ahead of every attempt, outside
+    the timeout, so only the network operation itself is timed.
+
+    Raises CircuitOpenError when the breaker is open, PermanentHTTPError
+    straight away, and FetchError once attempts or the deadline run out.
+    """
+    give_up_at = time.monotonic() + deadline if deadline else None
+    last_error = None
+    for attempt in range(1, attempts + 1):
+        if breaker:
+            breaker.before_call()
+        if before:
+            await before()
+        try:
+            result = await asyncio.wait_for(func(), timeout) if timeout else await func()
+        except PermanentHTTPError:
+            if breaker:
+                breaker.record_success()  # the source answered; this URL is just bad
+            raise
+        except (asyncio.CancelledError, CircuitOpenError):
+            raise
+        except Exception as e:
+            last_error = e if not isinstance(e, asyncio.TimeoutError) else TimeoutError(f"timed out after {timeout}s")
+            if breaker:
+                breaker.record_failure(last_error)
+            if attempt == attempts:
+                break
+            delay = backoff_delay(attempt)
+            if give_up_at and time.monotonic() + delay >= give_up_at:
+                break
+            print(f"      🔁 {description} failed ({last_error}), retry {attempt}/{attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            continue
+        if breaker:
+            breaker.record_success()
+        return result
+    raise FetchError(f"{description} failed after {attempt} attempts: {last_error}") from last_error
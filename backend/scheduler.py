@@ -0,0 +1,253 @@
+"""
+In-process asyncio scheduler for sync jobs
+Runs cron-style jobs (with random jitter) on the running event loop, so every
+sync shares the same Mongo client and warm browser pool. Embedded in the API
+with ENABLE_SCHEDULER=1, or run standalone as a worker process:
+
+    python scheduler.py
+"""
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# Configuration
+SYNC_CRON = os.environ.get('SYNC_CRON', '0 2 * * *')  # 2:00 AM UTC daily
+SYNC_JITTER_SECONDS = int(os.environ.get('SYNC_JITTER_SECONDS', 300))
+SYNC_SCRAPER = os.environ.get('SYNC_SCRAPER', 'playwright')  # or 'aiohttp', 'workers' (multi-process)
+MAX_SLEEP_SECONDS = 60  # re-check at least this often (clock changes, new jobs)
+
+CRON_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+# (min, max) for minute, hour, day of month, month, day of week (0 and 7 = Sunday)
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {step_text}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron value out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """Standard 5-field cron expression evaluated in UTC"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        parsed = [_parse_field(f, low, high) for f, (low, high) in zip(fields, CRON_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {d % 7 for d in weekdays}
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+
+    def _day_matches(self, dt):
+        in_days = dt.day in self.days
+        in_weekdays = (dt.isoweekday() % 7) in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return in_days or in_weekdays  # classic cron: either one matches
+        return in_days and in_weekdays
+
+    def next_after(self, dt):
+        """First matching minute strictly after dt"""
+        dt = dt.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+class Job:
+    """A scheduled coroutine function"""
+
+    def __init__(self, name, cron, func, jitter_seconds=0, cancel=None):
+        self.name = name
+        self.cron = CronExpression(cron)
+        self.func = func
+        self.cancel = cancel  # stops work func() hands to other tasks (awaited on shutdown)
+        self.jitter_seconds = jitter_seconds
+        self.next_run = None
+        self.task = None
+        self.last_run = None
+        self.last_duration = None
+        self.last_result = None
+        self.last_error = None
+        self.runs = 0
+        self.schedule_next()
+
+    def schedule_next(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0
+        self.next_run = self.cron.next_after(now) + timedelta(seconds=jitter)
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    async def run(self):
+        self.last_run = datetime.now(timezone.utc)
+        started = time.monotonic()
+        try:
+            self.last_result = await self.func()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Scheduled job {self.name} failed: {str(e)}")
+        finally:
+            self.runs += 1
+            self.last_duration = round(time.monotonic() - started, 1)
+
+    def status(self):
+        return {
+            'name': self.name,
+            'cron': self.cron.expression,
+            'jitter_seconds': self.jitter_seconds,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'running': self.running,
+            'runs': self.runs,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_duration_seconds': self.last_duration,
+            'last_result': self.last_result if isinstance(self.last_result, (int, float, str, dict)) else None,
+            'last_error': self.last_error,
+        }
+
+
+class Scheduler:
+    """Runs due jobs on the current event loop; a job never overlaps itself"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._task = None
+
+    def add_job(self, name, cron, func, jitter_seconds=0, cancel=None):
+        self.jobs[name] = Job(name, cron, func, jitter_seconds, cancel)
+        return self.jobs[name]
+
+    async def _loop(self):
+        while True:
+            now = datetime.now(timezone.utc)
+            for job in self.jobs.values():
+                if job.next_run <= now:
+                    if job.running:
+                        print(f"⏭️  {job.name} still running, skipping this slot")
+                    else:
+                        print(f"\n⏰ Scheduled {job.name} triggered at {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+                        job.task = asyncio.create_task(job.run())
+                    job.schedule_next(now)
+            upcoming = min((job.next_run for job in self.jobs.values()), default=None)
+            delay = (upcoming - datetime.now(timezone.utc)).total_seconds() if upcoming else MAX_SLEEP_SECONDS
+            await asyncio.sleep(min(max(delay, 1), MAX_SLEEP_SECONDS))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+        return self
+
+    async def stop(self):
+        tasks = [self._task] + [job.task for job in self.jobs.values()]
+        for task in tasks:
+            if task and not task.done():
+                task.cancel()
+        await asyncio.gather(*[t for t in tasks if t], return_exceptions=True)
+        for job in self.jobs.values():
+            if job.cancel:
+                await job.cancel()
+        self._task = None
+
+    def status(self):
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'jobs': [job.status() for job in self.jobs.values()],
+        }
+
+
+async def run_sync_job():
+    """Run one single-flight sync with the configured scraper"""
+    from sync_lock import run_sync
+    outcome = await run_sync(SYNC_SCRAPER)
+    return outcome['tools_added']
+
+
+async def cancel_sync_job():
+    """Stop this process's sync; run_sync only waits on it through a shield"""
+    from sync_lock import sync_flight
+    await sync_flight.cancel()
+
+
+def create_sync_scheduler():
+    scheduler = Scheduler()
+    scheduler.add_job('sync-tools', SYNC_CRON, run_sync_job, SYNC_JITTER_SECONDS, cancel=cancel_sync_job)
+    return scheduler
+
+
+async def main(run_now=False):
+    """Worker entry point: keep one loop (and one DB client / browser) alive"""
+    scheduler = create_sync_scheduler()
+    print("=" * 60)
+    print("🕐 AI Tools Sync Scheduler Started")
+    for job in scheduler.jobs.values():
+        print(f"⏰ {job.name}: '{job.cron.expression}' (+0-{job.jitter_seconds}s jitter), next run {job.next_run:%Y-%m-%d %H:%M} UTC")
+    print("=" * 60)
+
+    from database import warm_up
+    await warm_up()
+
+    if run_now:
+        print("\n▶️  Running initial sync...")
+        await run_sync_job()
+
+    scheduler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await scheduler.stop()
+        if SYNC_SCRAPER != 'aiohttp':
+            from browser_pool import get_browser_pool
+            await get_browser_pool().close()
+        from database import close_client
+        close_client()
+
+
+if __name__ == "__main__":
+    import sys
+    try:
+        asyncio.run(main(run_now='--run-now' in sys.argv))
+    except KeyboardInterrupt:
+        print("\n\n👋 Scheduler stopped")
@@ -0,0 +1,199 @@
+"""
+Record / replay fixtures for the scrapers
+Record captures the JS-rendered DOM of the listing page and a sample of detail
+pages into a fixture directory; replay serves them from a local HTTP server so
+scrapers and benchmarks run without touching aitoolsdirectory.com
+
+Usage:
+    python scraper_fixtures.py record --max-tools 20
+    python scraper_fixtures.py serve --port 8765
+    SYNC_SOURCE_URL=http://127.0.0.1:8765 python sync_tools_playwright.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT_DIR = Path(__file__).parent
+
+# Configuration
+FIXTURES_DIR = Path(os.environ.get('SCRAPER_FIXTURES_DIR', ROOT_DIR / 'fixtures' / 'scraper'))
+MANIFEST_NAME = 'manifest.json'
+RECORD_SOURCE_URL = "https://aitoolsdirectory.com"
+
+SCRIPT_RE = re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+
+
+def load_manifest(fixtures_dir=FIXTURES_DIR):
+    """Load the fixture manifest ({path: {file, kind}}), or an empty one"""
+    manifest_path = Path(fixtures_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {'source_url': None, 'recorded_at': None, 'pages': {}}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def freeze_dom(html, source_url):
+    """Make a rendered DOM snapshot replayable: drop scripts, make source links local"""
+    html = SCRIPT_RE.sub('', html)
+    return html.replace(source_url.rstrip('/'), '')
+
+
+class FixtureRecorder:
+    """Writes DOM snapshots and keeps the manifest in sync"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, source_url=RECORD_SOURCE_URL):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.source_url = source_url
+        self.manifest = {'source_url': source_url, 'recorded_at': None, 'pages': {}}
+
+    def add(self, url, html, kind):
+        """Store a snapshot for url under its path"""
+        path = urlsplit(url).path or '/'
+        file_name = 'index.html' if path == '/' else f"{kind}-{hashlib.sha1(path.encode()).hexdigest()[:12]}.html"
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.fixtures_dir / file_name, 'w', encoding='utf-8') as f:
+            f.write(freeze_dom(html, self.source_url))
+        self.manifest['pages'][path] = {'file': file_name, 'kind': kind}
+
+    def save(self):
+        self.manifest['recorded_at'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        with open(self.fixtures_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+
+
+async def record_fixtures(max_tools=20, fixtures_dir=FIXTURES_DIR, source_url=RECORD_SOURCE_URL):
+    """Capture the rendered listing page and up to max_tools detail pages"""
+    from http_cache import HttpCache
+    from sync_tools_playwright import PlaywrightScraper
+
+    recorder = FixtureRecorder(fixtures_dir, source_url)
+    async with PlaywrightScraper(source_url=source_url, cache=HttpCache(enabled=False)) as scraper:
+        print(f"🌐 Recording listing {source_url}...")
+        await scraper.page.goto(source_url, wait_until='networkidle', timeout=60000)
+        tools = await scraper.extract_tools_from_page()
+        # Snapshot after scrolling so lazy-loaded tiles and images are in the DOM
+        recorder.add(source_url, await scraper.page.content(), 'listing')
+
+        for i, tool in enumerate(tools[:max_tools], 1):
+            print(f"📄 [{i}/{min(len(tools), max_tools)}] {tool['website_url']}")
+            await scraper.page.goto(tool['website_url'], wait_until='networkidle', timeout=30000)
+            await scraper.page.wait_for_timeout(2000)
+            recorder.add(tool['website_url'], await scraper.page.content(), 'detail')
+
+    recorder.save()
+    print(f"✅ Recorded {len(recorder.manifest['pages'])} pages into {recorder.fixtures_dir}")
+    return recorder.manifest
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serves manifest paths; everything else (assets, APIs) is a 404"""
+
+    def do_GET(self):
+        page = self.server.pages.get(urlsplit(self.path).path)
+        if not page:
+            self.send_error(404)
+            return
+        body = self.server.read(page['file'])
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Local HTTP server replaying recorded fixtures
+
+    with FixtureServer() as server:
+        scraper = PlaywrightScraper(source_url=server.url)
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, host='127.0.0.1', port=0):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.manifest = load_manifest(self.fixtures_dir)
+        self.httpd = ThreadingHTTPServer((host, port), _FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.pages = self.manifest['pages']
+        self.httpd.read = self._read
+        self._bodies = {}
+        self._thread = None
+
+    def _read(self, file_name):
+        if file_name not in self._bodies:
+            self._bodies[file_name] = (self.fixtures_dir / file_name).read_bytes()
+        return self._bodies[file_name]
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+async def _record_and_close(args):
+    from browser_pool import get_browser_pool
+    try:
+        await record_fixtures(args.max_tools, args.dir, args.source_url)
+    finally:
+        await get_browser_pool().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay scraper fixtures")
+    sub = parser.add_subparsers(dest='command', required=True)
+    record = sub.add_parser('record', help='capture pages from the live source')
+    record.add_argument('--max-tools', type=int, default=20)
+    record.add_argument('--source-url', default=RECORD_SOURCE_URL)
+    record.add_argument('--dir', default=str(FIXTURES_DIR))
+    serve = sub.add_parser('serve', help='serve recorded pages locally')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--dir', default=str(FIXTURES_DIR))
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        asyncio.run(_record_and_close(args))
+        return
+
+    server = FixtureServer(args.dir, port=args.port)
+    print(f"🎞️  Replaying {len(server.manifest['pages'])} pages at {server.url}")
+    print(f"💡 Run a sync with SYNC_SOURCE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Fixture server stopped")
+
+
+if __name__ == "__main__":
+    main()
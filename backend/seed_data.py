@@ -1,22 +1,14 @@
+import argparse
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-from pathlib import Path
 import uuid
 from datetime import datetime
 from passlib.context import CryptContext
-
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
-
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+from database import get_db, close_client
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 async def seed_database():
+    db = get_db()
     # Clear existing tools
     await db.tools.delete_many({})
     
@@ -204,6 +196,24 @@ async def seed_database():
     else:
         print("ℹ️  Admin already exists, skipping admin creation")
     
+async def seed_synthetic(args):
+    """Replace the catalog with a generated one (see catalog_generator.py)"""
+    from catalog_generator import insert_catalog
+    counts = await insert_catalog(get_db(), args.tools, seed=args.seed, pages=args.pages,
+                                  featured=args.featured, batch_size=args.batch_size)
+    print(f"✅ Seeded {counts['tools']} synthetic tools and {counts['pages']} pages (seed {args.seed})")
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_database())
-    client.close()
\ No newline at end of file
+    from catalog_generator import DEFAULT_SEED, PAGE_COUNT, FEATURED_COUNT, BATCH_SIZE
+
+    parser = argparse.ArgumentParser(description="Seed the database with sample tools")
+    parser.add_argument('--tools', type=int, help='generate this many synthetic tools instead of the sample set')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--pages', type=int, default=PAGE_COUNT)
+    parser.add_argument('--featured', type=int, default=FEATURED_COUNT)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(seed_synthetic(args) if args.tools else seed_database())
+    close_client()
\ No newline at end of file
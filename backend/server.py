@@ -1,8 +1,11 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, BackgroundTasks
+from fastapi.responses import FileResponse, RedirectResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from contextlib import asynccontextmanager
 import os
+import sys
 import logging
 from pathlib import Path
 from typing import List, Optional
@@ -16,6 +19,11 @@ from auth import (
     get_password_hash, verify_password, create_access_token, 
     get_current_admin, ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from database import get_db, warm_up, close_client
+from metrics import install_metrics
+from slow_query import install_slow_query_log
+from request_timing import install_request_timing, record_cache
+from catalog_hooks import catalog_changed, TOOLS, PAGES, SETTINGS
 from datetime import datetime, timedelta
 
 # Add ChangePassword model
@@ -27,13 +35,30 @@ class ChangePassword(BaseModel):
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# In-process sync scheduler (ENABLE_SCHEDULER=1); run only one per deployment
+ENABLE_SCHEDULER = os.environ.get('ENABLE_SCHEDULER', '0') == '1'
+scheduler = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global scheduler
+    # MongoDB connection pool: shared by handlers (Depends(get_db)) and in-process syncs
+    await warm_up()
+    if ENABLE_SCHEDULER:
+        from scheduler import create_sync_scheduler
+        scheduler = create_sync_scheduler().start()
+        logger.info("Sync scheduler started")
+    yield
+    if scheduler is not None:
+        await scheduler.stop()
+    # Only close the browser if a sync actually started it
+    if 'browser_pool' in sys.modules:
+        from browser_pool import get_browser_pool
+        await get_browser_pool().close()
+    close_client()
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -52,7 +77,8 @@ async def get_tools(
     sort_by: str = "created_at",
     sort_order: str = "desc",
     page: int = 1,
-    page_size: int = 60
+    page_size: int = 60,
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     query = {}
 
@@ -97,13 +123,13 @@ async def get_tools(
 
 # Get featured tools
 @api_router.get("/tools/featured", response_model=List[Tool])
-async def get_featured_tools():
+async def get_featured_tools(db: AsyncIOMotorDatabase = Depends(get_db)):
     tools = await db.tools.find({"is_featured": True}).sort("featured_order", 1).to_list(10)
     return [Tool(**tool) for tool in tools]
 
 # Get single tool by ID
 @api_router.get("/tools/{tool_id}", response_model=Tool)
-async def get_tool(tool_id: str):
+async def get_tool(tool_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     tool = await db.tools.find_one({"id": tool_id})
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -111,15 +137,16 @@ async def get_tool(tool_id: str):
 
 # Create new tool
 @api_router.post("/tools", response_model=Tool)
-async def create_tool(tool_input: ToolCreate):
+async def create_tool(tool_input: ToolCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     tool_dict = tool_input.dict()
     tool = Tool(**tool_dict)
     await db.tools.insert_one(tool.dict())
+    await catalog_changed(db, TOOLS, [tool.id])
     return tool
 
 # Update tool
 @api_router.put("/tools/{tool_id}", response_model=Tool)
-async def update_tool(tool_id: str, tool_input: ToolCreate):
+async def update_tool(tool_id: str, tool_input: ToolCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     existing_tool = await db.tools.find_one({"id": tool_id})
     if not existing_tool:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -132,20 +159,22 @@ async def update_tool(tool_id: str, tool_input: ToolCreate):
         {"$set": update_data}
     )
     
+    await catalog_changed(db, TOOLS, [tool_id])
     updated_tool = await db.tools.find_one({"id": tool_id})
     return Tool(**updated_tool)
 
 # Delete tool
 @api_router.delete("/tools/{tool_id}")
-async def delete_tool(tool_id: str):
+async def delete_tool(tool_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     result = await db.tools.delete_one({"id": tool_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Tool not found")
+    await catalog_changed(db, TOOLS, [tool_id])
     return {"message": "Tool deleted successfully"}
 
 # Get all categories
 @api_router.get("/categories")
-async def get_categories():
+async def get_categories(db: AsyncIOMotorDatabase = Depends(get_db)):
     categories = await db.tools.distinct("category")
     return sorted(categories)
 
@@ -160,7 +189,7 @@ async def get_price_types():
 
 # Admin Login
 @api_router.post("/admin/login", response_model=Token)
-async def admin_login(login_data: AdminLogin):
+async def admin_login(login_data: AdminLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
     # Check if admin exists
     admin = await db.admins.find_one({"username": login_data.username})
     
@@ -185,7 +214,7 @@ async def verify_admin(current_admin: str = Depends(get_current_admin)):
 
 # Create initial admin (for setup only - should be protected in production)
 @api_router.post("/admin/create-initial")
-async def create_initial_admin(username: str = "admin", password: str = "admin123"):
+async def create_initial_admin(username: str = "admin", password: str = "admin123", db: AsyncIOMotorDatabase = Depends(get_db)):
     # Check if any admin exists
     existing_admin = await db.admins.find_one({})
     if existing_admin:
@@ -203,7 +232,8 @@ async def create_initial_admin(username: str = "admin", password: str = "admin12
 @api_router.post("/admin/change-password")
 async def change_admin_password(
     password_data: ChangePassword,
-    current_admin: str = Depends(get_current_admin)
+    current_admin: str = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     # Validate new password matches confirmation
     if password_data.new_password != password_data.confirm_password:
@@ -233,7 +263,7 @@ async def change_admin_password(
 
 # Toggle tool active status
 @api_router.patch("/admin/tools/{tool_id}/toggle-active")
-async def toggle_tool_active(tool_id: str, current_admin: str = Depends(get_current_admin)):
+async def toggle_tool_active(tool_id: str, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     tool = await db.tools.find_one({"id": tool_id})
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -243,12 +273,13 @@ async def toggle_tool_active(tool_id: str, current_admin: str = Depends(get_curr
         {"id": tool_id},
         {"$set": {"is_active": new_status, "updated_at": datetime.utcnow()}}
     )
+    await catalog_changed(db, TOOLS, [tool_id])
     
     return {"message": "Tool status updated", "is_active": new_status}
 
 # Toggle tool featured status
 @api_router.patch("/admin/tools/{tool_id}/toggle-featured")
-async def toggle_tool_featured(tool_id: str, current_admin: str = Depends(get_current_admin)):
+async def toggle_tool_featured(tool_id: str, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     tool = await db.tools.find_one({"id": tool_id})
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -268,12 +299,13 @@ async def toggle_tool_featured(tool_id: str, current_admin: str = Depends(get_cu
         {"id": tool_id},
         {"$set": update_data}
     )
+    await catalog_changed(db, TOOLS, [tool_id])
     
     return {"message": "Tool featured status updated", "is_featured": new_status}
 
 # Create new tool (admin endpoint with authentication)
 @api_router.post("/admin/tools", response_model=Tool)
-async def create_tool_admin(tool_input: ToolCreate, current_admin: str = Depends(get_current_admin)):
+async def create_tool_admin(tool_input: ToolCreate, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     tool_dict = tool_input.dict()
     
     # Set defaults
@@ -282,11 +314,12 @@ async def create_tool_admin(tool_input: ToolCreate, current_admin: str = Depends
     
     tool = Tool(**tool_dict)
     await db.tools.insert_one(tool.dict())
+    await catalog_changed(db, TOOLS, [tool.id])
     return tool
 
 # Update tool (admin endpoint with authentication)
 @api_router.put("/admin/tools/{tool_id}", response_model=Tool)
-async def update_tool_admin(tool_id: str, tool_input: ToolCreate, current_admin: str = Depends(get_current_admin)):
+async def update_tool_admin(tool_id: str, tool_input: ToolCreate, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     existing_tool = await db.tools.find_one({"id": tool_id})
     if not existing_tool:
         raise HTTPException(status_code=404, detail="Tool not found")
@@ -299,20 +332,22 @@ async def update_tool_admin(tool_id: str, tool_input: ToolCreate, current_admin:
         {"$set": update_data}
     )
     
+    await catalog_changed(db, TOOLS, [tool_id])
     updated_tool = await db.tools.find_one({"id": tool_id})
     return Tool(**updated_tool)
 
 # Delete tool (admin endpoint with authentication)
 @api_router.delete("/admin/tools/{tool_id}")
-async def delete_tool_admin(tool_id: str, current_admin: str = Depends(get_current_admin)):
+async def delete_tool_admin(tool_id: str, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     result = await db.tools.delete_one({"id": tool_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Tool not found")
+    await catalog_changed(db, TOOLS, [tool_id])
     return {"message": "Tool deleted successfully"}
 
 # Get admin statistics
 @api_router.get("/admin/stats", response_model=Statistics)
-async def get_admin_statistics(current_admin: str = Depends(get_current_admin)):
+async def get_admin_statistics(current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     # Count totals
     total_tools = await db.tools.count_documents({})
     active_tools = await db.tools.count_documents({"is_active": True})
@@ -346,7 +381,7 @@ async def get_admin_statistics(current_admin: str = Depends(get_current_admin)):
 
 # Site Settings Routes
 @api_router.get("/admin/site-settings", response_model=SiteSettings)
-async def get_site_settings(current_admin: str = Depends(get_current_admin)):
+async def get_site_settings(current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     settings = await db.site_settings.find_one({})
     if not settings:
         # Return default settings
@@ -363,7 +398,8 @@ async def get_site_settings(current_admin: str = Depends(get_current_admin)):
 @api_router.put("/admin/site-settings", response_model=SiteSettings)
 async def update_site_settings(
     settings_input: SiteSettingsBase,
-    current_admin: str = Depends(get_current_admin)
+    current_admin: str = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     # Get existing settings
     settings = await db.site_settings.find_one({})
@@ -384,23 +420,24 @@ async def update_site_settings(
         await db.site_settings.insert_one(new_settings.dict())
         updated_settings = new_settings.dict()
     
+    await catalog_changed(db, SETTINGS)
     return SiteSettings(**updated_settings)
 
 # Pages Management Routes
 @api_router.get("/admin/pages", response_model=List[Page])
-async def get_all_pages(current_admin: str = Depends(get_current_admin)):
+async def get_all_pages(current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     pages = await db.pages.find({}).sort("created_at", -1).to_list(100)
     return [Page(**page) for page in pages]
 
 @api_router.get("/admin/pages/{page_id}", response_model=Page)
-async def get_page(page_id: str, current_admin: str = Depends(get_current_admin)):
+async def get_page(page_id: str, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     page = await db.pages.find_one({"id": page_id})
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
     return Page(**page)
 
 @api_router.post("/admin/pages", response_model=Page)
-async def create_page(page_input: PageCreate, current_admin: str = Depends(get_current_admin)):
+async def create_page(page_input: PageCreate, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     # Check if slug already exists
     existing_page = await db.pages.find_one({"slug": page_input.slug})
     if existing_page:
@@ -408,13 +445,15 @@ async def create_page(page_input: PageCreate, current_admin: str = Depends(get_c
     
     page = Page(**page_input.dict())
     await db.pages.insert_one(page.dict())
+    await catalog_changed(db, PAGES, [page.id])
     return page
 
 @api_router.put("/admin/pages/{page_id}", response_model=Page)
 async def update_page(
     page_id: str,
     page_input: PageUpdate,
-    current_admin: str = Depends(get_current_admin)
+    current_admin: str = Depends(get_current_admin),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     existing_page = await db.pages.find_one({"id": page_id})
     if not existing_page:
@@ -437,24 +476,65 @@ async def update_page(
         {"$set": update_data}
     )
     
+    await catalog_changed(db, PAGES, [page_id])
     updated_page = await db.pages.find_one({"id": page_id})
     return Page(**updated_page)
 
 @api_router.delete("/admin/pages/{page_id}")
-async def delete_page(page_id: str, current_admin: str = Depends(get_current_admin)):
+async def delete_page(page_id: str, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     result = await db.pages.delete_one({"id": page_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Page not found")
+    await catalog_changed(db, PAGES, [page_id])
     return {"message": "Page deleted successfully"}
 
 # Public page endpoint (no auth required)
 @api_router.get("/pages/{slug}", response_model=Page)
-async def get_public_page(slug: str):
+async def get_public_page(slug: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     page = await db.pages.find_one({"slug": slug, "is_published": True})
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
     return Page(**page)
 
+# Locally mirrored tool images (content-addressed, safe to cache forever)
+@api_router.get("/media/{image_id}")
+async def get_media(image_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
+    from image_pipeline import resolve_variant, MediaStore, source_url_for
+    accept = request.headers.get("accept", "")
+    path, media_type = resolve_variant(image_id, accept)
+    record_cache(path is not None)
+    if not path:
+        # Not in this instance's cache yet: fetch it from the shared bucket
+        path, media_type = await MediaStore(db).restore(image_id, accept)
+    if not path:
+        # Lost variant: send the client to the original until the next mirror run
+        source_url = await source_url_for(db, image_id)
+        if source_url:
+            return RedirectResponse(source_url, status_code=302, headers={"Cache-Control": "no-store"})
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "Vary": "Accept"}
+    )
+
+# XML sitemap of the public site (proxy /sitemap*.xml on the site host to these)
+@api_router.get("/sitemap.xml")
+async def get_sitemap(request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
+    from sitemap import sitemap_response, INDEX
+    return await sitemap_response(request, db, INDEX)
+
+@api_router.get("/sitemap-{number:int}.xml")
+async def get_sitemap_part(number: int, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
+    from sitemap import sitemap_response, sitemap_name
+    return await sitemap_response(request, db, sitemap_name(number))
+
+# Pre-rendered tool detail page (proxy /tool/{id} on the site host to this for crawlers and first paint)
+@api_router.get("/prerender/tool/{tool_id}")
+async def get_tool_snapshot(tool_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
+    from prerender import snapshot_response
+    return await snapshot_response(request, db, tool_id)
+
 # ============================================
 # SYNC TOOLS ROUTES
 # ============================================
@@ -463,15 +543,22 @@ async def get_public_page(slug: str):
 async def trigger_sync_tools(current_admin: str = Depends(get_current_admin)):
     """Manually trigger tools sync from external source"""
     try:
-        from sync_tools_playwright import sync_tools
+        from sync_lock import run_sync
+        
+        # Run sync (or attach to the one already running on any worker)
+        outcome = await run_sync()
+        saved_count = outcome["tools_added"]
         
-        # Run sync
-        saved_count = await sync_tools()
+        if outcome["attached"]:
+            message = f"Sync was already running; it added {saved_count} new tools"
+        else:
+            message = f"Sync completed. Added {saved_count} new tools"
         
         return {
             "success": True,
-            "message": f"Sync completed. Added {saved_count} new tools",
-            "tools_added": saved_count
+            "message": message,
+            "tools_added": saved_count,
+            "attached": outcome["attached"]
         }
     except Exception as e:
         logger.error(f"Sync error: {str(e)}")
@@ -481,7 +568,7 @@ async def trigger_sync_tools(current_admin: str = Depends(get_current_admin)):
         )
 
 @api_router.get("/admin/sync-status")
-async def get_sync_status(current_admin: str = Depends(get_current_admin)):
+async def get_sync_status(current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get last sync status"""
     try:
         # Get latest synced tool
@@ -490,11 +577,15 @@ async def get_sync_status(current_admin: str = Depends(get_current_admin)):
             sort=[("synced_at", -1)]
         )
         
+        # Latest sync run report (includes the per-host request rates)
+        last_run = await db.sync_runs.find_one({}, {"_id": 0}, sort=[("started_at", -1)])
+        
         if latest_synced:
             return {
                 "last_sync": latest_synced.get("synced_at"),
                 "synced_from": latest_synced.get("synced_from"),
-                "total_synced_tools": await db.tools.count_documents({"synced_from": {"$exists": True}})
+                "total_synced_tools": await db.tools.count_documents({"synced_from": {"$exists": True}}),
+                "last_run": last_run
             }
         else:
             return {
@@ -504,9 +595,52 @@ async def get_sync_status(current_admin: str = Depends(get_current_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/admin/mirror-images")
+async def trigger_mirror_images(background_tasks: BackgroundTasks, current_admin: str = Depends(get_current_admin), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Download remote tool images and generate local thumbnails in the background"""
+    from image_pipeline import mirror_images
+    background_tasks.add_task(mirror_images, db)
+    return {"success": True, "message": "Image mirroring started"}
+
+@api_router.get("/admin/scheduler")
+async def get_scheduler_status(current_admin: str = Depends(get_current_admin)):
+    """Scheduled jobs with their next run times"""
+    if scheduler is None:
+        return {"enabled": False, "running": False, "jobs": []}
+    return {"enabled": True, **scheduler.status()}
+
+@api_router.get("/admin/browser-pool")
+async def get_browser_pool_status(current_admin: str = Depends(get_current_admin)):
+    """Health and recycle stats of the shared sync browser"""
+    from browser_pool import get_browser_pool
+    return get_browser_pool().health()
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(explain: bool = True, current_admin: str = Depends(get_current_admin)):
+    """Slow query shapes with sampled explain plans (COLLSCANs, docs examined per returned)"""
+    from database import get_client
+    from slow_query import slow_queries
+    if explain:
+        await slow_queries.explain_due(get_client())
+    return slow_queries.report()
+
+@api_router.delete("/admin/slow-queries")
+async def reset_slow_queries(current_admin: str = Depends(get_current_admin)):
+    """Forget the flagged shapes (e.g. after adding an index)"""
+    from slow_query import slow_queries
+    slow_queries.reset()
+    return {"success": True}
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Prometheus metrics (GET /metrics) and the slow query log; registered before the Mongo client is created
+install_metrics(app, get_db)
+install_slow_query_log()
+
+# Server-Timing header (parse/app/db/serialize) on every response
+install_request_timing(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -520,8 +654,4 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+logger = logging.getLogger(__name__)
\ No newline at end of file
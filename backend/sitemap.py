@@ -0,0 +1,293 @@
+"""
+XML sitemap of the public site
+The `sitemap_entries` collection holds one small document per public URL:
+the homepage, every active tool and, once the frontend has a public route for
+them (SITEMAP_PAGE_PATH), every published CMS page. Catalog writes
+keep it up to date incrementally (see catalog_hooks.py), and each change
+bumps a version in `catalog_versions`.
+
+The sitemap endpoints serve a gzip render cached in memory. It is rebuilt
+from the entries only when the version has moved, so crawler hits never scan
+the tools collection. Beyond SITEMAP_MAX_URLS URLs, sitemap.xml becomes a
+sitemap index of sitemap-N.xml files.
+"""
+import asyncio
+import gzip
+import os
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from request_timing import record_cache
+
+# Configuration
+SITE_URL = os.environ.get('SITE_URL', 'https://www.aibox4u.cc').rstrip('/')
+SITEMAP_BASE_URL = os.environ.get('SITEMAP_BASE_URL', SITE_URL).rstrip('/')  # host serving /sitemap-N.xml
+SITEMAP_MAX_URLS = 50000  # protocol limit per file
+SITEMAP_CHECK_SECONDS = int(os.environ.get('SITEMAP_CHECK_SECONDS', 30))  # version check interval of the cache
+SITEMAP_CACHE_MAX_AGE = 3600
+TOOL_PATH = '/tool/{id}'  # frontend routes
+# The SPA has no public CMS page route yet; set e.g. '/page/{slug}' once it does. Until then
+# pages are left out rather than advertising URLs that do not render.
+PAGE_PATH = os.environ.get('SITEMAP_PAGE_PATH', '')
+GZIP_LEVEL = 6
+BULK_SIZE = 1000
+
+INDEX = 'sitemap.xml'
+VERSION_ID = 'sitemap'
+HOME = 'home'
+TOOL = 'tool'
+PAGE = 'page'
+
+URLSET_OPEN = b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = b'</urlset>\n'
+INDEX_OPEN = b'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = b'</sitemapindex>\n'
+
+
+def format_lastmod(value):
+    """W3C datetime; Mongo hands back naive UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def url_element(loc, lastmod=None):
+    lastmod = format_lastmod(lastmod)
+    inner = f'<loc>{escape(loc)}</loc>' + (f'<lastmod>{lastmod}</lastmod>' if lastmod else '')
+    return f'  <url>{inner}</url>\n'.encode('utf-8')
+
+
+def sitemap_name(number):
+    return f'sitemap-{number}.xml'
+
+
+class SitemapWriter:
+    """Streams entries into gzipped sitemap files
+
+    finish() returns {file name: gzip bytes}: one urlset named sitemap.xml
+    when everything fits, else sitemap-1.xml ... plus a sitemap.xml index.
+    """
+
+    def __init__(self, site_url=SITE_URL, base_url=SITEMAP_BASE_URL, max_urls=SITEMAP_MAX_URLS):
+        self.site_url = site_url
+        self.base_url = base_url
+        self.max_urls = max_urls
+        self.files = {}
+        self.chunk_lastmods = []
+        self._parts = None
+        self._count = 0
+        self._latest = None
+
+    def _open_chunk(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self._parts = [self._compressor.compress(URLSET_OPEN)]
+        self._count, self._latest = 0, None
+
+    def _close_chunk(self):
+        self._parts += [self._compressor.compress(URLSET_CLOSE), self._compressor.flush()]
+        self.files[sitemap_name(len(self.files) + 1)] = b''.join(self._parts)
+        self.chunk_lastmods.append(self._latest)
+        self._parts = None
+
+    def add(self, path, lastmod=None):
+        if self._parts is None or self._count == self.max_urls:
+            if self._parts is not None:
+                self._close_chunk()
+            self._open_chunk()
+        self._parts.append(self._compressor.compress(url_element(self.site_url + path, lastmod)))
+        self._count += 1
+        if lastmod and (self._latest is None or lastmod > self._latest):
+            self._latest = lastmod
+
+    def finish(self):
+        if self._parts is None:
+            self._open_chunk()
+        self._close_chunk()
+        if len(self.files) == 1:
+            return {INDEX: self.files.pop(sitemap_name(1))}
+        index = [INDEX_OPEN]
+        for number, lastmod in enumerate(self.chunk_lastmods, 1):
+            lastmod = format_lastmod(lastmod)
+            index.append((f'  <sitemap><loc>{escape(self.base_url)}/{sitemap_name(number)}</loc>'
+                          + (f'<lastmod>{lastmod}</lastmod>' if lastmod else '') + '</sitemap>\n').encode('utf-8'))
+        index.append(INDEX_CLOSE)
+        return {**self.files, INDEX: gzip.compress(b''.join(index), GZIP_LEVEL)}
+
+
+# --- Incremental entry maintenance ---
+
+def tool_entry(tool):
+    return {'_id': TOOL_PATH.format(id=tool['id']), 'kind': TOOL, 'ref_id': tool['id'],
+            'lastmod': tool.get('updated_at') or tool.get('created_at')}
+
+
+def page_entry(page):
+    return {'_id': PAGE_PATH.format(slug=quote(page['slug'])), 'kind': PAGE, 'ref_id': page['id'],
+            'lastmod': page.get('updated_at') or page.get('created_at')}
+
+
+async def bump_version(database):
+    await database.catalog_versions.update_one(
+        {'_id': VERSION_ID},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+
+async def _touch_home(database, lastmod=None):
+    await database.sitemap_entries.update_one(
+        {'_id': '/'},
+        {'$set': {'kind': HOME, 'lastmod': lastmod or datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+
+async def update_tools(database, ids):
+    """Upsert/remove the entries of the given tools"""
+    for tool_id in ids:
+        tool = await database.tools.find_one({'id': tool_id},
+                                             {'_id': 0, 'id': 1, 'is_active': 1, 'updated_at': 1, 'created_at': 1})
+        if tool and tool.get('is_active', True):
+            entry = tool_entry(tool)
+            await database.sitemap_entries.replace_one({'_id': entry['_id']}, entry, upsert=True)
+        else:
+            await database.sitemap_entries.delete_many({'kind': TOOL, 'ref_id': tool_id})
+    await _touch_home(database)  # the listing changed too
+    await bump_version(database)
+
+
+async def update_pages(database, ids):
+    """Upsert/remove the entries of the given pages (slug changes drop the old URL)"""
+    for page_id in ids:
+        page = await database.pages.find_one({'id': page_id},
+                                             {'_id': 0, 'id': 1, 'slug': 1, 'is_published': 1,
+                                              'updated_at': 1, 'created_at': 1})
+        await database.sitemap_entries.delete_many({'kind': PAGE, 'ref_id': page_id})
+        if PAGE_PATH and page and page.get('is_published', True):
+            entry = page_entry(page)
+            await database.sitemap_entries.replace_one({'_id': entry['_id']}, entry, upsert=True)
+    await bump_version(database)
+
+
+async def ensure_indexes(database):
+    await database.sitemap_entries.create_index([('kind', 1), ('ref_id', 1)])
+
+
+async def rebuild(database):
+    """Full resync of the entries (first use, and after bulk changes such as a sync run)"""
+    from pymongo import ReplaceOne
+
+    await ensure_indexes(database)
+    generation = str(uuid.uuid4())
+    latest = None
+    operations = []
+
+    async def flush():
+        if operations:
+            await database.sitemap_entries.bulk_write(operations, ordered=False)
+            operations.clear()
+
+    sources = [
+        (database.tools.find({'is_active': {'$ne': False}}, {'_id': 0, 'id': 1, 'updated_at': 1, 'created_at': 1}),
+         tool_entry),
+    ]
+    if PAGE_PATH:
+        sources.append((database.pages.find({'is_published': {'$ne': False}},
+                                            {'_id': 0, 'id': 1, 'slug': 1, 'updated_at': 1, 'created_at': 1}),
+                        page_entry))
+    for cursor, make_entry in sources:
+        async for document in cursor:
+            entry = {**make_entry(document), 'generation': generation}
+            if entry['lastmod'] and (latest is None or entry['lastmod'] > latest):
+                latest = entry['lastmod']
+            operations.append(ReplaceOne({'_id': entry['_id']}, entry, upsert=True))
+            if len(operations) >= BULK_SIZE:
+                await flush()
+    await flush()
+    await database.sitemap_entries.delete_many({'kind': {'$ne': HOME}, 'generation': {'$ne': generation}})
+    await _touch_home(database, latest)
+    await bump_version(database)
+
+
+async def on_catalog_change(database, kind, ids):
+    """catalog_hooks listener"""
+    from catalog_hooks import TOOLS, PAGES
+    if kind not in (TOOLS, PAGES):
+        return
+    if ids is None:
+        await rebuild(database)
+    elif kind == TOOLS:
+        await update_tools(database, ids)
+    else:
+        await update_pages(database, ids)
+
+
+# --- Serving ---
+
+class SitemapCache:
+    """Rendered, gzipped sitemap files of one entries version"""
+
+    def __init__(self, check_seconds=SITEMAP_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self.version = None
+        self.files = {}
+        self.rendered_at = None
+        self.checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def current(self, database):
+        """The rendered files, re-rendered only when the version has moved"""
+        if self.version is not None and time.monotonic() - self.checked_at < self.check_seconds:
+            record_cache(True)
+            return self.files
+        async with self._lock:
+            if self.version is not None and time.monotonic() - self.checked_at < self.check_seconds:
+                record_cache(True)
+                return self.files
+            meta = await database.catalog_versions.find_one({'_id': VERSION_ID})
+            if meta is None:
+                await rebuild(database)  # first use on this database
+                meta = await database.catalog_versions.find_one({'_id': VERSION_ID})
+            # A version check that finds nothing new still serves the rendered files
+            record_cache(meta['version'] == self.version)
+            if meta['version'] != self.version:
+                writer = SitemapWriter()
+                async for entry in database.sitemap_entries.find({}, {'_id': 1, 'lastmod': 1}).sort('_id', 1):
+                    writer.add(entry['_id'], entry.get('lastmod'))
+                self.files = writer.finish()
+                self.version = meta['version']
+                self.rendered_at = datetime.now(timezone.utc)
+            self.checked_at = time.monotonic()
+        return self.files
+
+
+sitemap_cache = SitemapCache()
+
+
+async def sitemap_response(request, database, name):
+    """Gzip (or plain for clients that refuse gzip) XML with ETag revalidation"""
+    from starlette.responses import Response
+
+    files = await sitemap_cache.current(database)
+    body = files.get(name)
+    if body is None:
+        return Response(status_code=404)
+    etag = f'"{sitemap_cache.version}-{name}"'
+    headers = {
+        'Cache-Control': f'public, max-age={SITEMAP_CACHE_MAX_AGE}',
+        'ETag': etag,
+        'Vary': 'Accept-Encoding',
+    }
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+    else:
+        body = gzip.decompress(body)
+    return Response(content=body, media_type='application/xml', headers=headers)
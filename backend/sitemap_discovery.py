@@ -0,0 +1,271 @@
+"""
+Sitemap-driven tool discovery (no browser)
+Reads the source's sitemap.xml / sitemap index (found via robots.txt), keeps
+the /tool/ URLs and uses <lastmod> to return only tools that are new or
+changed since they were last synced. Each sitemap is streamed through the
+parser and checked against the database before the next one is fetched, so
+memory is bounded by the largest single sitemap (the protocol caps those at
+50,000 URLs) plus the SITEMAP_MAX_TOOLS selected tools, not by the catalog.
+"""
+import asyncio
+import os
+import re
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlsplit
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+from resilience import call_with_retries, check_status, FetchError
+
+# Configuration
+SITEMAP_ENABLED = os.environ.get('SITEMAP_DISCOVERY', '1') == '1'
+SITEMAP_MAX_TOOLS = int(os.environ.get('SITEMAP_MAX_TOOLS', 500))  # new/changed tools queued per run
+SITEMAP_MAX_DEPTH = 2  # index -> sitemap -> (nested index)
+SITEMAP_TIMEOUT_SECONDS = 120  # per sitemap download (they can be ~50 MB)
+TOOL_PATH_RE = re.compile(r'/tool/[^/?#]+')
+CHUNK_SIZE = 64 * 1024
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_lastmod(value):
+    """W3C datetime (2025-10-01, 2025-10-01T12:00:00Z, ...) -> aware UTC datetime, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class SitemapStreamParser:
+    """Incremental <urlset>/<sitemapindex> parser; feed bytes, collect entries as they complete"""
+
+    def __init__(self):
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._decompressor = None
+        self._sniffed = False
+        self.kind = None  # 'urlset' or 'sitemapindex'
+        self.entries = []  # [{'loc', 'lastmod'}]
+        self._root = None
+
+    def feed(self, chunk):
+        if not self._sniffed:
+            self._sniffed = True
+            if chunk[:2] == b'\x1f\x8b':  # .xml.gz served as-is
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor:
+            chunk = self._decompressor.decompress(chunk)
+        self._parser.feed(chunk)
+        self._drain()
+
+    def close(self):
+        if self._decompressor:
+            self._parser.feed(self._decompressor.flush())
+        self._parser.close()
+        self._drain()
+        return self.entries
+
+    def _drain(self):
+        for event, elem in self._parser.read_events():
+            name = _local(elem.tag)
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                    self.kind = name
+                continue
+            if name in ('url', 'sitemap'):
+                fields = {_local(child.tag): (child.text or '').strip() for child in elem}
+                if fields.get('loc'):
+                    self.entries.append({'loc': fields['loc'], 'lastmod': parse_lastmod(fields.get('lastmod'))})
+        # Drop finished entries so memory stays flat on huge sitemaps (the tree
+        # builder still holds any entry that is only half parsed)
+        if self._root is not None:
+            del self._root[:]
+
+
+def parse_sitemap(data):
+    """Parse a whole sitemap document (bytes) -> (kind, entries)"""
+    parser = SitemapStreamParser()
+    for start in range(0, len(data), CHUNK_SIZE):
+        parser.feed(data[start:start + CHUNK_SIZE])
+    return parser.kind, parser.close()
+
+
+def is_tool_url(url, source_url):
+    """Same host as the source and a /tool/<slug> path"""
+    parts = urlsplit(url)
+    return parts.netloc.lower() == urlsplit(source_url).netloc.lower() and bool(TOOL_PATH_RE.search(parts.path))
+
+
+def name_from_slug(url):
+    """'/tool/chat-gpt-4' -> 'Chat Gpt 4' (placeholder until the detail page gives the real name)"""
+    slug = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+    return ' '.join(word.capitalize() for word in re.split(r'[-_]+', slug) if word) or 'Unknown Tool'
+
+
+def _lastmod_key(entry):
+    return entry['lastmod'] or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def newest_first(entries, limit=SITEMAP_MAX_TOOLS):
+    """Entries sorted by lastmod (newest first, unknown last), cut to limit"""
+    entries = sorted(entries, key=_lastmod_key, reverse=True)
+    return entries[:limit] if limit else entries
+
+
+def select_changed(entries, known, limit=SITEMAP_MAX_TOOLS):
+    """Entries whose URL is new, or whose lastmod is newer than the synced one; newest first
+
+    known maps url -> lastmod recorded at the last sync (None if unknown).
+    """
+    selected = []
+    for entry in entries:
+        url = entry['loc']
+        if url not in known:
+            selected.append(entry)
+        elif entry['lastmod'] and (known[url] is None or entry['lastmod'] > known[url]):
+            selected.append(entry)
+    return newest_first(selected, limit)
+
+
+class SitemapDiscovery:
+    """Finds new/changed tool URLs of a source from its sitemaps"""
+
+    def __init__(self, database, source_url, session=None):
+        self.db = database
+        self.source_url = source_url.rstrip('/')
+        self.session = session
+        self.stats = {'sitemaps': 0, 'urls': 0, 'tool_urls': 0}
+
+    async def sitemap_urls(self):
+        """Sitemaps announced in robots.txt, else the conventional /sitemap.xml"""
+        try:
+            text = await self._get_text(urljoin(self.source_url + '/', 'robots.txt'))
+        except FetchError:
+            text = ''
+        found = [line.split(':', 1)[1].strip() for line in text.splitlines()
+                 if line.lower().startswith('sitemap:')]
+        return found or [urljoin(self.source_url + '/', 'sitemap.xml')]
+
+    async def _get_text(self, url):
+        async def get():
+            async with self.session.get(url, timeout=30) as response:
+                check_status(url, response.status)
+                return await response.text()
+        return await call_with_retries(get, description=f"GET {url}", attempts=2)
+
+    async def _stream(self, url):
+        """Stream one sitemap through the parser -> (kind, entries)"""
+        async def get():
+            parser = SitemapStreamParser()
+            async with self.session.get(url, timeout=SITEMAP_TIMEOUT_SECONDS) as response:
+                check_status(url, response.status)
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    parser.feed(chunk)
+            return parser.kind, parser.close()
+        return await call_with_retries(get, description=f"Sitemap {url}", attempts=2,
+                                       timeout=SITEMAP_TIMEOUT_SECONDS)
+
+    async def changed_entries(self, limit=SITEMAP_MAX_TOOLS):
+        """New/changed /tool/ entries across the sitemap tree, newest first; None without a sitemap
+
+        Sitemaps are handled one at a time; only the current one's entries and
+        the best `limit` changed ones are held in memory.
+        """
+        pending = [(url, 0) for url in await self.sitemap_urls()]
+        seen = set()
+        changed = {}
+        while pending:
+            url, depth = pending.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            try:
+                kind, entries = await self._stream(url)
+            except (FetchError, ParseError) as e:
+                print(f"   ⚠️  Sitemap {url} unusable: {str(e)}")
+                continue
+            self.stats['sitemaps'] += 1
+            if kind == 'sitemapindex':
+                if depth < SITEMAP_MAX_DEPTH:
+                    pending.extend((entry['loc'], depth + 1) for entry in entries)
+                continue
+            self.stats['urls'] += len(entries)
+            tools = {entry['loc']: entry for entry in entries if is_tool_url(entry['loc'], self.source_url)}
+            self.stats['tool_urls'] += len(tools)
+            known = await self.known_lastmods(list(tools))
+            for entry in select_changed(tools.values(), known, limit):
+                # A tool listed in several sitemaps keeps its newest lastmod
+                previous = changed.get(entry['loc'])
+                if previous is None or _lastmod_key(entry) > _lastmod_key(previous):
+                    changed[entry['loc']] = entry
+            if limit and len(changed) > limit:
+                changed = {entry['loc']: entry for entry in newest_first(changed.values(), limit)}
+        if not self.stats['sitemaps']:
+            return None
+        return newest_first(changed.values(), limit)
+
+    async def known_lastmods(self, urls, batch_size=1000):
+        """url -> source_lastmod of tools already in the database"""
+        known = {}
+        for start in range(0, len(urls), batch_size):
+            cursor = self.db.tools.find(
+                {'website_url': {'$in': urls[start:start + batch_size]}},
+                {'_id': 0, 'website_url': 1, 'source_lastmod': 1}
+            )
+            async for tool in cursor:
+                lastmod = tool.get('source_lastmod')
+                if lastmod is not None and lastmod.tzinfo is None:
+                    lastmod = lastmod.replace(tzinfo=timezone.utc)
+                known[tool['website_url']] = lastmod
+        return known
+
+    async def discover(self):
+        """Listing-style records for new/changed tools; None when there is no usable sitemap"""
+        own_session = self.session is None
+        if own_session:
+            import aiohttp
+            self.session = aiohttp.ClientSession(headers={'User-Agent': 'Mozilla/5.0 (compatible; aibox4u-sync)'})
+        try:
+            changed = await self.changed_entries()
+        finally:
+            if own_session:
+                await self.session.close()
+                self.session = None
+        if changed is None:
+            return None
+        print(f"🗺️  Sitemap: {self.stats['tool_urls']} tools in {self.stats['sitemaps']} sitemaps, "
+              f"{len(changed)} new or changed")
+        return [
+            {
+                'name': name_from_slug(entry['loc']),
+                'name_from_slug': True,
+                'website_url': entry['loc'],
+                'image_url': '',
+                'tags': [],
+                'source_lastmod': entry['lastmod'],
+            }
+            for entry in changed
+        ]
+
+
+async def discover_from_sitemap(database, source_url):
+    """Sitemap discovery if enabled; None means fall back to page-based discovery"""
+    if not SITEMAP_ENABLED:
+        return None
+    try:
+        return await SitemapDiscovery(database, source_url).discover()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️  Sitemap discovery failed: {str(e)}")
+        return None
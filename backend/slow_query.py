@@ -0,0 +1,248 @@
+"""
+Slow Mongo query detector
+A pymongo CommandListener logs every command slower than SLOW_QUERY_MS
+together with its filter shape (values replaced by '?'), and aggregates
+the flagged shapes. GET /api/admin/slow-queries runs a sampled
+explain('executionStats') per shape and reports the winning plan,
+COLLSCANs, and the docs-examined/docs-returned ratio.
+
+Development: SLOW_QUERY_MS=0 flags every query. Production: keep the
+threshold at 100ms, or set SLOW_QUERY_LOG=0 to turn the listener off.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+# Configuration
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', '1') == '1'
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+EXPLAIN_INTERVAL_SECONDS = int(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 600))  # re-explain a shape at most this often
+EXPLAIN_PER_REQUEST = 10  # explains run by one admin request
+MAX_SHAPES = 200
+# Read commands: their filters are shaped, and the flagged ones can be explained
+READ_COMMANDS = {'find', 'aggregate', 'count', 'distinct'}
+WRITE_COMMANDS = {'update': 'updates', 'delete': 'deletes', 'findAndModify': None}
+EXPLAIN_FIELDS = {
+    'find': ('find', 'filter', 'sort', 'projection', 'skip', 'limit', 'hint', 'collation'),
+    'aggregate': ('aggregate', 'pipeline', 'hint', 'collation'),
+    'count': ('count', 'query', 'skip', 'limit', 'hint', 'collation'),
+    'distinct': ('distinct', 'key', 'query', 'collation'),
+}
+
+logger = logging.getLogger(__name__)
+
+
+def query_shape(value):
+    """Filter with every literal replaced by '?'; operators and field names are kept"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]  # $and/$or branches, pipeline stages
+        return ['?']  # $in/$all value lists of any length
+    return '?'
+
+
+def command_filter(command_name, command):
+    """The part of a command that decides how documents are found"""
+    if command_name == 'find':
+        return {'filter': command.get('filter', {}), 'sort': command.get('sort')}
+    if command_name == 'aggregate':
+        return {'pipeline': command.get('pipeline', [])}
+    if command_name in ('count', 'distinct', 'findAndModify'):
+        return {'filter': command.get('query', {}), 'sort': command.get('sort')}
+    if command_name in ('update', 'delete'):
+        statements = command.get(WRITE_COMMANDS[command_name]) or [{}]
+        return {'filter': statements[0].get('q', {})}
+    return None
+
+
+def shape_of(command_name, command):
+    """Shape of the command's filter/sort/pipeline (sort directions are structure, so kept)"""
+    found = command_filter(command_name, command)
+    if found is None:
+        return None
+    shape = {}
+    for key, value in found.items():
+        if value is None:
+            continue
+        shape[key] = dict(value) if key == 'sort' else query_shape(value)
+    return shape
+
+
+def explain_command(command_name, command):
+    """explain() body for a captured read command, or None if it cannot be explained safely"""
+    fields = EXPLAIN_FIELDS.get(command_name)
+    if not fields:
+        return None
+    if command_name == 'aggregate' and any(
+        '$out' in stage or '$merge' in stage for stage in command.get('pipeline', [])
+    ):
+        return None
+    body = {field: command[field] for field in fields if field in command}
+    if command_name == 'aggregate':
+        body['cursor'] = {}
+    return {'explain': body, 'verbosity': 'executionStats'}
+
+
+def _plan_nodes(plan):
+    """Stages of a plan tree, root first"""
+    pending = [plan] if plan else []
+    while pending:
+        node = pending.pop(0)
+        yield node
+        if node.get('inputStage'):
+            pending.append(node['inputStage'])
+        pending.extend(node.get('inputStages') or [])
+        if node.get('queryPlan'):  # SBE plans wrap the classic tree
+            pending.append(node['queryPlan'])
+
+
+def summarize_explain(explain):
+    """Winning plan and examined/returned counts of an explain('executionStats') result"""
+    if 'stages' in explain and explain['stages'] and '$cursor' in explain['stages'][0]:
+        explain = explain['stages'][0]['$cursor']  # aggregate: the first stage does the find
+    planner = explain.get('queryPlanner', {})
+    plan = planner.get('winningPlan', {})
+    nodes = list(_plan_nodes(plan))
+    stages = [node.get('stage') for node in nodes]
+    execution = explain.get('executionStats', {})
+    examined = execution.get('totalDocsExamined', 0)
+    returned = execution.get('nReturned', 0)
+    return {
+        'stages': stages,
+        'collscan': 'COLLSCAN' in stages,
+        'index': next((node['indexName'] for node in nodes if node.get('indexName')), None),
+        'keys_examined': execution.get('totalKeysExamined', 0),
+        'docs_examined': examined,
+        'docs_returned': returned,
+        'examined_per_returned': round(examined / max(returned, 1), 1),
+        'execution_ms': execution.get('executionTimeMillis'),
+    }
+
+
+class SlowQueryLog:
+    """Flagged query shapes with their timings and latest explain summary (thread-safe)"""
+
+    def __init__(self, threshold_ms=SLOW_QUERY_MS, max_shapes=MAX_SHAPES):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self.shapes = {}
+        self.dropped = 0
+        self._lock = threading.Lock()  # listeners run on pymongo's threads
+
+    def record(self, database, collection, command_name, command, duration_ms):
+        """Flag one completed command; returns the shape entry, or None if it was fast"""
+        if duration_ms < self.threshold_ms:
+            return None
+        shape = shape_of(command_name, command)
+        if shape is None:
+            return None
+        key = json.dumps([database, collection, command_name, shape], sort_keys=True, default=str)
+        logger.warning(f"Slow query {duration_ms:.0f}ms {database}.{collection} {command_name} "
+                       f"{json.dumps(shape, sort_keys=True, default=str)}")
+        with self._lock:
+            entry = self.shapes.get(key)
+            if entry is None:
+                if len(self.shapes) >= self.max_shapes:
+                    self.dropped += 1
+                    return None
+                entry = self.shapes[key] = {
+                    'database': database,
+                    'collection': collection,
+                    'command': command_name,
+                    'shape': shape,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'explain': None,
+                    'explained_at': None,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['last_seen'] = time.time()
+            entry['sample'] = explain_command(command_name, command)  # latest real values, kept in memory only
+        return entry
+
+    def due_for_explain(self, now=None, limit=EXPLAIN_PER_REQUEST):
+        """Explainable shapes whose plan is missing or older than EXPLAIN_INTERVAL_SECONDS, slowest first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [entry for entry in self.shapes.values()
+                   if entry.get('sample') and (entry['explained_at'] is None
+                                               or now - entry['explained_at'] >= EXPLAIN_INTERVAL_SECONDS)]
+        due.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return due[:limit]
+
+    async def explain_due(self, client):
+        """Run the sampled explains (from the event loop, never inside the listener)"""
+        for entry in self.due_for_explain():
+            try:
+                result = await client[entry['database']].command(entry['sample'])
+                entry['explain'] = summarize_explain(result)
+            except Exception as e:
+                entry['explain'] = {'error': str(e)[:200]}
+            entry['explained_at'] = time.time()
+
+    def report(self):
+        """Flagged shapes, most total time first"""
+        with self._lock:
+            entries = [
+                {key: value for key, value in entry.items() if key != 'sample'}
+                for entry in self.shapes.values()
+            ]
+        for entry in entries:
+            entry['total_ms'] = round(entry['total_ms'], 1)
+            entry['max_ms'] = round(entry['max_ms'], 1)
+            entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 1)
+        entries.sort(key=lambda entry: entry['total_ms'], reverse=True)
+        return {
+            'enabled': SLOW_QUERY_LOG,
+            'threshold_ms': self.threshold_ms,
+            'dropped_shapes': self.dropped,
+            'collscans': sum(1 for entry in entries if (entry['explain'] or {}).get('collscan')),
+            'shapes': entries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.shapes.clear()
+            self.dropped = 0
+
+
+slow_queries = SlowQueryLog()
+
+
+def install_slow_query_log(log=slow_queries):
+    """Register the listener; call before the Mongo client is created"""
+    if not SLOW_QUERY_LOG:
+        return
+    from pymongo import monitoring
+
+    class SlowQueryListener(monitoring.CommandListener):
+        def __init__(self):
+            self._started = {}
+
+        def started(self, event):
+            if event.command_name in READ_COMMANDS or event.command_name in WRITE_COMMANDS:
+                self._started[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+        def succeeded(self, event):
+            self._finish(event)
+
+        def failed(self, event):
+            self._finish(event)
+
+        def _finish(self, event):
+            started = self._started.pop((event.connection_id, event.request_id), None)
+            if started is None:
+                return
+            database, command = started
+            collection = command.get(event.command_name)
+            log.record(database, collection if isinstance(collection, str) else '-',
+                       event.command_name, command, event.duration_micros / 1000)
+
+    monitoring.register(SlowQueryListener())
@@ -0,0 +1,98 @@
+"""
+Parse tool records out of the JSON the source SPA fetches
+aitoolsdirectory.com renders its tiles from XHR/fetch responses; reading those
+payloads directly is much faster than scrolling the page and scraping the DOM
+"""
+from urllib.parse import urljoin
+
+NAME_KEYS = ('name', 'title', 'toolName')
+LINK_KEYS = ('url', 'link', 'href', 'path', 'permalink', 'pageUrl')
+SLUG_KEYS = ('slug', 'handle', 'urlSlug')
+IMAGE_KEYS = ('image', 'image_url', 'imageUrl', 'thumbnail', 'logo', 'cover', 'icon', 'picture')
+TAG_KEYS = ('tags', 'categories', 'labels')
+TOOL_PATH = '/tool/'
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        # {"url": "..."} / {"name": "..."} style wrappers
+        for key in ('url', 'src', 'name', 'title', 'text'):
+            if isinstance(value.get(key), str):
+                return value[key].strip()
+    return ''
+
+
+def _first(record, keys):
+    for key in keys:
+        value = _text(record.get(key))
+        if value:
+            return value
+    return ''
+
+
+def _detail_url(record, base_url):
+    """Detail page URL for a record, or '' if it does not look like a tool"""
+    for key in LINK_KEYS:
+        link = _text(record.get(key))
+        if TOOL_PATH in link:
+            return urljoin(base_url, link)
+    slug = _first(record, SLUG_KEYS)
+    if slug:
+        return urljoin(base_url, f"{TOOL_PATH}{slug.strip('/')}")
+    return ''
+
+
+def _tags(record):
+    for key in TAG_KEYS:
+        values = record.get(key)
+        if isinstance(values, list):
+            tags = [_text(v) for v in values]
+            return [t for t in tags if t]
+    return []
+
+
+def parse_tool_record(record, base_url):
+    """Convert one API record into the listing shape used by the scraper"""
+    name = _first(record, NAME_KEYS)
+    website_url = _detail_url(record, base_url)
+    if not name or not website_url:
+        return None
+    image_url = _first(record, IMAGE_KEYS)
+    return {
+        'name': name,
+        'website_url': website_url,
+        'image_url': urljoin(base_url, image_url) if image_url else '',
+        'tags': _tags(record),
+    }
+
+
+def extract_tool_records(payload, base_url):
+    """Walk a JSON payload and return every tool record found, in order"""
+    tools = []
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            tool = parse_tool_record(node, base_url)
+            if tool:
+                tools.append(tool)
+                continue
+            stack.extend(reversed(list(node.values())))
+    return tools
+
+
+def merge_tool_records(payloads, base_url):
+    """Tool records from several payloads, de-duplicated by detail URL"""
+    seen = set()
+    tools = []
+    for payload in payloads:
+        for tool in extract_tool_records(payload, base_url):
+            if tool['website_url'] in seen:
+                continue
+            seen.add(tool['website_url'])
+            tools.append(tool)
+    return tools
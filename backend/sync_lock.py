@@ -0,0 +1,198 @@
+"""
+Single-flight sync across tasks, web workers and replicas
+A Mongo lease (document in `locks`, renewed by a heartbeat and expiring if
+the holder dies) guarantees one sync_tools() at a time. A trigger that finds
+a sync already running attaches to it and returns that run's result instead
+of starting another one. A holder that loses its lease has its sync cancelled,
+since another replica is free to start one.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+# Configuration
+SYNC_LOCK_NAME = 'sync-tools'
+LOCK_TTL_SECONDS = int(os.environ.get('SYNC_LOCK_TTL_SECONDS', 120))
+HEARTBEAT_SECONDS = LOCK_TTL_SECONDS / 4
+ATTACH_POLL_SECONDS = 5
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value):
+    # Mongo returns naive UTC datetimes unless the client is tz_aware
+    return value.replace(tzinfo=timezone.utc) if value and value.tzinfo is None else value
+
+
+class LeaseLost(RuntimeError):
+    """The lease expired or was taken over while the sync was running"""
+
+
+class LeaseLock:
+    """Expiring, heartbeat-renewed lock document"""
+
+    def __init__(self, database, name, ttl_seconds=LOCK_TTL_SECONDS):
+        self.collection = database.locks
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat = None
+        self._guarded = None
+        self.lost = False
+
+    async def acquire(self):
+        """Take the lease if it is free or expired; False if someone else holds it"""
+        now = _now()
+        try:
+            await self.collection.find_one_and_update(
+                {'_id': self.name, '$or': [{'expires_at': {'$lt': now}}, {'owner': self.owner}]},
+                {'$set': {
+                    'owner': self.owner,
+                    'status': 'running',
+                    'acquired_at': now,
+                    'expires_at': now + self.ttl,
+                    'result': None,
+                    'error': None,
+                }},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Document exists and is held by a live owner
+            return False
+        self._heartbeat = asyncio.create_task(self._renew_forever())
+        return True
+
+    def guard(self, task):
+        """Cancel task if the lease is lost while it runs"""
+        self._guarded = task
+
+    async def _renew_forever(self):
+        renewed_at = _now()
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                result = await self.collection.update_one(
+                    {'_id': self.name, 'owner': self.owner},
+                    {'$set': {'expires_at': _now() + self.ttl}}
+                )
+            except PyMongoError as e:
+                # Keep trying until the lease would have expired anyway
+                if _now() - renewed_at < self.ttl:
+                    print(f"⚠️  Could not renew lease {self.name}: {e}")
+                    continue
+            else:
+                if result.matched_count:
+                    renewed_at = _now()
+                    continue
+            print(f"❌ Lost lease {self.name} - stopping this sync")
+            self.lost = True
+            if self._guarded:
+                self._guarded.cancel()
+            return
+
+    async def release(self, result=None, error=None):
+        """Expire the lease now, leaving the outcome for attached waiters"""
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        await self.collection.update_one(
+            {'_id': self.name, 'owner': self.owner},
+            {'$set': {
+                'status': 'finished',
+                'expires_at': _now(),
+                'finished_at': _now(),
+                'result': result,
+                'error': error,
+            }}
+        )
+
+    async def holder(self):
+        return await self.collection.find_one({'_id': self.name})
+
+
+class SingleFlight:
+    """At most one sync per process, and (through the lease) per deployment"""
+
+    def __init__(self, name=SYNC_LOCK_NAME):
+        self.name = name
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def run(self, database, sync_func):
+        """Run sync_func under the lease or attach to the sync already running
+
+        Returns {'tools_added', 'attached', 'owner'}.
+        """
+        if self.running:
+            result = await asyncio.shield(self._task)
+            return {**result, 'attached': True}
+        self._task = asyncio.create_task(self._run_leased(database, sync_func))
+        return await asyncio.shield(self._task)
+
+    async def cancel(self):
+        """Stop the sync this process is running (on shutdown) and wait for it"""
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run_leased(self, database, sync_func):
+        lock = LeaseLock(database, self.name)
+        if not await lock.acquire():
+            return await self._attach_remote(lock)
+        work = asyncio.create_task(sync_func())
+        lock.guard(work)
+        try:
+            tools_added = await work
+        except asyncio.CancelledError:
+            if not lock.lost:
+                await lock.release(error='cancelled')
+                raise
+            # The lease belongs to someone else now; there is nothing to release
+            raise LeaseLost(f"Lost lease {self.name} while syncing")
+        except Exception as e:
+            await lock.release(error=str(e)[:500])
+            raise
+        await lock.release(result=tools_added)
+        return {'tools_added': tools_added, 'attached': False, 'owner': lock.owner}
+
+    async def _attach_remote(self, lock):
+        """Wait for another process's sync to finish and report its result"""
+        doc = await lock.holder()
+        owner = doc.get('owner') if doc else None
+        print(f"🔗 Sync already running on {owner}, attaching...")
+        while True:
+            await asyncio.sleep(ATTACH_POLL_SECONDS)
+            doc = await lock.holder()
+            if not doc or doc.get('owner') != owner or doc.get('status') == 'finished':
+                break
+            if _as_utc(doc['expires_at']) < _now():
+                return {'tools_added': 0, 'attached': True, 'owner': owner,
+                        'error': 'Running sync stopped renewing its lease'}
+        if doc and doc.get('owner') == owner:
+            if doc.get('error'):
+                raise RuntimeError(doc['error'])
+            return {'tools_added': doc.get('result') or 0, 'attached': True, 'owner': owner}
+        return {'tools_added': 0, 'attached': True, 'owner': owner}
+
+
+sync_flight = SingleFlight()
+
+
+async def run_sync(scraper='playwright'):
+    """Single-flight sync_tools() with the given scraper"""
+    from database import get_db
+    if scraper == 'aiohttp':
+        from sync_tools import sync_tools
+    elif scraper == 'workers':
+        from crawl_worker import sync_tools
+    else:
+        from sync_tools_playwright import sync_tools
+    return await sync_flight.run(get_db(), sync_tools)
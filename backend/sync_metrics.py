@@ -0,0 +1,108 @@
+"""
+Per-phase timing and resource instrumentation for sync runs
+Scrapers wrap each phase (navigation, scroll, detail page, DB save, ...) in a
+span; durations are aggregated into count/p50/p95/max per phase and stored
+on the run's `sync_runs` document together with peak process RSS and
+Chromium memory, so slow phases and regressions are visible per run.
+"""
+import math
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Configuration
+MEMORY_SAMPLE_EVERY = 10  # spans between memory samples (psutil walks the process tree)
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def process_peak_rss_mb():
+    """Peak resident memory of this process so far, in MB"""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # KB on Linux
+
+
+class SyncMetrics:
+    """Collects phase spans and memory peaks for one sync run"""
+
+    def __init__(self, chromium_probe=None):
+        self.samples = {}
+        self.errors = {}
+        self.chromium_probe = chromium_probe
+        self.peak_chromium_mb = None
+        self.started = time.monotonic()
+        self._spans = 0
+
+    @contextmanager
+    def span(self, phase):
+        """Time the enclosed block as one sample of phase (failures are counted too)"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.errors[phase] = self.errors.get(phase, 0) + 1
+            raise
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def record(self, phase, seconds):
+        self.samples.setdefault(phase, []).append(seconds)
+        self._spans += 1
+        if self._spans % MEMORY_SAMPLE_EVERY == 0:
+            self.sample_memory()
+
+    def sample_memory(self):
+        if self.chromium_probe is None:
+            return
+        try:
+            current = self.chromium_probe()
+        except Exception:
+            return
+        if current is not None:
+            self.peak_chromium_mb = max(current, self.peak_chromium_mb or 0)
+
+    def phases(self):
+        """{phase: {count, total_s, p50_s, p95_s, max_s, errors}}"""
+        return {
+            phase: {
+                'count': len(values),
+                'total_s': round(sum(values), 3),
+                'p50_s': round(percentile(values, 50), 3),
+                'p95_s': round(percentile(values, 95), 3),
+                'max_s': round(max(values), 3),
+                'errors': self.errors.get(phase, 0),
+            }
+            for phase, values in self.samples.items()
+        }
+
+    def report(self):
+        """Document stored with the run"""
+        self.sample_memory()
+        return {
+            'wall_s': round(time.monotonic() - self.started, 1),
+            'phases': self.phases(),
+            'peak_rss_mb': process_peak_rss_mb(),
+            'peak_chromium_mb': self.peak_chromium_mb,
+        }
+
+    def summary(self):
+        """One line per phase, slowest total first"""
+        phases = sorted(self.phases().items(), key=lambda item: item[1]['total_s'], reverse=True)
+        return '\n'.join(
+            f"   {phase:<16} {stats['count']:>4}x  p50 {stats['p50_s']:.2f}s  p95 {stats['p95_s']:.2f}s  "
+            f"total {stats['total_s']:.1f}s"
+            for phase, stats in phases
+        ) or '   (no spans)'
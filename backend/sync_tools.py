@@ -5,26 +5,27 @@ Scrapes tools and modifies content before saving to database
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 import uuid
 import re
 import random
+import time
 from dotenv import load_dotenv
 from pathlib import Path
+from http_cache import HttpCache
+from throttle import AdaptiveThrottle
+from sync_metrics import SyncMetrics
+from resilience import CircuitBreaker, FetchError, PermanentHTTPError, call_with_retries, check_status
+from database import get_db, close_client
+from catalog_hooks import catalog_changed, TOOLS
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Configuration
-SOURCE_URL = "https://aitoolsdirectory.com"
-RATE_LIMIT_DELAY = 2  # seconds between requests
+SOURCE_URL = os.environ.get("SYNC_SOURCE_URL", "https://aitoolsdirectory.com")  # override to replay fixtures
+RATE_LIMIT_DELAY = 2  # initial seconds between requests (adapted per host at runtime)
 MAX_TOOLS_PER_RUN = 50
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -93,9 +94,15 @@ class ContentModifier:
 class AIToolsScraper:
     """Scraper for AI Tools Directory"""
     
-    def __init__(self):
+    def __init__(self, source_url=None, cache=None, database=None):
         self.session = None
         self.modifier = ContentModifier()
+        self.cache = cache or HttpCache()
+        self.source_url = source_url or SOURCE_URL
+        self.db = database if database is not None else get_db()
+        self.throttle = AdaptiveThrottle(RATE_LIMIT_DELAY)
+        self.breaker = CircuitBreaker(self.source_url)
+        self.metrics = SyncMetrics()
         
     async def __aenter__(self):
         headers = {
@@ -113,19 +120,54 @@ class AIToolsScraper:
             await self.session.close()
     
     async def fetch_page(self, url):
-        """Fetch a page with rate limiting"""
+        """Fetch a page with adaptive rate limiting and retries, revalidating against the HTTP cache
+        
+        Returns None for pages that do not exist (4xx); raises FetchError when the
+        source keeps failing and CircuitOpenError once it is considered down.
+        """
         try:
-            await asyncio.sleep(RATE_LIMIT_DELAY)
-            async with self.session.get(url, timeout=30) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    print(f"❌ Error fetching {url}: Status {response.status}")
-                    return None
-        except Exception as e:
-            print(f"❌ Exception fetching {url}: {str(e)}")
+            headers = self.cache.conditional_headers(url)
+            status, html, response_headers = await self._get_with_retries(url, headers)
+            if status == 304:
+                self.cache.mark_not_modified(url)
+                body = self.cache.read_body(url)
+                if body is not None:
+                    print(f"♻️  Not modified: {url}")
+                    return body
+                # Cached body is gone - fall back to a full download
+                status, html, response_headers = await self._get_with_retries(url)
+            if status != 200:
+                print(f"❌ Error fetching {url}: Status {status}")
+                return None
+            self.cache.store(url, html, response_headers)
+            return html
+        except PermanentHTTPError as e:
+            print(f"❌ Error fetching {url}: Status {e.status}")
             return None
     
+    async def _get_with_retries(self, url, headers=None):
+        return await call_with_retries(lambda: self._get(url, headers), description=f"GET {url}",
+                                       breaker=self.breaker, before=lambda: self.throttle.wait(url))
+    
+    async def _get(self, url, headers=None):
+        """One GET -> (status, text, headers); feeds the response back to the throttle
+
+        The caller waits for the throttle first (outside the per-attempt timeout).
+        """
+        started = time.monotonic()
+        try:
+            async with self.session.get(url, headers=headers, timeout=30) as response:
+                html = await response.text() if response.status == 200 else None
+                self.throttle.record(url, response.status, time.monotonic() - started,
+                                     response.headers.get('Retry-After'))
+                check_status(url, response.status)
+                return response.status, html, response.headers
+        except FetchError:
+            raise
+        except Exception:
+            self.throttle.record(url, None, None)
+            raise
+    
     async def parse_tool_card(self, card_html):
         """Parse individual tool card - CUSTOMIZE BASED ON ACTUAL HTML STRUCTURE"""
         try:
@@ -186,12 +228,16 @@ class AIToolsScraper:
     
     async def scrape_tools_list(self, page_url=None):
         """Scrape tools from main listing page"""
-        url = page_url or SOURCE_URL
+        url = page_url or self.source_url
         
-        html = await self.fetch_page(url)
+        with self.metrics.span('navigation'):
+            html = await self.fetch_page(url)
         if not html:
             return []
         
+        # An unchanged listing is still parsed: a previous run may have stopped at
+        # MAX_TOOLS_PER_RUN or failed to save some of its cards
+        started = time.perf_counter()
         soup = BeautifulSoup(html, 'html.parser')
         
         # TODO: Customize this selector based on actual HTML structure
@@ -209,13 +255,14 @@ class AIToolsScraper:
                 tool['tags'] = self.modifier.modify_tags(tool['tags'])
                 tools.append(tool)
         
+        self.metrics.record('list_extraction', time.perf_counter() - started)
         return tools
     
     async def save_tool_to_db(self, tool_data):
         """Save tool to database"""
         try:
             # Check if tool already exists
-            existing = await db.tools.find_one({
+            existing = await self.db.tools.find_one({
                 '$or': [
                     {'name': tool_data['name']},
                     {'website_url': tool_data['website_url']}
@@ -241,11 +288,11 @@ class AIToolsScraper:
                 'is_active': True,
                 'created_at': datetime.utcnow(),
                 'updated_at': datetime.utcnow(),
-                'synced_from': SOURCE_URL,
+                'synced_from': self.source_url,
                 'synced_at': datetime.utcnow(),
             }
             
-            await db.tools.insert_one(tool)
+            await self.db.tools.insert_one(tool)
             print(f"✅ Saved tool: {tool['name']}")
             return True
             
@@ -261,6 +308,7 @@ async def sync_tools():
     print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*60)
     
+    started_at = datetime.now(timezone.utc)
     try:
         async with AIToolsScraper() as scraper:
             # Scrape tools
@@ -271,12 +319,32 @@ async def sync_tools():
             # Save to database
             saved_count = 0
             for tool in tools:
-                if await scraper.save_tool_to_db(tool):
-                    saved_count += 1
+                with scraper.metrics.span('db_save'):
+                    if await scraper.save_tool_to_db(tool):
+                        saved_count += 1
+            
+            await scraper.db.sync_runs.insert_one({
+                'id': str(uuid.uuid4()),
+                'source_url': scraper.source_url,
+                'scraper': 'aiohttp',
+                'status': 'completed',
+                'started_at': started_at,
+                'finished_at': datetime.now(timezone.utc),
+                'discovered': len(tools),
+                'saved': saved_count,
+                'throttle': scraper.throttle.report(),
+                'http_cache': scraper.cache.stats,
+                'metrics': scraper.metrics.report(),
+            })
+            if saved_count:
+                await catalog_changed(scraper.db, TOOLS)
             
             print("\n" + "="*60)
             print(f"✅ Sync completed!")
             print(f"📊 New tools added: {saved_count}/{len(tools)}")
+            print(f"♻️  HTTP cache: {scraper.cache.summary()}")
+            print(f"🚦 Request rate: {scraper.throttle.summary()}")
+            print(f"⏱️  Phases:\n{scraper.metrics.summary()}")
             print("="*60)
             
             return saved_count
@@ -284,9 +352,15 @@ async def sync_tools():
     except Exception as e:
         print(f"\n❌ Sync failed: {str(e)}")
         return 0
+
+
+async def main():
+    """Standalone run: sync once, then close the DB client"""
+    try:
+        await sync_tools()
     finally:
-        client.close()
+        close_client()
 
 
 if __name__ == "__main__":
-    asyncio.run(sync_tools())
+    asyncio.run(main())
@@ -4,8 +4,7 @@ Works with SPA sites like aitoolsdirectory.com
 Enhanced version: Visits detail pages to get accurate category, price, and FULL description
 """
 import asyncio
-from playwright.async_api import async_playwright
-from motor.motor_asyncio import AsyncIOMotorClient
+import time
 from datetime import datetime, timezone
 import os
 import uuid
@@ -13,21 +12,198 @@ import re
 import random
 from dotenv import load_dotenv
 from pathlib import Path
+from urllib.parse import urlsplit
+from http_cache import HttpCache, conditional_headers_for, validators
+from throttle import AdaptiveThrottle
+from page_archive import PageArchive, LISTING, DETAIL
+from resilience import (CircuitBreaker, CircuitOpenError, FetchError, PermanentHTTPError, call_with_retries,
+                        check_status)
+from browser_pool import get_browser_pool, chromium_rss_mb
+from image_pipeline import mirror_images
+from html_sanitizer import sanitize_in_pool, SANITIZE_BATCH_SIZE
+from crawl_state import CrawlState, EXTRACTED, SYNC_TIME_BUDGET_SECONDS, CLAIM_POLL_SECONDS
+from spa_api import merge_tool_records
+from sitemap_discovery import discover_from_sitemap
+from sync_metrics import SyncMetrics
+from database import get_db, close_client
+from catalog_hooks import catalog_changed, TOOLS
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Configuration
-SOURCE_URL = "https://aitoolsdirectory.com"
-RATE_LIMIT_DELAY = 3  # seconds between requests
+SOURCE_URL = os.environ.get("SYNC_SOURCE_URL", "https://aitoolsdirectory.com")  # override to replay fixtures
+RATE_LIMIT_DELAY = 3  # initial seconds between requests (adapted per host at runtime)
 MAX_TOOLS_PER_RUN = 30  # Get up to 50 tools per run
 SCROLL_PAUSE = 2  # seconds to wait after scrolling
-DETAIL_PAGE_DELAY = 3  # seconds between detail page visits
+DETAIL_PAGE_DELAY = 3  # initial seconds between detail page visits
+
+# Extractors, run in the page (live, or over an archived snapshot by reextract.py)
+DETAIL_EXTRACTOR_JS = '''() => {
+    // Extract category from badges - sv-badge__4 class
+    let category = 'AI Tools';
+    const badges = document.querySelectorAll('.sv-badge');
+    
+    for (const badge of badges) {
+        const className = badge.className;
+        const text = badge.textContent.trim();
+        
+        // Category badge has class "sv-badge__4"
+        if (className.includes('sv-badge__4') && text.length > 0 && !text.startsWith('#')) {
+            category = text;
+            break;
+        }
+    }
+    
+    // Extract price type from badges - sv-badge__3 class
+    let priceType = 'Unknown';
+    
+    for (const badge of badges) {
+        const className = badge.className;
+        const text = badge.textContent.trim().toLowerCase();
+        
+        // Price badge has class "sv-badge__3"
+        if (className.includes('sv-badge__3')) {
+            if (text.includes('free') && !text.includes('trial')) {
+                priceType = 'Free';
+            } else if (text.includes('freemium') || text.includes('free trial')) {
+                priceType = 'Freemium';
+            } else if (text.includes('paid') || text.includes('premium')) {
+                priceType = 'Paid';
+            } else {
+                // Just take the text as-is if it's a price badge
+                priceType = text.charAt(0).toUpperCase() + text.slice(1);
+            }
+            break;
+        }
+    }
+    
+    // Extract FULL description with all content (paragraphs, headings, lists)
+    let descriptionFull = '';
+    let descriptionShort = '';
+    
+    const descContainer = document.querySelector('.sv-product-page__string, .sv-product-string');
+    
+    if (descContainer) {
+        // Clone the container to manipulate it
+        const clone = descContainer.cloneNode(true);
+        
+        // Remove unwanted elements
+        clone.querySelectorAll('script, style, .advertisement').forEach(el => el.remove());
+        
+        // Get FULL HTML content (includes <h3>, <ul>, <li>, etc.)
+        descriptionFull = clone.innerHTML.trim();
+        
+        // Get short description (first paragraph only for homepage preview)
+        const firstPara = descContainer.querySelector('p');
+        if (firstPara) {
+            descriptionShort = firstPara.textContent.trim();
+        }
+    }
+    
+    // Fallback for short description
+    if (!descriptionShort) {
+        const paragraphs = Array.from(document.querySelectorAll('main p, article p'))
+            .map(p => p.textContent.trim())
+            .filter(text => text.length > 30);
+        descriptionShort = paragraphs[0] || 'No description available';
+    }
+    
+    // Fallback for full description
+    if (!descriptionFull) {
+        descriptionFull = descriptionShort;
+    }
+    
+    // Name and image, for tools discovered without a listing card (sitemap)
+    const meta = (property) => document.querySelector(`meta[property="${property}"]`)?.getAttribute('content') || '';
+    const name = document.querySelector('h1')?.textContent?.trim() || meta('og:title');
+    const image = meta('og:image');
+    
+    return {
+        category: category,
+        price_type: priceType,
+        description_short: descriptionShort.substring(0, 200), // Max 200 chars for homepage
+        description_full: descriptionFull,
+        name: name,
+        image_url: image ? new URL(image, window.location.origin).href : ''
+    };
+}'''
+
+LISTING_EXTRACTOR_JS = r'''() => {
+    const tools = [];
+    
+    const selectors = [
+        '.sv-tiles-list a[href*="/tool/"]',
+        'div[class*="sv-tiles"] a[href*="/tool/"]',
+        'a[href^="/tool/"]'
+    ];
+    
+    const foundLinks = new Set();
+    
+    selectors.forEach(selector => {
+        document.querySelectorAll(selector).forEach(link => {
+            const href = link.href;
+            
+            if (!href || foundLinks.has(href) || 
+                href.includes('#') || 
+                href === window.location.href ||
+                !href.includes('/tool/')) {
+                return;
+            }
+            
+            foundLinks.add(href);
+            
+            let container = link.closest('article, .card, .tool, .item, .sv-tile, [class*="card"]');
+            if (!container) container = link.parentElement;
+            
+            const heading = container?.querySelector('h1, h2, h3, h4, h5, [class*="title"], [class*="name"]');
+            const name = heading?.textContent?.trim() || 
+                       link.textContent?.trim() ||
+                       link.getAttribute('title') ||
+                       link.getAttribute('aria-label') ||
+                       'Unknown Tool';
+            
+            let imageUrl = '';
+            
+            const imgDiv = container?.querySelector('div[role="img"]') || 
+                           container?.querySelector('.sv-tile__image') ||
+                           container?.querySelector('div[class*="image"]');
+            
+            if (imgDiv) {
+                const style = window.getComputedStyle(imgDiv);
+                const bgImage = style.backgroundImage;
+                
+                if (bgImage && bgImage !== 'none') {
+                    const match = bgImage.match(/url\(["']?([^"')]+)["']?\)/);
+                    if (match) {
+                        imageUrl = match[1];
+                    }
+                }
+            }
+            
+            if (!imageUrl) {
+                const img = container?.querySelector('img');
+                imageUrl = img?.src || img?.getAttribute('data-src') || '';
+            }
+            
+            const finalImageUrl = imageUrl && !imageUrl.startsWith('http') 
+                ? new URL(imageUrl, window.location.origin).href 
+                : imageUrl;
+            
+            const tagElements = container?.querySelectorAll('.tag, .badge, .label, [class*="tag"]') || [];
+            const tags = Array.from(tagElements).map(t => t.textContent?.trim()).filter(Boolean);
+            
+            tools.push({
+                name: name,
+                website_url: href,
+                image_url: finalImageUrl,
+                tags: tags
+            });
+        });
+    });
+    
+    return tools;
+}'''
 
 class ContentModifier:
     """Modify scraped content to make it unique"""
@@ -78,128 +254,177 @@ class ContentModifier:
 class PlaywrightScraper:
     """Scraper using Playwright for JavaScript-rendered sites"""
     
-    def __init__(self):
+    def __init__(self, source_url=None, cache=None, database=None, pool=None, archive=None):
         self.modifier = ContentModifier()
-        self.playwright = None
-        self.browser = None
+        self.cache = cache or HttpCache()
+        self.archive = archive or PageArchive()
+        self.source_url = source_url or SOURCE_URL
+        self.db = database if database is not None else get_db()
+        self.pool = pool or get_browser_pool()
         self.page = None
+        self.throttle = AdaptiveThrottle(DETAIL_PAGE_DELAY)
+        self.breaker = CircuitBreaker(self.source_url)
+        self.metrics = SyncMetrics(chromium_probe=chromium_rss_mb)
     
     async def __aenter__(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=True)
-        self.page = await self.browser.new_page()
+        # Browser stays warm in the pool; this run only leases a context
+        self.page = await self.pool.acquire_page()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.page:
-            await self.page.close()
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        await self.pool.release_page(self.page)
+        self.page = None
+    
+    async def goto(self, url, throttled=True, **kwargs):
+        """Throttled page.goto; the response status and latency tune the host's rate
+
+        Pass throttled=False when the caller already waited (see extract_tool_details).
+        """
+        if throttled:
+            await self.throttle.wait(url)
+        started = time.monotonic()
+        try:
+            response = await self.page.goto(url, **kwargs)
+        except Exception:
+            self.throttle.record(url, None, None)
+            raise
+        status = response.status if response else 200
+        retry_after = response.headers.get('retry-after') if response else None
+        self.throttle.record(url, status, time.monotonic() - started, retry_after)
+        return response
+    
+    async def revalidate_details(self, tool_url):
+        """Return cached details if every data response the page was built from answers 304
+
+        The detail page is an SPA shell whose own validators do not change with
+        the data, so the JSON responses recorded when it was rendered are checked
+        instead; a page rendered without validated data is always re-rendered.
+        """
+        meta = self.cache.get(tool_url)
+        if not meta or not meta.get('extracted') or not meta.get('sources'):
+            return None
+        for source in meta['sources']:
+            await self.throttle.wait(source['url'])
+            started = time.monotonic()
+            try:
+                response = await self.page.request.get(source['url'], headers=conditional_headers_for(source),
+                                                       timeout=15000)
+                status = response.status
+                self.throttle.record(source['url'], status, time.monotonic() - started,
+                                     response.headers.get('retry-after'))
+                await response.dispose()
+            except Exception as e:
+                self.throttle.record(source['url'], None, None)
+                print(f"      ⚠️  Revalidation failed: {str(e)}")
+                return None
+            if status != 304:
+                return None
+        self.cache.mark_not_modified(tool_url)
+        return dict(meta['extracted'], from_cache=True)
     
     async def extract_tool_details(self, tool_url):
-        """Visit tool detail page and extract full information"""
+        """Visit tool detail page and extract full information
+        
+        Transient failures are retried; raises FetchError when the page keeps
+        failing and CircuitOpenError when the whole source looks down.
+        """
+        cached = await self.revalidate_details(tool_url)
+        if cached:
+            print(f"   ♻️  Detail page not modified, using cached details")
+            return cached
+        
+        return await call_with_retries(lambda: self.render_tool_details(tool_url),
+                                       description="Detail page", breaker=self.breaker,
+                                       before=lambda: self.throttle.wait(tool_url))
+    
+    async def render_tool_details(self, tool_url):
+        """Load the detail page once and extract its information"""
+        data_responses = []
+        
+        def on_response(response):
+            if response.request.resource_type in ('xhr', 'fetch') and \
+                    urlsplit(response.url).netloc == urlsplit(tool_url).netloc:
+                data_responses.append(response)
+        
+        self.page.on('response', on_response)
         try:
             print(f"   🔍 Visiting detail page...")
-            await self.page.goto(tool_url, wait_until='networkidle', timeout=30000)
+            response = await self.goto(tool_url, throttled=False, wait_until='networkidle', timeout=30000)
+            check_status(tool_url, response.status if response else None)
             await self.page.wait_for_timeout(2000)
             
-            details = await self.page.evaluate('''() => {
-                // Extract category from badges - sv-badge__4 class
-                let category = 'AI Tools';
-                const badges = document.querySelectorAll('.sv-badge');
-                
-                for (const badge of badges) {
-                    const className = badge.className;
-                    const text = badge.textContent.trim();
-                    
-                    // Category badge has class "sv-badge__4"
-                    if (className.includes('sv-badge__4') && text.length > 0 && !text.startsWith('#')) {
-                        category = text;
-                        break;
-                    }
-                }
-                
-                // Extract price type from badges - sv-badge__3 class
-                let priceType = 'Unknown';
-                
-                for (const badge of badges) {
-                    const className = badge.className;
-                    const text = badge.textContent.trim().toLowerCase();
-                    
-                    // Price badge has class "sv-badge__3"
-                    if (className.includes('sv-badge__3')) {
-                        if (text.includes('free') && !text.includes('trial')) {
-                            priceType = 'Free';
-                        } else if (text.includes('freemium') || text.includes('free trial')) {
-                            priceType = 'Freemium';
-                        } else if (text.includes('paid') || text.includes('premium')) {
-                            priceType = 'Paid';
-                        } else {
-                            // Just take the text as-is if it's a price badge
-                            priceType = text.charAt(0).toUpperCase() + text.slice(1);
-                        }
-                        break;
-                    }
-                }
-                
-                // Extract FULL description with all content (paragraphs, headings, lists)
-                let descriptionFull = '';
-                let descriptionShort = '';
-                
-                const descContainer = document.querySelector('.sv-product-page__string, .sv-product-string');
-                
-                if (descContainer) {
-                    // Clone the container to manipulate it
-                    const clone = descContainer.cloneNode(true);
-                    
-                    // Remove unwanted elements
-                    clone.querySelectorAll('script, style, .advertisement').forEach(el => el.remove());
-                    
-                    // Get FULL HTML content (includes <h3>, <ul>, <li>, etc.)
-                    descriptionFull = clone.innerHTML.trim();
-                    
-                    // Get short description (first paragraph only for homepage preview)
-                    const firstPara = descContainer.querySelector('p');
-                    if (firstPara) {
-                        descriptionShort = firstPara.textContent.trim();
-                    }
-                }
-                
-                // Fallback for short description
-                if (!descriptionShort) {
-                    const paragraphs = Array.from(document.querySelectorAll('main p, article p'))
-                        .map(p => p.textContent.trim())
-                        .filter(text => text.length > 30);
-                    descriptionShort = paragraphs[0] || 'No description available';
-                }
-                
-                // Fallback for full description
-                if (!descriptionFull) {
-                    descriptionFull = descriptionShort;
-                }
-                
-                return {
-                    category: category,
-                    price_type: priceType,
-                    description_short: descriptionShort.substring(0, 200), // Max 200 chars for homepage
-                    description_full: descriptionFull
-                };
-            }''')
+            details = await self.page.evaluate(DETAIL_EXTRACTOR_JS)
             
             print(f"      ✅ Category: {details['category']}, Price: {details['price_type']}")
             print(f"      📝 Short: {len(details['description_short'])} chars, Full: {len(details['description_full'])} chars")
+            
+            # Keep the rendered DOM (archive for re-extraction; cache with data validators and details for the next run)
+            html = await self.page.content()
+            await self.archive.save(self.db, tool_url, DETAIL, html, self.source_url)
+            if response and response.ok:
+                self.cache.store(tool_url, html, extracted=details, sources=self.data_sources(data_responses))
             return details
             
         except Exception as e:
             print(f"      ⚠️  Could not extract details: {str(e)}")
-            return {
-                'category': 'AI Tools',
-                'price_type': 'Unknown',
-                'description_short': 'No description available',
-                'description_full': 'No description available'
-            }
+            raise
+        finally:
+            self.page.remove_listener('response', on_response)
+    
+    @staticmethod
+    def data_sources(responses):
+        """Validators of the same-site data responses behind a page, or None if any lacks them"""
+        sources = [validators(response.url, response.headers) for response in responses if response.ok]
+        if not sources or None in sources:
+            return None
+        return sources
+    
+    async def extract_tools_from_api(self):
+        """Load the listing while recording the SPA's XHR/fetch JSON and parse tools from it"""
+        responses = []
+        
+        def on_response(response):
+            if response.request.resource_type not in ('xhr', 'fetch'):
+                return
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            responses.append(response)
+        
+        self.page.on('response', on_response)
+        try:
+            print(f"🌐 Navigating to {self.source_url}...")
+            with self.metrics.span('navigation'):
+                await self.goto(self.source_url, wait_until='networkidle', timeout=60000)
+            print("✅ Page loaded")
+            await self.archive.save(self.db, self.source_url, LISTING, await self.page.content(), self.source_url)
+        finally:
+            self.page.remove_listener('response', on_response)
+        
+        payloads = []
+        for response in responses:
+            try:
+                payloads.append(await response.json())
+            except Exception:
+                continue  # body evicted or not actually JSON
+        
+        tools = merge_tool_records(payloads, self.source_url)
+        print(f"📡 Captured {len(payloads)} API responses, {len(tools)} tools")
+        return tools
+    
+    async def discover_tools(self):
+        """Discover tools from the sitemap, then the SPA's API, scrolling the DOM only as a last resort"""
+        with self.metrics.span('sitemap'):
+            tools = await discover_from_sitemap(self.db, self.source_url)
+        if tools is not None:
+            return tools  # only new/changed tools; an empty list means nothing to do
+        
+        print("↩️  No usable sitemap, discovering from the listing page")
+        tools = await self.extract_tools_from_api()
+        if tools:
+            return tools[:MAX_TOOLS_PER_RUN]
+        
+        print("↩️  No tools in API responses, falling back to DOM scraping")
+        return await self.extract_tools_from_page()
     
     async def extract_tools_from_page(self):
         """Extract tools from the loaded page"""
@@ -210,6 +435,7 @@ class PlaywrightScraper:
             
             # Scroll slowly to load ALL content and trigger lazy loading
             print("📜 Scrolling to load more content...")
+            started = time.perf_counter()
             total_height = await self.page.evaluate('document.body.scrollHeight')
             viewport_height = await self.page.evaluate('window.innerHeight')
             current_position = 0
@@ -221,9 +447,11 @@ class PlaywrightScraper:
                 total_height = await self.page.evaluate('document.body.scrollHeight')
             
             print(f"   ✅ Scrolled to bottom ({total_height}px)")
+            self.metrics.record('scroll', time.perf_counter() - started)
             
             # Trigger lazy loading for images
             print("🖼️  Triggering lazy image loading...")
+            started = time.perf_counter()
             image_count = await self.page.evaluate('''() => {
                 const elements = document.querySelectorAll('div[role="img"], .sv-tile__image');
                 return elements.length;
@@ -244,83 +472,12 @@ class PlaywrightScraper:
             
             print("   ✅ All images triggered")
             await self.page.wait_for_timeout(3000)
+            self.metrics.record('image_trigger', time.perf_counter() - started)
             
-            # Get all tool links
-            tools_data = await self.page.evaluate(r'''() => {
-                const tools = [];
-                
-                const selectors = [
-                    '.sv-tiles-list a[href*="/tool/"]',
-                    'div[class*="sv-tiles"] a[href*="/tool/"]',
-                    'a[href^="/tool/"]'
-                ];
-                
-                const foundLinks = new Set();
-                
-                selectors.forEach(selector => {
-                    document.querySelectorAll(selector).forEach(link => {
-                        const href = link.href;
-                        
-                        if (!href || foundLinks.has(href) || 
-                            href.includes('#') || 
-                            href === window.location.href ||
-                            !href.includes('/tool/')) {
-                            return;
-                        }
-                        
-                        foundLinks.add(href);
-                        
-                        let container = link.closest('article, .card, .tool, .item, .sv-tile, [class*="card"]');
-                        if (!container) container = link.parentElement;
-                        
-                        const heading = container?.querySelector('h1, h2, h3, h4, h5, [class*="title"], [class*="name"]');
-                        const name = heading?.textContent?.trim() || 
-                                   link.textContent?.trim() ||
-                                   link.getAttribute('title') ||
-                                   link.getAttribute('aria-label') ||
-                                   'Unknown Tool';
-                        
-                        let imageUrl = '';
-                        
-                        const imgDiv = container?.querySelector('div[role="img"]') || 
-                                       container?.querySelector('.sv-tile__image') ||
-                                       container?.querySelector('div[class*="image"]');
-                        
-                        if (imgDiv) {
-                            const style = window.getComputedStyle(imgDiv);
-                            const bgImage = style.backgroundImage;
-                            
-                            if (bgImage && bgImage !== 'none') {
-                                const match = bgImage.match(/url\(["']?([^"')]+)["']?\)/);
-                                if (match) {
-                                    imageUrl = match[1];
-                                }
-                            }
-                        }
-                        
-                        if (!imageUrl) {
-                            const img = container?.querySelector('img');
-                            imageUrl = img?.src || img?.getAttribute('data-src') || '';
-                        }
-                        
-                        const finalImageUrl = imageUrl && !imageUrl.startsWith('http') 
-                            ? new URL(imageUrl, window.location.origin).href 
-                            : imageUrl;
-                        
-                        const tagElements = container?.querySelectorAll('.tag, .badge, .label, [class*="tag"]') || [];
-                        const tags = Array.from(tagElements).map(t => t.textContent?.trim()).filter(Boolean);
-                        
-                        tools.push({
-                            name: name,
-                            website_url: href,
-                            image_url: finalImageUrl,
-                            tags: tags
-                        });
-                    });
-                });
-                
-                return tools;
-            }''')
+            # Snapshot the fully scrolled listing, then get all tool links
+            await self.archive.save(self.db, self.source_url, LISTING, await self.page.content(), self.source_url)
+            with self.metrics.span('list_extraction'):
+                tools_data = await self.page.evaluate(LISTING_EXTRACTOR_JS)
             
             print(f"📦 Extracted {len(tools_data)} potential tools")
             
@@ -336,58 +493,171 @@ class PlaywrightScraper:
             traceback.print_exc()
             return []
     
-    async def scrape_tools(self):
-        """Main scraping function"""
+    async def degraded_tools(self, known_urls):
+        """Previously saved degraded tools (failed detail page) to fetch again this run"""
+        cursor = self.db.tools.find(
+            {'needs_refetch': True, 'synced_from': self.source_url},
+            {'_id': 0, 'name': 1, 'website_url': 1, 'image_url': 1, 'tags': 1}
+        ).limit(MAX_TOOLS_PER_RUN)
+        tools = [tool for tool in await cursor.to_list(length=MAX_TOOLS_PER_RUN)
+                 if tool.get('website_url') not in known_urls]
+        if tools:
+            print(f"🔄 Re-fetching {len(tools)} degraded tools from earlier runs")
+        return tools
+    
+    async def process_tool(self, tool):
+        """Visit a tool's detail page and merge the details into its listing data
+
+        Returns None when the detail page is gone (404/410) at the source.
+        """
         try:
-            print(f"🌐 Navigating to {SOURCE_URL}...")
-            await self.page.goto(SOURCE_URL, wait_until='networkidle', timeout=60000)
-            
-            print("✅ Page loaded")
-            
-            # Extract tool list from main page
-            tools = await self.extract_tools_from_page()
-            
-            if not tools:
-                return []
-            
-            # Visit each tool's detail page to get full info
-            print(f"\n🔎 Extracting details from {len(tools)} tool pages...")
-            
-            processed_tools = []
-            for i, tool in enumerate(tools, 1):
-                print(f"\n📄 [{i}/{len(tools)}] {tool['name']}")
-                
-                # Get details from tool detail page
+            with self.metrics.span('detail_page'):
                 details = await self.extract_tool_details(tool['website_url'])
-                
-                # Merge data
-                tool.update(details)
-                
-                # Modify SHORT description for uniqueness (homepage)
-                tool['description_short'] = self.modifier.modify_description(tool['description_short'])
-                
-                # Keep full description as-is (with HTML tags)
-                # Don't modify it to preserve structure
-                
-                tool['tags'] = self.modifier.modify_tags(tool['tags'])
-                
-                processed_tools.append(tool)
-                
-                # Rate limiting
-                if i < len(tools):
-                    await asyncio.sleep(DETAIL_PAGE_DELAY)
-            
-            return processed_tools
-            
-        except Exception as e:
-            print(f"❌ Error scraping: {str(e)}")
-            return []
+        except PermanentHTTPError as e:
+            # Deleted at the source: never store (or keep) a placeholder for it
+            print(f"      🗑️  Gone at source ({e.status}), skipping")
+            await self.retire_tool(tool['website_url'], e)
+            return None
+        except FetchError as e:
+            # Save what the listing gave us, flagged so a later run fetches it again
+            print(f"      ⚠️  Saving degraded record, will re-fetch: {str(e)}")
+            details = {
+                'category': 'AI Tools',
+                'price_type': 'Unknown',
+                'description_short': 'No description available',
+                'description_full': 'No description available',
+                'needs_refetch': True,
+                'refetch_reason': str(e)[:200],
+            }
+        
+        # Merge data (the listing card's name/image win over the detail page's)
+        name = details.pop('name', None)
+        image_url = details.pop('image_url', None)
+        tool.update(details)
+        if name and tool.pop('name_from_slug', False):
+            tool['name'] = name
+        if image_url and not tool.get('image_url'):
+            tool['image_url'] = image_url
+        
+        # Modify SHORT description for uniqueness (homepage)
+        tool['description_short'] = self.modifier.modify_description(tool['description_short'])
+        
+        # Keep full description as-is (with HTML tags)
+        # Don't modify it to preserve structure
+        
+        tool['tags'] = self.modifier.modify_tags(tool['tags'])
+        return tool
+    
+    async def scrape_tools(self, state, deadline=None):
+        """Discover tools (new runs only), then extract and save them one checkpoint at a time"""
+        await self.discover_into(state)
+        stats = await self.work(state, deadline)
+        await state.checkpoint(throttle=self.throttle.report(), metrics=self.metrics.report(),
+                               http_cache=self.cache.stats)
+        return stats
+    
+    async def discover_into(self, state):
+        """Queue the run's detail URLs, unless a resumed run already has them"""
+        if state.needs_discovery:
+            # Extract tool list from the sitemap, the SPA's API or the rendered page
+            tools = await self.discover_tools()
+            tools += await self.degraded_tools({tool['website_url'] for tool in tools})
+            await state.add_urls(tools)
+        else:
+            print(f"⏯️  Resuming run {state.run_id} ({state.run.get('processed', 0)}/{state.run.get('discovered', 0)} done)")
+    
+    async def work(self, state, deadline=None, worker_id=None):
+        """Claim queued URLs until the queue is drained (or the deadline passes); extract and save them
+        
+        Several workers (processes) can work the same run; each URL is leased to one of them.
+        """
+        worker_id = worker_id or f"{os.getpid()}"
+        stats = {'processed': 0, 'saved': 0, 'paused': False}
+        total = await state.count_remaining()
+        if not total:
+            return stats
+        
+        # Visit each tool's detail page to get full info
+        print(f"\n🔎 Extracting details from {total} tool pages...")
+        
+        batch = []  # extracted tools waiting for sanitizing + save
+        i = 0
+        while True:
+            if deadline and time.monotonic() >= deadline:
+                print(f"\n⏸️  Time budget reached, checkpointing")
+                await state.pause('time_budget')
+                stats['paused'] = True
+                break
+            
+            entry = await state.claim(worker_id)
+            if entry is None:
+                if not await state.count_remaining():
+                    break
+                # Every remaining URL is leased: wait for other workers to finish them, or for
+                # the lease of a crashed one to expire
+                await self.save_batch(state, batch, stats)
+                batch = []
+                await asyncio.sleep(CLAIM_POLL_SECONDS)
+                continue
+            i += 1
+            url = entry['url']
+            print(f"\n📄 [{i}/{total}] {entry['listing']['name']}")
+            try:
+                if entry['status'] == EXTRACTED:
+                    tool = entry['result']  # extracted before an interruption, only the save is missing
+                else:
+                    # Rate limiting happens per request inside the adaptive throttle
+                    tool = await self.process_tool(dict(entry['listing']))
+                    if tool is not None:
+                        await state.mark_extracted(url, tool)
+                if tool is None:
+                    await state.mark_done(url, saved=False)  # gone at the source
+                else:
+                    batch.append((url, tool))
+            except CircuitOpenError:
+                await state.release(url)
+                raise  # source is down: abort the run, the checkpoints let the next one resume
+            except Exception as e:
+                print(f"      ❌ Failed: {str(e)}")
+                await state.mark_failed(url, e)
+            
+            if len(batch) >= SANITIZE_BATCH_SIZE:
+                await self.save_batch(state, batch, stats)
+                batch = []
+            else:
+                # Batched URLs are not done yet; keep them leased to this worker
+                await state.renew([batch_url for batch_url, _ in batch], worker_id)
+            
+            # Fresh context every N pages / past the memory limit
+            self.page = await self.pool.recycle_if_needed(self.page)
+        
+        await self.save_batch(state, batch, stats)
+        return stats
+    
+    async def save_batch(self, state, batch, stats):
+        """Sanitize a batch of descriptions in the process pool, then save and checkpoint each tool"""
+        if not batch:
+            return
+        with self.metrics.span('sanitize'):
+            cleaned = await sanitize_in_pool(tool.get('description_full') or '' for _, tool in batch)
+        for (url, tool), description_full in zip(batch, cleaned):
+            tool['description_full'] = description_full
+            try:
+                with self.metrics.span('db_save'):
+                    saved = await self.save_tool_to_db(tool)
+                    await state.mark_done(url, saved)
+            except Exception as e:
+                print(f"      ❌ Failed to save {tool.get('name')}: {str(e)}")
+                await state.mark_failed(url, e)
+                continue
+            stats['processed'] += 1
+            stats['saved'] += int(saved)
     
     async def save_tool_to_db(self, tool_data):
         """Save tool to database"""
         try:
             # Check if tool already exists
-            existing = await db.tools.find_one({
+            existing = await self.db.tools.find_one({
                 '$or': [
                     {'name': tool_data['name']},
                     {'website_url': tool_data['website_url']}
@@ -395,6 +665,8 @@ class PlaywrightScraper:
             })
             
             if existing:
+                if not tool_data.get('needs_refetch') and (existing.get('needs_refetch') or self.is_newer(tool_data, existing)):
+                    return await self.refresh_tool(existing, tool_data)
                 print(f"⏭️  Tool already exists: {tool_data['name']}")
                 return False
             
@@ -414,74 +686,146 @@ class PlaywrightScraper:
                 'is_active': True,
                 'created_at': datetime.now(timezone.utc),
                 'updated_at': datetime.now(timezone.utc),
-                'synced_from': SOURCE_URL,
+                'synced_from': self.source_url,
                 'synced_at': datetime.now(timezone.utc),
             }
+            if tool_data.get('source_lastmod'):
+                tool['source_lastmod'] = tool_data['source_lastmod']
+            if tool_data.get('needs_refetch'):
+                tool['needs_refetch'] = True
+                tool['refetch_reason'] = tool_data.get('refetch_reason')
             
-            await db.tools.insert_one(tool)
+            await self.db.tools.insert_one(tool)
             print(f"✅ Saved: {tool['name']} | {tool['category']} | {tool['price_type']}")
             return True
             
         except Exception as e:
             print(f"❌ Error saving tool {tool_data.get('name')}: {str(e)}")
             return False
+    
+    @staticmethod
+    def is_newer(tool_data, existing):
+        """Sitemap lastmod says the source page changed since the stored copy"""
+        lastmod = tool_data.get('source_lastmod')
+        if not lastmod:
+            return False
+        stored = existing.get('source_lastmod')
+        if stored is None:
+            return True
+        # Mongo hands datetimes back naive (UTC)
+        as_utc = lambda value: value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+        return as_utc(lastmod) > as_utc(stored)
+    
+    async def refresh_tool(self, existing, tool_data):
+        """Update the scraped fields of a degraded tool, or one whose source page changed"""
+        fields = {
+            'description': tool_data.get('description_short', 'No description available')[:200],
+            'description_full': tool_data.get('description_full', tool_data.get('description_short', '')),
+            'category': tool_data.get('category', 'AI Tools'),
+            'price_type': tool_data.get('price_type', 'Unknown'),
+            'tags': tool_data.get('tags', [])[:10] or existing.get('tags', []),
+            'updated_at': datetime.now(timezone.utc),
+            'synced_at': datetime.now(timezone.utc),
+        }
+        if tool_data.get('source_lastmod'):
+            fields['source_lastmod'] = tool_data['source_lastmod']
+        if existing.get('needs_refetch') and not tool_data.get('name_from_slug'):
+            fields['name'] = tool_data['name'][:100]  # degraded sitemap tools only had a slug name
+        if not existing.get('image_url') and tool_data.get('image_url'):
+            fields['image_url'] = tool_data['image_url']
+        await self.db.tools.update_one(
+            {'id': existing['id']},
+            {
+                '$set': fields,
+                '$unset': {'needs_refetch': '', 'refetch_reason': ''},
+            }
+        )
+        reason = 'degraded' if existing.get('needs_refetch') else 'changed at source'
+        print(f"🔄 Updated ({reason}): {existing['name']} | {fields['category']} | {fields['price_type']}")
+        return False
+    
+    async def retire_tool(self, website_url, error):
+        """Hide a synced tool whose detail page no longer exists at the source"""
+        result = await self.db.tools.update_one(
+            {'website_url': website_url, 'synced_from': self.source_url, 'is_active': {'$ne': False}},
+            {
+                '$set': {'is_active': False, 'removed_at_source': datetime.now(timezone.utc),
+                         'updated_at': datetime.now(timezone.utc), 'refetch_reason': str(error)[:200]},
+                '$unset': {'needs_refetch': ''},
+            }
+        )
+        if result.modified_count:
+            print(f"      🙈 Deactivated: {website_url}")
 
 
-async def sync_tools():
-    """Main sync function"""
+async def sync_tools(time_budget=None):
+    """Main sync function
+    
+    Resumes the last unfinished run if there is one. time_budget (seconds,
+    default SYNC_TIME_BUDGET_SECONDS) stops the run cleanly at a checkpoint;
+    the next call continues from there.
+    """
+    time_budget = SYNC_TIME_BUDGET_SECONDS if time_budget is None else time_budget
+    deadline = time.monotonic() + time_budget if time_budget else None
+    
     print("="*60)
     print("🚀 Starting AI Tools Sync (Enhanced with Full Description)")
     print(f"📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"🌐 Source: {SOURCE_URL}")
     print(f"📊 Max tools per run: {MAX_TOOLS_PER_RUN}")
+    if time_budget:
+        print(f"⏱️  Time budget: {time_budget}s")
     print("="*60)
     
+    db = get_db()
+    state = None
     try:
+        state = await CrawlState.resume_or_start(db, SOURCE_URL)
+        await PageArchive.ensure_indexes(db)
         async with PlaywrightScraper() as scraper:
-            # Scrape tools
-            tools = await scraper.scrape_tools()
-            
-            print(f"\n📦 Scraped {len(tools)} tools with full details")
-            
-            if not tools:
+            stats = await scraper.scrape_tools(state, deadline)
+            
+            if not stats['paused'] and await state.count_remaining():
+                await state.pause('incomplete: URLs left in the queue')
+            elif not stats['paused']:
+                await state.finish()
+                # Hot-linked source images -> local thumbnails
+                await mirror_images(db, notify=False)
+                # Sitemap and other derived artifacts catch up once per run
+                await catalog_changed(db, TOOLS)
+            
+            if not state.run.get('discovered'):
                 print("⚠️  No tools found. The website structure may have changed.")
-                return 0
-            
-            # Show sample
-            if tools:
-                print("\n📋 Sample tool:")
-                sample = tools[0]
-                print(f"   Name: {sample['name']}")
-                print(f"   Category: {sample.get('category', 'N/A')}")
-                print(f"   Price: {sample.get('price_type', 'N/A')}")
-                print(f"   URL: {sample['website_url'][:60]}...")
-                print(f"   Short Desc: {sample.get('description_short', 'N/A')[:100]}...")
-                print(f"   Full Desc Length: {len(sample.get('description_full', ''))} chars")
-                print(f"   Image: {sample.get('image_url', 'N/A')[:60]}...")
-                print()
-            
-            # Save to database
-            saved_count = 0
-            for tool in tools:
-                if await scraper.save_tool_to_db(tool):
-                    saved_count += 1
-                await asyncio.sleep(0.1)
             
             print("\n" + "="*60)
-            print(f"✅ Sync completed!")
-            print(f"📊 New tools added: {saved_count}/{len(tools)}")
+            print(f"✅ Sync {'paused (will resume next run)' if stats['paused'] else 'completed'}!")
+            print(f"📊 New tools added: {stats['saved']}/{stats['processed']}")
+            print(f"♻️  HTTP cache: {scraper.cache.summary()}")
+            print(f"🚦 Request rate: {scraper.throttle.summary()}")
+            print(f"🗄️  Page archive: {scraper.archive.summary()}")
+            print(f"⏱️  Phases:\n{scraper.metrics.summary()}")
             print("="*60)
             
-            return saved_count
+            return stats['saved']
             
     except Exception as e:
         print(f"\n❌ Sync failed: {str(e)}")
         import traceback
         traceback.print_exc()
+        if state:
+            # Keep the checkpoints so the next run resumes instead of starting over
+            await state.pause(f"error: {str(e)[:200]}")
         return 0
+
+
+async def main():
+    """Standalone run: sync once, then shut the shared browser and DB client down"""
+    try:
+        await sync_tools()
     finally:
-        client.close()
+        await get_browser_pool().close()
+        close_client()
 
 
 if __name__ == "__main__":
-    asyncio.run(sync_tools())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Adaptive per-host politeness throttling for the scrapers
+Each host gets its own delay between requests: shortened step by step while
+responses are fast and healthy, doubled on 429/5xx or when latency climbs
+well above the host's baseline, and held off entirely for a Retry-After.
+The baseline follows improvements at once and drifts up slowly otherwise, so
+a host that settles at a new, slower latency is eventually treated as healthy.
+"""
+import asyncio
+import os
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# Configuration
+THROTTLE_MIN_DELAY = float(os.environ.get('THROTTLE_MIN_DELAY', 0.5))  # fastest we ever go (seconds between requests)
+THROTTLE_MAX_DELAY = float(os.environ.get('THROTTLE_MAX_DELAY', 60))
+THROTTLE_STEP = 0.25  # additive speed-up per healthy response
+BACKOFF_FACTOR = 2.0  # multiplicative slow-down on errors
+SLOW_FACTOR = 2.0  # latency above baseline * this counts as "slowing down"
+MAX_RETRY_AFTER = 600  # never honor absurd Retry-After values
+LATENCY_ALPHA = 0.2  # EWMA weight of the newest latency sample
+BASELINE_ALPHA = 0.05  # how fast the baseline drifts up towards a slower EWMA
+
+
+def parse_retry_after(value, now=None):
+    """Retry-After header (delta-seconds or HTTP date) -> seconds, or None"""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - (now or datetime.now(timezone.utc))).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class HostThrottle:
+    """Delay controller for a single host"""
+
+    def __init__(self, host, initial_delay, min_delay=None, max_delay=None):
+        self.host = host
+        self.min_delay = THROTTLE_MIN_DELAY if min_delay is None else min_delay
+        self.max_delay = THROTTLE_MAX_DELAY if max_delay is None else max_delay
+        self.delay = min(max(initial_delay, self.min_delay), self.max_delay)
+        self.next_allowed = 0.0
+        self.latency = None  # EWMA, seconds
+        self.baseline = None  # slowly decaying best EWMA, seconds
+        self.lock = asyncio.Lock()
+        self.requests = 0
+        self.backoffs = 0
+        self.retry_after_waits = 0
+        self.slowest_delay = self.delay
+
+    async def wait(self):
+        """Sleep until this host's next request slot"""
+        async with self.lock:
+            pause = self.next_allowed - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            self.next_allowed = time.monotonic() + self.delay
+
+    def record(self, status, latency, retry_after=None):
+        """Adjust the delay from one response (status None = network error)"""
+        self.requests += 1
+        healthy = status is not None and status < 500 and status != 429
+
+        if latency is not None and healthy:
+            self.latency = latency if self.latency is None else (
+                LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency)
+            if self.baseline is None or self.latency < self.baseline:
+                self.baseline = self.latency
+            else:
+                self.baseline += BASELINE_ALPHA * (self.latency - self.baseline)
+
+        if not healthy:
+            self._back_off()
+        elif self.baseline and self.latency > self.baseline * SLOW_FACTOR:
+            self._back_off()
+        else:
+            self.delay = max(self.min_delay, self.delay - THROTTLE_STEP)
+
+        wait = parse_retry_after(retry_after) if status in (429, 503) else None
+        if wait:
+            self.retry_after_waits += 1
+            self.next_allowed = max(self.next_allowed, time.monotonic() + wait)
+            self.delay = min(self.max_delay, max(self.delay, wait))
+        self.slowest_delay = max(self.slowest_delay, self.delay)
+
+    def _back_off(self):
+        self.backoffs += 1
+        self.delay = min(self.max_delay, self.delay * BACKOFF_FACTOR)
+
+    def report(self):
+        return {
+            'host': self.host,
+            'delay_s': round(self.delay, 2),
+            'rate_per_min': round(60 / self.delay, 1) if self.delay else None,
+            'slowest_delay_s': round(self.slowest_delay, 2),
+            'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+            'requests': self.requests,
+            'backoffs': self.backoffs,
+            'retry_after_waits': self.retry_after_waits,
+        }
+
+
+class AdaptiveThrottle:
+    """One HostThrottle per host, created on first use"""
+
+    def __init__(self, initial_delay, min_delay=None, max_delay=None):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.hosts = {}
+
+    def host(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self.hosts:
+            self.hosts[host] = HostThrottle(host, self.initial_delay, self.min_delay, self.max_delay)
+        return self.hosts[host]
+
+    async def wait(self, url):
+        await self.host(url).wait()
+
+    def record(self, url, status, latency, retry_after=None):
+        self.host(url).record(status, latency, retry_after)
+
+    def report(self):
+        """Per-host rates for the sync run report"""
+        return [throttle.report() for throttle in self.hosts.values()]
+
+    def summary(self):
+        return ', '.join(
+            f"{r['host']} {r['rate_per_min']}/min ({r['backoffs']} backoffs)" for r in self.report()
+        ) or 'no requests'
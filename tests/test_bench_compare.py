@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for benchmarks/compare.py (performance regression gate)
+"""
+import unittest
+import sys
+import os
+
+# Add benchmarks directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'benchmarks'))
+
+from compare import IMPROVED, MISSING, NEW, OK, REGRESSED, compare, flatten, format_report
+
+
+def api_result(p99_ms=20.0, throughput=500.0, db_calls=2.0, errors=0):
+    return {
+        'config': {'commit': 'abc123', 'duration_s': 30},
+        'api': {'endpoints': {'list': {'requests': 900, 'errors': errors, 'throughput_rps': throughput,
+                                       'p99_ms': p99_ms, 'db_calls_avg': db_calls}}},
+    }
+
+
+def statuses(rows):
+    return {row['metric']: row['status'] for row in rows}
+
+
+class TestFlatten(unittest.TestCase):
+    """Test metric paths"""
+
+    def test_config_and_counts_skipped(self):
+        flat = flatten(api_result())
+        self.assertIn('api.endpoints.list.p99_ms', flat)
+        self.assertNotIn('api.endpoints.list.requests', flat)
+        self.assertFalse(any(path.startswith('config') for path in flat))
+
+
+class TestCompare(unittest.TestCase):
+    """Test tolerances per metric kind"""
+
+    def test_within_tolerance(self):
+        rows = compare(api_result(), api_result(p99_ms=22.0, throughput=470.0))
+        self.assertTrue(all(row['status'] == OK for row in rows))
+        self.assertIn('within tolerance', format_report(rows))
+
+    def test_latency_and_throughput_regressions(self):
+        result = statuses(compare(api_result(), api_result(p99_ms=40.0, throughput=300.0)))
+        self.assertEqual(result['api.endpoints.list.p99_ms'], REGRESSED)
+        self.assertEqual(result['api.endpoints.list.throughput_rps'], REGRESSED)
+
+    def test_latency_floor_on_fast_endpoints(self):
+        result = statuses(compare(api_result(p99_ms=1.0), api_result(p99_ms=2.5)))
+        self.assertEqual(result['api.endpoints.list.p99_ms'], OK)
+
+    def test_db_calls_and_errors(self):
+        result = statuses(compare(api_result(), api_result(db_calls=61.0, errors=3)))
+        self.assertEqual(result['api.endpoints.list.db_calls_avg'], REGRESSED)
+        self.assertEqual(result['api.endpoints.list.errors'], REGRESSED)
+
+    def test_improvements_missing_and_new(self):
+        baseline = {'scrapers': {'aiohttp': {'discovery_s': 10.0, 'persistence_s': 1.0}}}
+        current = {'scrapers': {'aiohttp': {'discovery_s': 5.0, 'extraction_s': 2.0}}}
+        result = statuses(compare(baseline, current))
+        self.assertEqual(result['scrapers.aiohttp.discovery_s'], IMPROVED)
+        self.assertEqual(result['scrapers.aiohttp.persistence_s'], MISSING)
+        self.assertEqual(result['scrapers.aiohttp.extraction_s'], NEW)
+
+    def test_baseline_tolerances_override(self):
+        baseline = {**api_result(), 'tolerances': {'latency_pct': 200.0}}
+        result = statuses(compare(baseline, api_result(p99_ms=40.0)))
+        self.assertEqual(result['api.endpoints.list.p99_ms'], OK)
+
+    def test_report_lists_regressions_first(self):
+        rows = compare(api_result(), api_result(p99_ms=40.0))
+        self.assertEqual(rows[0]['status'], REGRESSED)
+        report = format_report(rows)
+        self.assertIn('api.endpoints.list.p99_ms', report)
+        self.assertIn('+100.0%', report)
+        self.assertIn('1 regressions', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
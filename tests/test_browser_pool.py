@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Unit tests for browser_pool.py (shared browser, context leasing and recycling)
+"""
+import asyncio
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    """Stands in for async_playwright() and the started driver"""
+
+    def __init__(self):
+        self.chromium = self
+        self.browsers = []
+        self.stopped = False
+
+    async def start(self):
+        return self
+
+    async def launch(self, headless=True):
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+    async def stop(self):
+        self.stopped = True
+
+
+class TestBrowserPool(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = FakePlaywright()
+        self.patches = [patch.object(browser_pool, 'async_playwright', lambda: self.driver),
+                        patch.object(browser_pool, 'chromium_rss_mb', lambda: 100.0)]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+
+    def test_browser_stays_warm_across_runs(self):
+        pool = BrowserPool()
+
+        async def runs():
+            for _ in range(3):
+                page = await pool.acquire_page()
+                await pool.release_page(page)
+                self.assertTrue(page.context.closed)
+
+        asyncio.run(runs())
+        self.assertEqual(len(self.driver.browsers), 1)
+        self.assertEqual(pool.stats['contexts_created'], 3)
+        self.assertEqual(pool.health()['active_contexts'], 0)
+
+    def test_recycle_after_page_limit(self):
+        pool = BrowserPool(max_pages_per_context=2, memory_limit_mb=0)
+
+        async def run():
+            page = await pool.acquire_page()
+            same = await pool.recycle_if_needed(page)
+            fresh = await pool.recycle_if_needed(same)
+            return page, same, fresh
+
+        page, same, fresh = asyncio.run(run())
+        self.assertIs(same, page)
+        self.assertIsNot(fresh.context, page.context)
+        self.assertTrue(page.context.closed)
+        self.assertEqual(pool.stats['context_recycles'], 1)
+        self.assertEqual(pool.stats['last_recycle_reason'], 'page_limit')
+
+    def test_recycle_past_memory_limit(self):
+        pool = BrowserPool(max_pages_per_context=50, memory_limit_mb=50)
+
+        async def run():
+            return await pool.recycle_if_needed(await pool.acquire_page())
+
+        asyncio.run(run())
+        self.assertEqual(pool.stats['memory_recycles'], 1)
+        self.assertEqual(pool.stats['last_recycle_reason'], 'memory')
+
+    def test_relaunch_after_crash(self):
+        pool = BrowserPool()
+
+        async def run():
+            await pool.acquire_page()
+            self.driver.browsers[0].connected = False  # Chromium died
+            await pool.acquire_page()
+
+        asyncio.run(run())
+        self.assertEqual(pool.stats['browser_launches'], 2)
+
+    def test_close(self):
+        pool = BrowserPool()
+
+        async def run():
+            await pool.acquire_page()
+            await pool.close()
+
+        asyncio.run(run())
+        self.assertTrue(self.driver.stopped)
+        self.assertFalse(self.driver.browsers[0].connected)
+        self.assertFalse(pool.health()['running'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for catalog_export.py (static catalog snapshot)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+from catalog_export import MANIFEST, category_slug, export_catalog, tool_document, version_name
+
+
+def make_tools(count):
+    return [{
+        'id': f'tool-{i}',
+        'name': f'Tool {i}',
+        'description': 'Short',
+        'category': 'Image Generation' if i % 3 else 'Writing',
+        'tags': ['AI'],
+        'price_type': 'Free',
+        'website_url': f'https://{i}.example.com',
+        'is_featured': i < 2,
+        'featured_order': i + 1 if i < 2 else None,
+        'created_at': datetime(2025, 1, 1, 0, i),
+        'updated_at': datetime(2025, 1, 1, 0, i),
+    } for i in range(count)]
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestCatalogExport(unittest.TestCase):
+    """Test the exported files, versioning and reuse of unchanged documents"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.database = AsyncMongoMockClient()['export_test']
+        asyncio.run(self.database.tools.insert_many(make_tools(7)))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def read(self, manifest, relative):
+        path = os.path.join(self.root, manifest['base'], relative)
+        with open(path, 'rb') as f:
+            body = f.read()
+        with open(path + '.gz', 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), body)
+        return json.loads(body)
+
+    def test_listings(self):
+        manifest = asyncio.run(export_catalog(self.database, self.root, page_size=2))
+        self.assertEqual(manifest['all'], {'total': 7, 'pages': 4})
+        self.assertEqual([c['slug'] for c in manifest['categories']], ['image-generation', 'writing'])
+        first = self.read(manifest, 'tools/all/1.json')
+        self.assertEqual([tool['id'] for tool in first['items']], ['tool-6', 'tool-5'])  # created_at desc
+        self.assertEqual((first['total'], first['page'], first['page_size']), (7, 1, 2))
+        self.assertEqual(len(self.read(manifest, 'tools/all/4.json')['items']), 1)
+        writing = self.read(manifest, 'tools/writing/1.json')
+        self.assertEqual([tool['id'] for tool in writing['items']], ['tool-6', 'tool-3'])
+        self.assertEqual(self.read(manifest, 'categories.json'), ['Image Generation', 'Writing'])
+        self.assertEqual([tool['id'] for tool in self.read(manifest, 'featured.json')], ['tool-0', 'tool-1'])
+        tool = self.read(manifest, 'tool/tool-0.json')
+        self.assertEqual(tool['created_at'], '2025-01-01T00:00:00')
+        self.assertIsNone(tool['image_url'])
+
+    def test_new_version_links_unchanged(self):
+        first = asyncio.run(export_catalog(self.database, self.root))
+        asyncio.run(self.database.tools.update_one({'id': 'tool-0'}, {'$set': {'name': 'Renamed'}}))
+        second = asyncio.run(export_catalog(self.database, self.root))
+        self.assertNotEqual(first['version'], second['version'])
+        with open(os.path.join(self.root, MANIFEST)) as f:
+            self.assertEqual(json.load(f)['version'], second['version'])
+        old, new = (os.path.join(self.root, m['base'], 'tool') for m in (first, second))
+        self.assertTrue(os.path.samefile(os.path.join(old, 'tool-1.json'), os.path.join(new, 'tool-1.json')))
+        self.assertFalse(os.path.samefile(os.path.join(old, 'tool-0.json'), os.path.join(new, 'tool-0.json')))
+        self.assertEqual(self.read(second, 'tool/tool-0.json')['name'], 'Renamed')
+
+    def test_old_versions_pruned(self):
+        manifests = [asyncio.run(export_catalog(self.database, self.root)) for _ in range(5)]
+        versions = sorted(os.listdir(os.path.join(self.root, 'v')))
+        self.assertEqual(versions, [manifest['version'] for manifest in manifests[-3:]])  # the newest survive
+
+
+class TestHelpers(unittest.TestCase):
+    def test_category_slug(self):
+        taken = set()
+        self.assertEqual(category_slug('Image Generation', taken), 'image-generation')
+        self.assertEqual(category_slug('Image  generation!', taken), 'image-generation-2')
+        self.assertEqual(category_slug('All', taken), 'all-2')  # 'all' is every tool
+
+    def test_version_names_sort_in_creation_order(self):
+        same_second = datetime(2025, 1, 1, 12, 0, 0)
+        names = [version_name(same_second) for _ in range(20)]
+        self.assertEqual(sorted(names), names)
+
+    def test_tool_document_defaults(self):
+        document = tool_document({'id': 'x', 'name': 'X', 'updated_at': datetime(2025, 1, 2)})
+        self.assertEqual(document['tags'], [])
+        self.assertTrue(document['is_active'])
+        self.assertEqual(document['updated_at'], '2025-01-02T00:00:00')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Unit tests for catalog_generator.py (deterministic synthetic catalogs)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import unittest
+import sys
+import os
+from collections import Counter
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+from catalog_generator import CatalogGenerator, CATEGORIES, batched, insert_catalog, tool_id
+
+
+class TestCatalogGenerator(unittest.TestCase):
+    """Test determinism and distributions"""
+
+    def test_same_seed_same_catalog(self):
+        first = list(CatalogGenerator(7).tools(50))
+        second = list(CatalogGenerator(7).tools(50))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first[0]['id'], CatalogGenerator(8).tool(0)['id'])
+
+    def test_random_access_matches_stream(self):
+        generator = CatalogGenerator(7)
+        self.assertEqual(list(generator.tools(3, start=10))[1], generator.tool(11))
+        self.assertEqual(generator.tool(11)['id'], tool_id(7, 11))
+
+    def test_unique_ids_and_urls(self):
+        tools = list(CatalogGenerator(1).tools(500))
+        self.assertEqual(len({tool['id'] for tool in tools}), 500)
+        self.assertEqual(len({tool['website_url'] for tool in tools}), 500)
+
+    def test_skewed_categories(self):
+        counts = Counter(tool['category'] for tool in CatalogGenerator(3).tools(2000))
+        self.assertGreater(counts[CATEGORIES[0]], 5 * counts[CATEGORIES[-1]])
+
+    def test_featured_subset_and_long_descriptions(self):
+        tools = list(CatalogGenerator(3, featured=5).tools(100))
+        featured = [tool for tool in tools if tool['is_featured']]
+        self.assertEqual([tool['featured_order'] for tool in featured], [1, 2, 3, 4, 5])
+        self.assertTrue(all(len(tool['description_full']) > 500 for tool in tools))
+        self.assertTrue(all(len(tool['description']) <= 200 for tool in tools))
+
+    def test_unsynced_tools_have_no_sync_fields(self):
+        tools = list(CatalogGenerator(3).tools(200))
+        synced = [tool for tool in tools if 'synced_from' in tool]
+        self.assertTrue(0 < len(synced) < len(tools))
+        self.assertTrue(all(tool['synced_from'] and tool['synced_at'] for tool in synced))
+        self.assertTrue(all('synced_at' not in tool for tool in tools if 'synced_from' not in tool))
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestInsertCatalog(unittest.TestCase):
+    """Test batched inserts"""
+
+    def test_batches(self):
+        self.assertEqual([len(batch) for batch in batched(range(5), 2)], [2, 2, 1])
+
+        async def scenario():
+            database = AsyncMongoMockClient()['generator_test']
+            tools = database.tools  # a fresh wrapper on every attribute access; pin one to count calls
+            with patch.object(database, 'tools', tools), \
+                    patch.object(tools, 'insert_many', wraps=tools.insert_many) as insert_many:
+                counts = await insert_catalog(database, 25, seed=1, pages=4, batch_size=10)
+            self.assertEqual(counts, {'tools': 25, 'pages': 4})
+            self.assertEqual([len(call.args[0]) for call in insert_many.call_args_list], [10, 10, 5])
+            self.assertEqual(await database.tools.count_documents({}), 25)
+            self.assertEqual(await database.pages.count_documents({}), 4)
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
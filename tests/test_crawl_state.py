@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Unit tests for crawl_state.py (URL queue claims, leases and reclaiming)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+import sync_tools_playwright
+from http_cache import HttpCache
+from resilience import PermanentHTTPError
+from crawl_state import CrawlState, MAX_URL_ATTEMPTS, MAX_URL_CLAIMS, PAUSED
+from sync_tools_playwright import PlaywrightScraper
+
+SOURCE = 'https://source.example.com'
+
+
+async def new_state(count):
+    database = AsyncMongoMockClient()['crawl_test']
+    state = await CrawlState.resume_or_start(database, SOURCE)
+    await state.add_urls([{'website_url': f'{SOURCE}/tool/{i}', 'name': f'Tool {i}'} for i in range(count)])
+    return state
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestClaims(unittest.TestCase):
+    """Test leasing URLs to workers"""
+
+    def test_claims_are_exclusive(self):
+        async def scenario():
+            state = await new_state(2)
+            first = await state.claim('w1')
+            second = await state.claim('w2')
+            self.assertEqual([first['url'], second['url']], [f'{SOURCE}/tool/0', f'{SOURCE}/tool/1'])
+            self.assertIsNone(await state.claim('w3'))  # everything is leased...
+            self.assertEqual(await state.count_remaining(), 2)  # ...but not done
+        asyncio.run(scenario())
+
+    def test_expired_lease_is_reclaimed(self):
+        async def scenario():
+            state = await new_state(1)
+            crashed = await state.claim('crashed', lease_seconds=-1)
+            reclaimed = await state.claim('w2')
+            self.assertEqual(reclaimed['url'], crashed['url'])
+            self.assertEqual(reclaimed['lease_owner'], 'w2')
+            self.assertEqual(reclaimed['claims'], 2)
+        asyncio.run(scenario())
+
+    def test_renew_keeps_own_leases(self):
+        async def scenario():
+            state = await new_state(2)
+            mine = await state.claim('w1')
+            theirs = await state.claim('w2')
+            await state.db.crawl_urls.update_many({}, {'$set': {'lease_expires': None}})  # both ran out
+            await state.renew([mine['url'], theirs['url']], 'w1')
+            reclaimed = await state.claim('w3')
+            self.assertEqual(reclaimed['url'], theirs['url'])  # only w1's lease was extended
+            self.assertIsNone(await state.claim('w3'))
+        asyncio.run(scenario())
+
+    def test_done_and_given_up_urls_leave_the_queue(self):
+        async def scenario():
+            state = await new_state(2)
+            entry = await state.claim('w1')
+            await state.mark_done(entry['url'], saved=True)
+            await state.db.crawl_urls.update_one({'url': f'{SOURCE}/tool/1'}, {'$set': {'claims': MAX_URL_CLAIMS}})
+            self.assertEqual(await state.count_remaining(), 0)
+            self.assertIsNone(await state.claim('w1'))
+        asyncio.run(scenario())
+
+    def test_claim_priority(self):
+        async def scenario():
+            state = await new_state(3)
+            first = await state.claim('w1')
+            await state.mark_failed(first['url'], 'boom')
+            await state.db.crawl_urls.update_one({'url': first['url']}, {'$set': {'lease_expires': None}})
+            second = await state.claim('w1')
+            await state.mark_extracted(second['url'], {'name': 'Tool 1'})
+            await state.db.crawl_urls.update_one({'url': second['url']}, {'$set': {'lease_expires': None}})
+            order = [(await state.claim('w2'))['url'] for _ in range(3)]
+            # Extracted-but-unsaved first, then fresh URLs, then the retry
+            self.assertEqual(order, [second['url'], f'{SOURCE}/tool/2', first['url']])
+        asyncio.run(scenario())
+
+    def test_failed_url_retried_after_backoff_then_given_up(self):
+        async def scenario():
+            state = await new_state(1)
+            url = f'{SOURCE}/tool/0'
+            for attempt in range(MAX_URL_ATTEMPTS):
+                entry = await state.claim('w1')
+                self.assertEqual(entry['url'], url)
+                await state.mark_failed(url, 'boom')
+                self.assertIsNone(await state.claim('w1'))  # backing off
+                await state.db.crawl_urls.update_one({'url': url}, {'$set': {'lease_expires': None}})
+            self.assertEqual(await state.count_remaining(), 0)
+            self.assertIsNone(await state.claim('w1'))
+        asyncio.run(scenario())
+
+    def test_resume_paused_run(self):
+        async def scenario():
+            state = await new_state(2)
+            await state.pause('time_budget')
+            resumed = await CrawlState.resume_or_start(state.db, SOURCE)
+            self.assertEqual(resumed.run_id, state.run_id)
+            self.assertTrue(resumed.resumed)
+            self.assertFalse(resumed.needs_discovery)
+            self.assertNotEqual(PAUSED, (await state.db.sync_runs.find_one({'id': state.run_id}))['status'])
+        asyncio.run(scenario())
+
+    def test_resume_drops_leases_of_a_dead_run(self):
+        async def scenario():
+            state = await new_state(2)
+            crashed = await state.claim('killed')
+            await state.mark_failed(f'{SOURCE}/tool/1', 'boom')  # backing off, not leased
+            resumed = await CrawlState.resume_or_start(state.db, SOURCE)
+            entry = await resumed.claim('w1')
+            self.assertEqual(entry['url'], crashed['url'])  # no wait for the old lease
+            self.assertEqual(entry['claims'], 2)
+            self.assertIsNone(await resumed.claim('w2'))  # the back-off still holds
+        asyncio.run(scenario())
+
+
+class FakeScraper:
+    """Just what PlaywrightScraper.work needs"""
+
+    def __init__(self):
+        self.page = None
+        self.pool = self
+        self.extracted = []
+
+    async def recycle_if_needed(self, page):
+        return page
+
+    async def process_tool(self, listing):
+        self.extracted.append(listing['name'])
+        return {'name': listing['name'], 'website_url': listing['website_url']}
+
+    async def save_batch(self, state, batch, stats):
+        for url, _ in batch:
+            await state.mark_done(url, saved=True)
+            stats['processed'] += 1
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestWorkerPolling(unittest.TestCase):
+    """Test that a worker waits for a crashed worker's lease instead of exiting"""
+
+    def test_worker_picks_up_expiring_lease(self):
+        async def scenario():
+            state = await new_state(2)
+            await state.claim('crashed', lease_seconds=1)
+            scraper = FakeScraper()
+            with patch.object(sync_tools_playwright, 'CLAIM_POLL_SECONDS', 0.1):
+                stats = await PlaywrightScraper.work(scraper, state, worker_id='w2')
+            self.assertEqual(sorted(scraper.extracted), ['Tool 0', 'Tool 1'])
+            self.assertEqual(stats['processed'], 2)
+            self.assertEqual(await state.count_remaining(), 0)
+        asyncio.run(scenario())
+
+
+class FakePool:
+    async def recycle_if_needed(self, page):
+        return page
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestGoneAtSource(unittest.TestCase):
+    """Test that a tool deleted at the source is retired, not stored as degraded"""
+
+    def test_deleted_tool_is_deactivated(self):
+        async def gone(url):
+            raise PermanentHTTPError(url, 404)
+
+        async def scenario():
+            state = await new_state(1)
+            url = f'{SOURCE}/tool/0'
+            await state.db.tools.insert_one({'id': 't0', 'name': 'Tool 0', 'website_url': url, 'is_active': True,
+                                             'needs_refetch': True, 'synced_from': SOURCE})
+            scraper = PlaywrightScraper(source_url=SOURCE, cache=HttpCache(enabled=False),
+                                        database=state.db, pool=FakePool())
+            scraper.extract_tool_details = gone
+            stats = await scraper.work(state, worker_id='w1')
+            self.assertEqual(stats['saved'], 0)
+            self.assertEqual(await state.count_remaining(), 0)
+            self.assertEqual(await state.db.tools.count_documents({}), 1)  # no placeholder record
+            return await state.db.tools.find_one({'id': 't0'})
+
+        tool = asyncio.run(scenario())
+        self.assertFalse(tool['is_active'])
+        self.assertNotIn('needs_refetch', tool)  # degraded_tools() stops picking it up
+
+
+if __name__ == '__main__':
+    unittest.main()
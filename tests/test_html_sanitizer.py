@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Unit tests for html_sanitizer.py
+"""
+import asyncio
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+import catalog_hooks
+import html_sanitizer
+from html_sanitizer import sanitize_html, sanitize_batch, sanitize_existing_tools
+
+
+class TestHtmlSanitizer(unittest.TestCase):
+    """Test allowlisting, whitespace collapsing and empty-node removal"""
+
+    def test_strips_classes_and_inline_styles(self):
+        html = '<h3 class="sv-title" style="margin:0">Features</h3><p data-id="1">Fast</p>'
+        self.assertEqual(sanitize_html(html), '<h3>Features</h3><p>Fast</p>')
+
+    def test_unwraps_layout_wrappers(self):
+        html = '<div class="wrap"><div><p>One</p></div><span class="x">Two</span></div>'
+        self.assertEqual(sanitize_html(html), '<p>One</p>Two')
+
+    def test_container_with_inline_content_becomes_paragraph(self):
+        self.assertEqual(sanitize_html('<div>Just text</div>'), '<p>Just text</p>')
+
+    def test_collapses_whitespace(self):
+        html = '<p>\n   Hello\n\n   <strong>big</strong>   world  </p>\n\n<ul>\n <li> a </li>\n</ul>'
+        self.assertEqual(sanitize_html(html), '<p>Hello <strong>big</strong> world</p><ul><li>a</li></ul>')
+
+    def test_preserves_whitespace_in_pre(self):
+        html = '<pre>line 1\n    line 2</pre>'
+        self.assertEqual(sanitize_html(html), html)
+
+    def test_drops_empty_nodes(self):
+        html = '<p> </p><div><span></span></div><ul><li></li></ul><p>Kept</p>'
+        self.assertEqual(sanitize_html(html), '<p>Kept</p>')
+
+    def test_drops_scripts_and_unsafe_links(self):
+        html = ('<p>Hi<script>alert(1)</script> <a href="javascript:alert(1)">bad</a> '
+                '<a href="https://example.com" onclick="x()" target="_blank">ok</a></p>')
+        self.assertEqual(sanitize_html(html), '<p>Hi bad <a href="https://example.com">ok</a></p>')
+
+    def test_keeps_entities_escaped(self):
+        self.assertEqual(sanitize_html('<p>R&amp;D &lt;fast&gt;</p>'), '<p>R&amp;D &lt;fast&gt;</p>')
+
+    def test_batch_keeps_order(self):
+        self.assertEqual(sanitize_batch(['<p>a</p>', '', '<div>b</div>']), ['<p>a</p>', '', '<p>b</p>'])
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestSanitizeExistingTools(unittest.TestCase):
+    """Test the backfill over stored tools"""
+
+    def test_updates_and_notifies(self):
+        calls = []
+
+        async def in_process(htmls):
+            return sanitize_batch(list(htmls))
+
+        async def catalog_changed(database, kind, ids=None):
+            calls.append((kind, ids))
+
+        async def scenario():
+            database = AsyncMongoMockClient()['sanitize_test']
+            await database.tools.insert_many([
+                {'id': 'dirty', 'description_full': '<div class="x"><p>Hi</p></div>'},
+                {'id': 'clean', 'description_full': '<p>Hi</p>'},
+            ])
+            updated = await sanitize_existing_tools(database)
+            tool = await database.tools.find_one({'id': 'dirty'})
+            return updated, tool
+
+        with patch.object(html_sanitizer, 'sanitize_in_pool', in_process), \
+                patch.object(catalog_hooks, 'catalog_changed', catalog_changed):
+            updated, tool = asyncio.run(scenario())
+        self.assertEqual(updated, 1)
+        self.assertEqual(tool['description_full'], '<p>Hi</p>')
+        self.assertIn('updated_at', tool)  # prerendered snapshots are keyed on it
+        self.assertEqual(calls, [(catalog_hooks.TOOLS, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
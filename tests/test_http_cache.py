@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Unit tests for http_cache.py
+"""
+import asyncio
+import unittest
+import sys
+import os
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from http_cache import HttpCache, validators
+from sync_tools_playwright import PlaywrightScraper
+
+
+class TestHttpCache(unittest.TestCase):
+    """Test storing and revalidating cached responses"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(cache_dir=self.tmp.name, enabled=True)
+        self.url = 'https://example.com/tool/demo'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_miss_has_no_conditional_headers(self):
+        self.assertIsNone(self.cache.get(self.url))
+        self.assertEqual(self.cache.conditional_headers(self.url), {})
+
+    def test_store_and_read_body(self):
+        self.cache.store(self.url, '<html>hello</html>', {'ETag': '"abc"'})
+        self.assertEqual(self.cache.read_body(self.url), '<html>hello</html>')
+        self.assertEqual(self.cache.stats['stored'], 1)
+
+    def test_conditional_headers_from_validators(self):
+        headers = {
+            'etag': '"v1"',
+            'last-modified': 'Wed, 21 Oct 2025 07:28:00 GMT',
+        }
+        self.cache.store(self.url, 'body', headers)
+        self.assertEqual(self.cache.conditional_headers(self.url), {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Wed, 21 Oct 2025 07:28:00 GMT',
+        })
+
+    def test_not_modified_keeps_extracted_data(self):
+        details = {'category': 'Chatbot', 'price_type': 'Free'}
+        self.cache.store(self.url, 'body', {'ETag': '"v1"'}, extracted=details)
+        meta = self.cache.mark_not_modified(self.url)
+        self.assertEqual(meta['extracted'], details)
+        self.assertEqual(self.cache.stats['hits'], 1)
+        self.assertEqual(self.cache.stats['bytes_saved'], len('body'))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = HttpCache(cache_dir=self.tmp.name, enabled=False)
+        cache.store(self.url, 'body', {'ETag': '"v1"'})
+        self.assertIsNone(cache.get(self.url))
+
+
+class FakeResponse:
+    def __init__(self, url, status=200, headers=None):
+        self.url = url
+        self.status = status
+        self.ok = status < 400
+        self.headers = headers or {}
+
+    async def dispose(self):
+        pass
+
+
+class FakeRequest:
+    """page.request: answers from a {url: status} map and records conditional headers"""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.sent = []
+
+    async def get(self, url, headers=None, timeout=None):
+        self.sent.append((url, headers))
+        return FakeResponse(url, self.statuses[url])
+
+
+class FakePage:
+    def __init__(self, statuses):
+        self.request = FakeRequest(statuses)
+
+
+class TestSpaRevalidation(unittest.TestCase):
+    """Test that rendered detail pages are revalidated against their data responses"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HttpCache(cache_dir=self.tmp.name, enabled=True)
+        self.url = 'https://example.com/tool/demo'
+        self.api = 'https://example.com/api/tools/demo'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def revalidate(self, statuses):
+        scraper = PlaywrightScraper(cache=self.cache, database=object(), pool=object())
+        scraper.page = FakePage(statuses)
+        return asyncio.run(scraper.revalidate_details(self.url)), scraper.page.request.sent
+
+    def test_data_sources_need_validators(self):
+        with_etag = FakeResponse(self.api, headers={'etag': '"d1"'})
+        without = FakeResponse('https://example.com/api/related')
+        self.assertEqual(PlaywrightScraper.data_sources([with_etag]),
+                         [{'url': self.api, 'etag': '"d1"', 'last_modified': None}])
+        self.assertIsNone(PlaywrightScraper.data_sources([with_etag, without]))
+        self.assertIsNone(PlaywrightScraper.data_sources([]))
+
+    def test_unchanged_data_reuses_details(self):
+        sources = [validators(self.api, {'etag': '"d1"'})]
+        self.cache.store(self.url, '<html>rendered</html>', extracted={'category': 'Chatbot'}, sources=sources)
+        details, sent = self.revalidate({self.api: 304})
+        self.assertEqual(details, {'category': 'Chatbot', 'from_cache': True})
+        self.assertEqual(sent, [(self.api, {'If-None-Match': '"d1"'})])  # not the HTML shell
+
+    def test_changed_data_renders_again(self):
+        sources = [validators(self.api, {'etag': '"d1"'})]
+        self.cache.store(self.url, '<html>rendered</html>', extracted={'category': 'Chatbot'}, sources=sources)
+        self.assertEqual(self.revalidate({self.api: 200})[0], None)
+
+    def test_page_without_data_validators_renders_again(self):
+        self.cache.store(self.url, '<html>rendered</html>', {'ETag': '"shell"'}, extracted={'category': 'Chatbot'})
+        details, sent = self.revalidate({})
+        self.assertIsNone(details)
+        self.assertEqual(sent, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
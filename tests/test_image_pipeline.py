@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Unit tests for image_pipeline.py (mirroring, lost-variant recovery and fallbacks)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import io
+import shutil
+import tempfile
+import unittest
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+import catalog_hooks
+import image_pipeline
+from image_pipeline import _mirror_one, lost_mirrors, media_url, mirror_images, variant_path
+
+BASE = 'https://api.example.com'
+SOURCE = 'https://cdn.source.com/logo.png'
+
+
+def png_bytes():
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 400), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+async def new_database(tools):
+    database = AsyncMongoMockClient()['image_test']
+    await database.tools.insert_many([dict(tool) for tool in tools])
+    return database
+
+
+async def get_tool(database, tool_id):
+    return await database.tools.find_one({'id': tool_id}, {'_id': 0})
+
+
+class FakeStore:
+    """MediaStore stand-in: a set of digests in the bucket"""
+
+    def __init__(self, database=None, stored=()):
+        self.digests = set(stored)
+
+    async def stored(self, digests):
+        return set(digests) & self.digests
+
+    async def save(self, digest):
+        self.digests.add(digest)
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestImagePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.media_dir = tempfile.mkdtemp()
+        self.patches = [patch.object(image_pipeline, 'MEDIA_DIR', Path(self.media_dir)),
+                        patch.object(image_pipeline, 'MEDIA_BASE_URL', BASE)]
+        for p in self.patches:
+            p.start()
+        self.data = png_bytes()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.media_dir)
+
+    async def _download(self, session, semaphore, url):
+        if url != SOURCE:
+            raise ValueError('status 404')
+        return self.data
+
+    def mirror(self, tool, source_url, store):
+        async def scenario():
+            database = await new_database([tool])
+            with patch.object(image_pipeline, '_download', self._download), ThreadPoolExecutor(1) as executor:
+                result = await _mirror_one(dict(tool), source_url, None, None, executor, database, store)
+            return result, await get_tool(database, tool['id'])
+        return asyncio.run(scenario())
+
+    def test_relative_base_url_is_refused(self):
+        async def scenario():
+            database = await new_database([{'id': 't', 'image_url': SOURCE}])
+            with patch.object(image_pipeline, 'MEDIA_BASE_URL', ''):
+                result = await mirror_images(database)
+            self.assertEqual(result['mirrored'], 0)
+            self.assertEqual((await get_tool(database, 't'))['image_url'], SOURCE)
+        asyncio.run(scenario())
+
+    def test_mirror_rewrites_to_absolute_url(self):
+        store = FakeStore()
+        (ok, changed), tool = self.mirror({'id': 't', 'image_url': SOURCE}, SOURCE, store)
+        self.assertTrue(ok and changed)
+        digest = tool['image_mirror']['hash']
+        self.assertEqual(tool['image_url'], f'{BASE}/api/media/{digest}-640')
+        self.assertEqual(tool['image_source_url'], SOURCE)
+        self.assertIn('updated_at', tool)
+        self.assertIn(digest, store.digests)  # uploaded to the shared bucket
+        self.assertTrue(variant_path(digest, 320, 'webp').exists())
+
+    def test_failed_remirror_falls_back_to_source(self):
+        lost = {'id': 't', 'image_url': f'{BASE}/api/media/{"a" * 64}-640',
+                'image_source_url': 'https://gone.example.com/x.png', 'image_mirror': {'hash': 'a' * 64}}
+        (ok, changed), tool = self.mirror(lost, lost['image_source_url'], FakeStore())
+        self.assertFalse(ok)
+        self.assertTrue(changed)
+        self.assertEqual(tool['image_url'], 'https://gone.example.com/x.png')
+        self.assertIn('error', tool['image_mirror'])
+
+    def test_lost_mirrors(self):
+        def mirrored(tool_id, digest):
+            return {'id': tool_id, 'image_url': media_url(digest), 'image_source_url': SOURCE,
+                    'image_mirror': {'hash': digest}}
+        local = 'c' * 64
+        path = variant_path(local, 640, 'webp')
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b'webp')
+        store = FakeStore(stored={'a' * 64})
+
+        async def scenario():
+            database = await new_database([mirrored('in-bucket', 'a' * 64), mirrored('gone', 'b' * 64),
+                                           mirrored('local-only', local)])
+            return await lost_mirrors(database, store)
+
+        lost = asyncio.run(scenario())
+        self.assertEqual([tool['id'] for tool in lost], ['gone'])
+        self.assertIn(local, store.digests)  # uploaded on the way
+
+    def test_mirror_images_notifies_changed_tools(self):
+        calls = []
+
+        async def catalog_changed(database, kind, ids=None):
+            calls.append((kind, ids))
+
+        async def scenario():
+            # mongomock's $expr fails on a missing image_mirror.url where MongoDB reads null
+            database = await new_database([{'id': 'new', 'image_url': SOURCE, 'image_mirror': {'url': None}}])
+            result = await mirror_images(database)
+            self.assertEqual(result['changed'], ['new'])
+            self.assertEqual(calls, [(catalog_hooks.TOOLS, ['new'])])
+            result = await mirror_images(database, notify=False)
+            self.assertEqual(result['changed'], [])  # nothing left to do
+
+        with patch.object(image_pipeline, '_download', self._download), \
+                patch.object(image_pipeline, 'MediaStore', FakeStore), \
+                patch.object(image_pipeline, 'ProcessPoolExecutor', lambda: ThreadPoolExecutor(1)), \
+                patch.object(catalog_hooks, 'catalog_changed', catalog_changed):
+            asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Unit tests for page_archive.py (content-addressed snapshot store)
+"""
+import asyncio
+import gzip
+import tempfile
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from page_archive import PageArchive
+
+
+class TestPageArchive(unittest.TestCase):
+    """Test storage, deduplication and compression"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = PageArchive(self.tmp.name, enabled=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        html = '<html><body><div class="sv-badge sv-badge__4">Writing</div></body></html>'
+        digest = self.archive.put(html)
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(self.archive.read(digest), html)
+        path = self.archive.path_for(digest)
+        self.assertTrue(str(path).endswith(f"{digest[:2]}/{digest}.html.gz"))
+        self.assertEqual(gzip.decompress(path.read_bytes()).decode(), html)
+
+    def test_identical_content_is_stored_once(self):
+        html = '<p>' + 'same tool page ' * 500 + '</p>'
+        first = self.archive.put(html)
+        second = self.archive.put(html)
+        self.assertEqual(first, second)
+        self.assertEqual(self.archive.stats['stored'], 1)
+        self.assertEqual(self.archive.stats['deduplicated'], 1)
+        self.assertLess(self.archive.stats['bytes_compressed'], self.archive.stats['bytes_raw'] / 10)
+
+    def test_missing_snapshot(self):
+        self.assertIsNone(self.archive.read('0' * 64))
+
+    def test_disabled_archive_skips_save(self):
+        archive = PageArchive(self.tmp.name, enabled=False)
+        self.assertIsNone(asyncio.run(archive.save(None, 'https://x/tool/a', 'detail', '<p>x</p>')))
+        self.assertEqual(archive.stats['stored'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
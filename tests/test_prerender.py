@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Unit tests for prerender.py (tool page snapshots, keys and regeneration)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import gzip
+import json
+import re
+import shutil
+import tempfile
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+import prerender
+from prerender import SnapshotStore, render_tool, snapshot, snapshot_key, snapshot_response, update_tools
+from request_timing import RequestTimingMiddleware, parse_server_timing
+
+SETTINGS = {'site_name': 'AI Box', 'meta_description': 'Best AI tools', 'updated_at': datetime(2025, 1, 1)}
+TEMPLATE = """<!doctype html>
+<html><head>
+<meta name="description" content="A product of emergent.sh" />
+<title>AI BOX FOR YOU</title>
+<script src="/static/js/main.js"></script>
+</head><body><div id="root"></div></body></html>
+"""
+
+
+def make_tool(**overrides):
+    tool = {
+        'id': 'tool-1',
+        'name': 'Pix <Studio>',
+        'description': 'Make "images" fast',
+        'description_full': '<p>Hello</p><script>alert(1)</script>',
+        'category': 'Image Generation',
+        'tags': ['Image', 'Design'],
+        'price_type': 'Free',
+        'website_url': 'https://pix.example.com',
+        'image_url': '/api/media/abc',
+        'is_active': True,
+        'updated_at': datetime(2025, 2, 1),
+    }
+    tool.update(overrides)
+    return tool
+
+
+async def new_database(tools=()):
+    database = AsyncMongoMockClient()['prerender_test']
+    if tools:
+        await database.tools.insert_many([dict(tool) for tool in tools])
+    await database.site_settings.insert_one(dict(SETTINGS))
+    return database
+
+
+class TestRender(unittest.TestCase):
+    """Test the rendered document"""
+
+    def setUp(self):
+        self.page = render_tool(make_tool(), SETTINGS, page=TEMPLATE)
+
+    def test_head_tags(self):
+        self.assertIn('<title>Pix &lt;Studio&gt; - AI Box</title>', self.page)
+        self.assertIn('<meta name="description" content="Make &quot;images&quot; fast" />', self.page)
+        self.assertNotIn('emergent.sh', self.page)
+        self.assertIn(f'<link rel="canonical" href="{prerender.SITE_URL}/tool/tool-1" />', self.page)
+        self.assertIn(f'content="{prerender.SITE_URL}/api/media/abc"', self.page)  # og:image made absolute
+        self.assertIn('<script src="/static/js/main.js"></script>', self.page)  # the bundle stays
+
+    def test_structured_data(self):
+        ld = re.search(r'<script type="application/ld\+json">(.*?)</script>', self.page).group(1)
+        data = json.loads(ld)
+        self.assertEqual(data['@type'], 'SoftwareApplication')
+        self.assertEqual(data['name'], 'Pix <Studio>')
+        self.assertEqual(data['offers']['price'], '0')
+
+    def test_body_content(self):
+        self.assertIn('<h1>Pix &lt;Studio&gt;</h1>', self.page)
+        self.assertIn('<p>Hello</p>', self.page)
+        self.assertNotIn('alert(1)', self.page)
+        self.assertIn('href="/?category=Image%20Generation"', self.page)
+
+    def test_unsafe_urls_dropped(self):
+        tool = make_tool(website_url=' javascript:alert(1)', image_url='data:text/html,<script>x</script>')
+        page = render_tool(tool, SETTINGS, page=TEMPLATE)
+        self.assertNotIn('javascript:', page)
+        self.assertNotIn('data:', page)
+        self.assertNotIn('Visit website', page)
+        self.assertIn(f'"url": "{prerender.SITE_URL}/tool/tool-1"', page)  # structured data falls back to ours
+
+    def test_key_changes(self):
+        tool = make_tool()
+        key = snapshot_key(tool, SETTINGS)
+        self.assertEqual(key, snapshot_key(make_tool(), dict(SETTINGS)))
+        self.assertNotEqual(key, snapshot_key(make_tool(updated_at=datetime(2025, 3, 1)), SETTINGS))
+        self.assertNotEqual(key, snapshot_key(tool, {**SETTINGS, 'updated_at': datetime(2025, 4, 1)}))
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestSnapshots(unittest.TestCase):
+    """Test storage, serving misses/hits and regeneration"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SnapshotStore(self.directory, memory_size=1)
+        prerender.settings_cache.reset()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_store_keeps_one_key_per_tool(self):
+        self.store.put('a', 'k1', b'one')
+        self.store.put('a', 'k2', b'two')
+        self.store.put('b', 'k1', b'three')  # evicts 'a' from memory
+        self.assertIsNone(self.store.get('a', 'k1'))
+        self.assertEqual(self.store.get('a', 'k2'), b'two')  # from disk
+        self.assertEqual(self.store.tool_ids(), {'a', 'b'})
+        self.store.drop('a')
+        self.assertEqual(self.store.tool_ids(), {'b'})
+
+    def test_miss_then_hit(self):
+        async def scenario():
+            database = await new_database([make_tool()])
+            key, body = await snapshot(database, 'tool-1', self.store)
+            self.assertIn(b'<h1>', gzip.decompress(body))
+            tools = database.tools  # a fresh wrapper on every attribute access; pin one to count calls
+            with patch.object(database, 'tools', tools), \
+                    patch.object(tools, 'find_one', wraps=tools.find_one) as find_one:
+                self.assertEqual(await snapshot(database, 'tool-1', self.store), (key, body))
+            self.assertEqual(find_one.call_count, 1)  # a hit only reads the key fields
+        asyncio.run(scenario())
+
+    def test_inactive_or_missing(self):
+        async def scenario():
+            database = await new_database([make_tool(is_active=False)])
+            self.assertIsNone(await snapshot(database, 'tool-1', self.store))
+            self.assertIsNone(await snapshot(database, 'nope', self.store))
+        asyncio.run(scenario())
+
+    def test_update_tools(self):
+        async def scenario():
+            database = await new_database([make_tool()])
+            await update_tools(database, ['tool-1'], self.store)
+            self.assertEqual(self.store.tool_ids(), {'tool-1'})
+            await database.tools.update_one({'id': 'tool-1'}, {'$set': {'is_active': False}})
+            await update_tools(database, ['tool-1'], self.store)
+            self.assertEqual(self.store.tool_ids(), set())
+        asyncio.run(scenario())
+
+
+class FakeRequest:
+    headers = {'accept-encoding': 'gzip'}
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestCacheTiming(unittest.TestCase):
+    """Test that snapshot cache hits show up in Server-Timing"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = SnapshotStore(self.directory)
+        prerender.settings_cache.reset()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    async def cache_timing(self, database):
+        async def app(scope, receive, send):
+            response = await snapshot_response(FakeRequest(), database, 'tool-1')
+            await response(scope, receive, send)
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/prerender/tool/tool-1'}
+        with patch.object(prerender, 'snapshot_store', self.store):
+            await RequestTimingMiddleware(app)(scope, None, send)
+        header = dict(sent[0]['headers'])[b'server-timing'].decode()
+        return parse_server_timing(header)['cache']['desc']
+
+    def test_miss_then_hit(self):
+        async def scenario():
+            database = await new_database([make_tool()])
+            self.assertEqual(await self.cache_timing(database), '0 hits / 2 misses')  # settings and snapshot
+            self.assertEqual(await self.cache_timing(database), '2 hits / 0 misses')
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
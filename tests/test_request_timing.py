@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit tests for request_timing.py (Server-Timing header and DB call budget)
+"""
+import asyncio
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from request_timing import (RequestTiming, RequestTimingMiddleware, _timed_endpoint, assert_max_db_calls,
+                            current_timing, parse_server_timing, record_cache)
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class TestServerTiming(unittest.TestCase):
+    """Test the header value and its parser"""
+
+    def test_phases_from_timestamps(self):
+        timing = RequestTiming()
+        timing.started = 10.0
+        timing.endpoint_started = 10.002
+        timing.endpoint_ended = 10.010
+        timing.response_started = 10.013
+        timing.record_db(0.003)
+        timing.record_db(0.001)
+        parsed = parse_server_timing(timing.server_timing())
+        self.assertAlmostEqual(parsed['parse']['dur'], 2.0)
+        self.assertAlmostEqual(parsed['app']['dur'], 4.0)
+        self.assertAlmostEqual(parsed['db']['dur'], 4.0)
+        self.assertEqual(parsed['db']['desc'], '2 calls')
+        self.assertAlmostEqual(parsed['serialize']['dur'], 3.0)
+        self.assertAlmostEqual(parsed['total']['dur'], 13.0)
+        self.assertNotIn('cache', parsed)
+
+    def test_cache_entry(self):
+        timing = RequestTiming()
+        timing.cache_hits, timing.cache_misses = 2, 1
+        self.assertEqual(parse_server_timing(timing.server_timing())['cache']['desc'], '2 hits / 1 misses')
+
+
+class TestDbCallBudget(unittest.TestCase):
+    """Test the N+1 guard"""
+
+    def test_within_budget(self):
+        response = FakeResponse({'server-timing': 'db;dur=1.2;desc="2 calls", total;dur=5'})
+        self.assertEqual(assert_max_db_calls(response, 2), 2)
+
+    def test_over_budget(self):
+        response = FakeResponse({'server-timing': 'db;dur=9;desc="31 calls", total;dur=20'})
+        with self.assertRaises(AssertionError):
+            assert_max_db_calls(response, 2)
+
+    def test_missing_header(self):
+        with self.assertRaises(AssertionError):
+            assert_max_db_calls(FakeResponse({}), 2)
+
+
+class TestMiddleware(unittest.TestCase):
+    """Test the ASGI middleware end to end with a plain ASGI app"""
+
+    def test_header_added_and_context_scoped(self):
+        async def endpoint():
+            record_cache(True)
+            current_timing().record_db(0.001)
+            return b'ok'
+
+        timed = _timed_endpoint(endpoint)
+
+        async def app(scope, receive, send):
+            body = await timed()
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'text/plain')]})
+            await send({'type': 'http.response.body', 'body': body})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/tools'}
+        asyncio.run(RequestTimingMiddleware(app)(scope, None, send))
+        headers = dict(sent[0]['headers'])
+        parsed = parse_server_timing(headers[b'server-timing'].decode())
+        self.assertEqual(parsed['db']['desc'], '1 calls')
+        self.assertIn('app', parsed)
+        self.assertEqual(parsed['cache']['desc'], '1 hits / 0 misses')
+        self.assertIsNone(current_timing())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Unit tests for resilience.py (retries, deadlines, circuit breaker)
+"""
+import asyncio
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import resilience
+from resilience import (CircuitBreaker, CircuitOpenError, FetchError, PermanentHTTPError,
+                        TransientHTTPError, call_with_retries, check_status)
+
+
+class Flaky:
+    """Coroutine function failing the first `failures` calls"""
+
+    def __init__(self, failures, error=None):
+        self.failures = failures
+        self.error = error or ConnectionError('reset by peer')
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return 'ok'
+
+
+def run(coro):
+    # No real backoff sleeps in tests
+    with mock.patch.object(resilience, 'backoff_delay', return_value=0):
+        return asyncio.run(coro)
+
+
+class TestCheckStatus(unittest.TestCase):
+    """Test status classification"""
+
+    def test_classifies_statuses(self):
+        check_status('u', 200)
+        check_status('u', 304)
+        check_status('u', None)
+        with self.assertRaises(TransientHTTPError):
+            check_status('u', 503)
+        with self.assertRaises(TransientHTTPError):
+            check_status('u', 429)
+        with self.assertRaises(PermanentHTTPError):
+            check_status('u', 404)
+
+
+class TestCallWithRetries(unittest.TestCase):
+    """Test retry, timeout and give-up behavior"""
+
+    def test_retries_transient_errors(self):
+        func = Flaky(2)
+        self.assertEqual(run(call_with_retries(func, attempts=3)), 'ok')
+        self.assertEqual(func.calls, 3)
+
+    def test_raises_fetch_error_when_exhausted(self):
+        func = Flaky(5)
+        with self.assertRaises(FetchError):
+            run(call_with_retries(func, attempts=3))
+        self.assertEqual(func.calls, 3)
+
+    def test_permanent_errors_are_not_retried(self):
+        func = Flaky(5, PermanentHTTPError('u', 404))
+        with self.assertRaises(PermanentHTTPError):
+            run(call_with_retries(func, attempts=3))
+        self.assertEqual(func.calls, 1)
+
+    def test_per_attempt_timeout(self):
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(1)
+
+        with self.assertRaises(FetchError):
+            run(call_with_retries(slow, attempts=2, timeout=0.01))
+        self.assertEqual(len(calls), 2)
+
+    def test_throttle_wait_is_not_timed(self):
+        waits = []
+
+        async def throttle_wait():
+            waits.append(1)
+            await asyncio.sleep(0.05)  # longer than the timeout below
+
+        func = Flaky(1)
+        self.assertEqual(run(call_with_retries(func, attempts=2, timeout=0.03, before=throttle_wait)), 'ok')
+        self.assertEqual((len(waits), func.calls), (2, 2))  # once per attempt
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test opening, aborting and half-open probing"""
+
+    def test_opens_and_aborts(self):
+        breaker = CircuitBreaker('source', failure_threshold=3, reset_seconds=60)
+        with self.assertRaises(FetchError):
+            run(call_with_retries(Flaky(10), attempts=3, breaker=breaker))
+        self.assertEqual(breaker.state, 'open')
+        func = Flaky(0)
+        with self.assertRaises(CircuitOpenError):
+            run(call_with_retries(func, breaker=breaker))
+        self.assertEqual(func.calls, 0)
+
+    def test_half_open_probe_closes_on_success(self):
+        breaker = CircuitBreaker('source', failure_threshold=1, reset_seconds=0)
+        breaker.record_failure(ConnectionError('down'))
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertEqual(run(call_with_retries(Flaky(0), breaker=breaker)), 'ok')
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_permanent_error_counts_as_source_up(self):
+        breaker = CircuitBreaker('source', failure_threshold=2)
+        breaker.record_failure(ConnectionError('down'))
+        with self.assertRaises(PermanentHTTPError):
+            run(call_with_retries(Flaky(1, PermanentHTTPError('u', 404)), breaker=breaker))
+        self.assertEqual(breaker.failures, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scheduler.py (cron parsing and job scheduling)
+"""
+import asyncio
+import unittest
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from scheduler import CronExpression, Job, Scheduler
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestCronExpression(unittest.TestCase):
+    """Test next-run computation"""
+
+    def test_daily_at_two(self):
+        cron = CronExpression('0 2 * * *')
+        self.assertEqual(cron.next_after(utc(2025, 10, 22, 1, 59)), utc(2025, 10, 22, 2, 0))
+        self.assertEqual(cron.next_after(utc(2025, 10, 22, 2, 0)), utc(2025, 10, 23, 2, 0))
+
+    def test_step_and_range(self):
+        cron = CronExpression('*/15 9-17 * * 1-5')
+        # Saturday 25 Oct 2025 -> Monday 27 Oct 09:00
+        self.assertEqual(cron.next_after(utc(2025, 10, 25, 12, 0)), utc(2025, 10, 27, 9, 0))
+        self.assertEqual(cron.next_after(utc(2025, 10, 27, 9, 7)), utc(2025, 10, 27, 9, 15))
+
+    def test_month_rollover_and_aliases(self):
+        self.assertEqual(CronExpression('@monthly').next_after(utc(2025, 12, 15, 8, 0)), utc(2026, 1, 1, 0, 0))
+        self.assertEqual(CronExpression('@hourly').next_after(utc(2025, 1, 1, 23, 30)), utc(2025, 1, 2, 0, 0))
+
+    def test_day_of_month_or_weekday(self):
+        # Either the 1st or any Sunday (classic cron semantics)
+        cron = CronExpression('0 0 1 * 0')
+        self.assertEqual(cron.next_after(utc(2025, 10, 22, 0, 0)), utc(2025, 10, 26, 0, 0))
+
+    def test_sunday_as_seven(self):
+        self.assertEqual(CronExpression('0 3 * * 7').weekdays, {0})
+        self.assertEqual(CronExpression('0 3 * * 5-7').weekdays, {5, 6, 0})
+        self.assertEqual(CronExpression('0 3 * * 7').next_after(utc(2025, 10, 22, 0, 0)), utc(2025, 10, 26, 3, 0))
+
+    def test_invalid_expressions(self):
+        for expression in ('* * *', '60 * * * *', '*/0 * * * *', '5-1 * * * *', '0 0 * * 8'):
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+
+
+class TestScheduler(unittest.TestCase):
+    """Test job bookkeeping"""
+
+    def test_jitter_stays_within_window(self):
+        job = Job('sync', '0 2 * * *', None, jitter_seconds=300)
+        job.schedule_next(utc(2025, 10, 22, 1, 0))
+        delta = (job.next_run - utc(2025, 10, 22, 2, 0)).total_seconds()
+        self.assertTrue(0 <= delta <= 300)
+
+    def test_job_run_records_result_and_errors(self):
+        async def ok():
+            return 3
+
+        async def boom():
+            raise RuntimeError('source down')
+
+        scheduler = Scheduler()
+        good = scheduler.add_job('good', '@daily', ok)
+        bad = scheduler.add_job('bad', '@daily', boom)
+        asyncio.run(good.run())
+        asyncio.run(bad.run())
+        self.assertEqual(good.last_result, 3)
+        self.assertEqual(bad.last_error, 'source down')
+        status = {job['name']: job for job in scheduler.status()['jobs']}
+        self.assertEqual(status['good']['runs'], 1)
+        self.assertIsNotNone(status['bad']['next_run'])
+
+
+    def test_stop_cancels_shielded_work(self):
+        state = {}
+
+        async def sync():
+            await asyncio.sleep(5)
+
+        async def job():
+            state['work'] = asyncio.create_task(sync())
+            await asyncio.shield(state['work'])
+
+        async def cancel():
+            state['work'].cancel()
+            await asyncio.gather(state['work'], return_exceptions=True)
+
+        async def scenario():
+            scheduler = Scheduler()
+            scheduled = scheduler.add_job('sync', '@daily', job, cancel=cancel)
+            scheduled.task = asyncio.create_task(scheduled.run())
+            await asyncio.sleep(0.01)
+            await scheduler.stop()
+            return state['work']
+
+        self.assertTrue(asyncio.run(scenario()).cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Unit tests for scraper_fixtures.py (record/replay without network)
+"""
+import unittest
+import sys
+import os
+import tempfile
+import urllib.request
+import urllib.error
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from scraper_fixtures import FixtureRecorder, FixtureServer, freeze_dom
+
+SOURCE = 'https://aitoolsdirectory.com'
+
+
+class TestScraperFixtures(unittest.TestCase):
+    """Test recording snapshots and replaying them locally"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        recorder = FixtureRecorder(self.tmp.name, SOURCE)
+        recorder.add(SOURCE, f'<a href="{SOURCE}/tool/demo">Demo</a><script>app()</script>', 'listing')
+        recorder.add(f'{SOURCE}/tool/demo', '<h1>Demo</h1>', 'detail')
+        recorder.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_freeze_dom_strips_scripts_and_source_host(self):
+        html = freeze_dom(f'<a href="{SOURCE}/tool/x">x</a><script src="a.js"></script>', SOURCE)
+        self.assertEqual(html, '<a href="/tool/x">x</a>')
+
+    def test_server_replays_recorded_pages(self):
+        with FixtureServer(self.tmp.name) as server:
+            with urllib.request.urlopen(server.url + '/') as response:
+                listing = response.read().decode()
+            with urllib.request.urlopen(server.url + '/tool/demo') as response:
+                detail = response.read().decode()
+        self.assertIn('href="/tool/demo"', listing)
+        self.assertNotIn('<script>', listing)
+        self.assertEqual(detail, '<h1>Demo</h1>')
+
+    def test_server_supports_conditional_requests(self):
+        with FixtureServer(self.tmp.name) as server:
+            with urllib.request.urlopen(server.url + '/tool/demo') as response:
+                etag = response.headers['ETag']
+            request = urllib.request.Request(server.url + '/tool/demo', headers={'If-None-Match': etag})
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(request)
+        self.assertEqual(ctx.exception.code, 304)
+
+    def test_unknown_path_is_404(self):
+        with FixtureServer(self.tmp.name) as server:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(server.url + '/tool/missing')
+        self.assertEqual(ctx.exception.code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
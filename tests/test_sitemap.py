@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sitemap.py and catalog_hooks.py (sitemap rendering and incremental updates)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import gzip
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import patch
+from xml.etree import ElementTree
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+import catalog_hooks
+import sitemap
+from sitemap import SitemapWriter, INDEX, format_lastmod, update_pages, update_tools
+
+NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+async def new_database(tools=(), pages=()):
+    database = AsyncMongoMockClient()['sitemap_test']
+    for collection, documents in ((database.tools, tools), (database.pages, pages)):
+        if documents:
+            await collection.insert_many([dict(doc) for doc in documents])
+    return database
+
+
+async def entry_ids(database):
+    return [entry['_id'] async for entry in database.sitemap_entries.find({}, {'_id': 1}).sort('_id', 1)]
+
+
+def urls(body):
+    root = ElementTree.fromstring(gzip.decompress(body))
+    return root.tag, [el.findtext(f'{NS}loc') for el in root]
+
+
+class TestSitemapWriter(unittest.TestCase):
+    """Test urlset/index rendering"""
+
+    def test_single_urlset(self):
+        writer = SitemapWriter(site_url='https://site', max_urls=10)
+        writer.add('/', datetime(2025, 1, 1))
+        writer.add('/tool/a&b')
+        files = writer.finish()
+        self.assertEqual(list(files), [INDEX])
+        tag, locs = urls(files[INDEX])
+        self.assertEqual(tag, f'{NS}urlset')
+        self.assertEqual(locs, ['https://site/', 'https://site/tool/a&b'])
+
+    def test_index_beyond_limit(self):
+        writer = SitemapWriter(site_url='https://site', base_url='https://site', max_urls=2)
+        for i in range(5):
+            writer.add(f'/tool/{i}', datetime(2025, 1, i + 1))
+        files = writer.finish()
+        tag, locs = urls(files[INDEX])
+        self.assertEqual(tag, f'{NS}sitemapindex')
+        self.assertEqual(locs, [f'https://site/sitemap-{n}.xml' for n in (1, 2, 3)])
+        self.assertEqual(urls(files['sitemap-3.xml'])[1], ['https://site/tool/4'])
+
+    def test_empty(self):
+        self.assertEqual(urls(SitemapWriter().finish()[INDEX]), (f'{NS}urlset', []))
+
+    def test_lastmod_is_utc(self):
+        self.assertEqual(format_lastmod(datetime(2025, 3, 4, 5, 6, 7)), '2025-03-04T05:06:07+00:00')
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestIncrementalUpdates(unittest.TestCase):
+    """Test entry maintenance on writes"""
+
+    def test_tool_added_then_deactivated(self):
+        async def scenario():
+            database = await new_database(tools=[{'id': 't1', 'is_active': True,
+                                                  'updated_at': datetime(2025, 1, 2)}])
+            await update_tools(database, ['t1'])
+            self.assertEqual(await entry_ids(database), ['/', '/tool/t1'])
+            self.assertEqual((await database.catalog_versions.find_one({'_id': 'sitemap'}))['version'], 1)
+
+            await database.tools.update_one({'id': 't1'}, {'$set': {'is_active': False}})
+            await update_tools(database, ['t1'])
+            self.assertEqual(await entry_ids(database), ['/'])
+            self.assertEqual((await database.catalog_versions.find_one({'_id': 'sitemap'}))['version'], 2)
+        asyncio.run(scenario())
+
+    def test_pages_left_out_without_a_public_route(self):
+        async def scenario():
+            database = await new_database(pages=[{'id': 'p1', 'slug': 'about', 'is_published': True,
+                                                  'updated_at': datetime(2025, 1, 2)}])
+            with patch.object(sitemap, 'PAGE_PATH', ''):
+                await update_pages(database, ['p1'])
+            self.assertEqual(await entry_ids(database), [])
+        asyncio.run(scenario())
+
+    def test_page_slug_change_and_unpublish(self):
+        async def scenario():
+            database = await new_database(pages=[{'id': 'p1', 'slug': 'about', 'is_published': True,
+                                                  'updated_at': datetime(2025, 1, 2)}])
+            with patch.object(sitemap, 'PAGE_PATH', '/page/{slug}'):
+                await update_pages(database, ['p1'])
+                await database.pages.update_one({'id': 'p1'}, {'$set': {'slug': 'about-us'}})
+                await update_pages(database, ['p1'])
+                self.assertEqual(await entry_ids(database), ['/page/about-us'])
+                await database.pages.update_one({'id': 'p1'}, {'$set': {'is_published': False}})
+                await update_pages(database, ['p1'])
+            self.assertEqual(await entry_ids(database), [])
+        asyncio.run(scenario())
+
+
+class TestCatalogHooks(unittest.TestCase):
+    """Test listener dispatch"""
+
+    def test_failing_listener_does_not_raise(self):
+        calls = []
+
+        async def recorder(database, kind, ids):
+            calls.append((kind, ids))
+
+        async def broken(database, kind, ids):
+            raise RuntimeError('boom')
+
+        original = list(catalog_hooks.CATALOG_LISTENERS)
+        catalog_hooks._resolved.update({'test.broken': broken, 'test.recorder': recorder})
+        catalog_hooks.CATALOG_LISTENERS[:] = ['test.broken', 'test.recorder']
+        try:
+            asyncio.run(catalog_hooks.catalog_changed(None, catalog_hooks.TOOLS, ('a',)))
+        finally:
+            catalog_hooks.CATALOG_LISTENERS[:] = original
+        self.assertEqual(calls, [(catalog_hooks.TOOLS, ['a'])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sitemap_discovery.py (streaming parse and lastmod selection)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import gzip
+import unittest
+import sys
+import os
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+from sitemap_discovery import (SitemapDiscovery, SitemapStreamParser, is_tool_url, name_from_slug,
+                               parse_lastmod, parse_sitemap, select_changed)
+
+SOURCE = 'https://aitoolsdirectory.com'
+
+URLSET = b'''<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://aitoolsdirectory.com/tool/chat-gpt</loc><lastmod>2025-10-20</lastmod></url>
+  <url><loc>https://aitoolsdirectory.com/tool/midjourney</loc><lastmod>2025-10-01T08:30:00Z</lastmod></url>
+  <url><loc>https://aitoolsdirectory.com/about</loc></url>
+</urlset>'''
+
+INDEX = b'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://aitoolsdirectory.com/sitemap-tools-1.xml</loc><lastmod>2025-10-20</lastmod></sitemap>
+  <sitemap><loc>https://aitoolsdirectory.com/sitemap-pages.xml</loc></sitemap>
+</sitemapindex>'''
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestSitemapParsing(unittest.TestCase):
+    """Test urlset/index parsing, streaming and gzip"""
+
+    def test_urlset(self):
+        kind, entries = parse_sitemap(URLSET)
+        self.assertEqual(kind, 'urlset')
+        self.assertEqual([e['loc'] for e in entries][:2], [
+            'https://aitoolsdirectory.com/tool/chat-gpt', 'https://aitoolsdirectory.com/tool/midjourney'])
+        self.assertEqual(entries[1]['lastmod'], utc(2025, 10, 1, 8, 30))
+        self.assertIsNone(entries[2]['lastmod'])
+
+    def test_index(self):
+        kind, entries = parse_sitemap(INDEX)
+        self.assertEqual(kind, 'sitemapindex')
+        self.assertEqual(len(entries), 2)
+
+    def test_byte_by_byte_stream_and_gzip(self):
+        parser = SitemapStreamParser()
+        data = gzip.compress(URLSET)
+        for i in range(0, len(data), 7):
+            parser.feed(data[i:i + 7])
+        self.assertEqual(len(parser.close()), 3)
+
+    def test_lastmod_formats(self):
+        self.assertEqual(parse_lastmod('2025-10-20'), utc(2025, 10, 20))
+        self.assertEqual(parse_lastmod('2025-10-20T10:00:00+02:00'), utc(2025, 10, 20, 8))
+        self.assertIsNone(parse_lastmod('yesterday'))
+
+
+class TestSelection(unittest.TestCase):
+    """Test /tool/ filtering and new-or-changed selection"""
+
+    def test_tool_urls(self):
+        self.assertTrue(is_tool_url('https://aitoolsdirectory.com/tool/chat-gpt', SOURCE))
+        self.assertFalse(is_tool_url('https://aitoolsdirectory.com/tools', SOURCE))
+        self.assertFalse(is_tool_url('https://other.com/tool/chat-gpt', SOURCE))
+
+    def test_name_from_slug(self):
+        self.assertEqual(name_from_slug('https://aitoolsdirectory.com/tool/chat-gpt-4/'), 'Chat Gpt 4')
+
+    def test_select_changed(self):
+        entries = [
+            {'loc': 'new', 'lastmod': utc(2025, 10, 1)},
+            {'loc': 'changed', 'lastmod': utc(2025, 10, 20)},
+            {'loc': 'same', 'lastmod': utc(2025, 10, 5)},
+            {'loc': 'no-lastmod', 'lastmod': None},
+        ]
+        known = {'changed': utc(2025, 10, 10), 'same': utc(2025, 10, 5), 'no-lastmod': None}
+        self.assertEqual([e['loc'] for e in select_changed(entries, known)], ['changed', 'new'])
+        self.assertEqual(len(select_changed(entries, {}, limit=2)), 2)
+
+
+def urlset(*tools):
+    urls = ''.join(f'<url><loc>{SOURCE}/tool/{slug}</loc><lastmod>{lastmod}</lastmod></url>' for slug, lastmod in tools)
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode()
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status = 200 if body is not None else 404
+        self.content = FakeContent(body or b'')
+
+    async def text(self):
+        return self.content.body.decode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serves {url: bytes}; records the order sitemaps were fetched in"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.fetched = []
+
+    def get(self, url, timeout=None):
+        self.fetched.append(url)
+        return FakeResponse(self.documents.get(url))
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestSitemapDiscovery(unittest.TestCase):
+    """Test selection across an index, one sitemap at a time"""
+
+    def test_changed_entries_across_sitemaps(self):
+        documents = {
+            f'{SOURCE}/robots.txt': f'Sitemap: {SOURCE}/index.xml'.encode(),
+            f'{SOURCE}/index.xml': (b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                                    + b''.join(f'<sitemap><loc>{SOURCE}/tools-{i}.xml</loc></sitemap>'.encode()
+                                               for i in (1, 2)) + b'</sitemapindex>'),
+            f'{SOURCE}/tools-1.xml': urlset(('old', '2025-09-01'), ('same', '2025-09-05'), ('edited', '2025-10-03')),
+            f'{SOURCE}/tools-2.xml': urlset(('new', '2025-10-02'), ('newest', '2025-10-04'), ('old', '2025-10-05')),
+        }
+        database = AsyncMongoMockClient()['discovery_test']
+        asyncio.run(database.tools.insert_many([
+            {'website_url': f'{SOURCE}/tool/same', 'source_lastmod': utc(2025, 9, 5)},
+            {'website_url': f'{SOURCE}/tool/edited', 'source_lastmod': utc(2025, 9, 1)},
+        ]))
+        tools = database.tools  # a fresh wrapper on every attribute access; pin one to count calls
+        discovery = SitemapDiscovery(database, SOURCE, session=FakeSession(documents))
+        with patch.object(database, 'tools', tools), patch.object(tools, 'find', wraps=tools.find) as find:
+            changed = asyncio.run(discovery.changed_entries(limit=3))
+        # 'old' is in both sitemaps and keeps its newer lastmod; 'new' falls off the limit
+        self.assertEqual([(entry['loc'].rsplit('/', 1)[-1], entry['lastmod']) for entry in changed],
+                         [('old', utc(2025, 10, 5)), ('newest', utc(2025, 10, 4)), ('edited', utc(2025, 10, 3))])
+        lookups = [len(call.args[0]['website_url']['$in']) for call in find.call_args_list]
+        self.assertEqual(lookups, [3, 3])  # one lookup per sitemap
+        self.assertEqual(discovery.stats['tool_urls'], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
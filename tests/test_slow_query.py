@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for slow_query.py (filter shapes, explain summaries, flagged shapes)
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from slow_query import SlowQueryLog, explain_command, query_shape, shape_of, summarize_explain
+
+
+class TestQueryShape(unittest.TestCase):
+    """Test literal stripping"""
+
+    def test_values_replaced_operators_kept(self):
+        query = {'$or': [{'name': {'$regex': 'gpt', '$options': 'i'}}, {'tags': {'$regex': 'gpt'}}],
+                 'category': 'Chat', 'id': {'$in': ['a', 'b', 'c']}}
+        self.assertEqual(query_shape(query), {
+            '$or': [{'name': {'$regex': '?', '$options': '?'}}, {'tags': {'$regex': '?'}}],
+            'category': '?',
+            'id': {'$in': ['?']},
+        })
+
+    def test_same_shape_for_different_values(self):
+        first = shape_of('find', {'find': 'tools', 'filter': {'id': 'a'}, 'sort': {'created_at': -1}})
+        second = shape_of('find', {'find': 'tools', 'filter': {'id': 'b'}, 'sort': {'created_at': -1}})
+        self.assertEqual(first, second)
+        self.assertEqual(first['sort'], {'created_at': -1})
+
+    def test_write_and_unshaped_commands(self):
+        update = {'update': 'tools', 'updates': [{'q': {'id': 'x'}, 'u': {'$set': {'a': 1}}}]}
+        self.assertEqual(shape_of('update', update), {'filter': {'id': '?'}})
+        self.assertIsNone(shape_of('insert', {'insert': 'tools', 'documents': []}))
+
+
+class TestExplain(unittest.TestCase):
+    """Test explain bodies and plan summaries"""
+
+    def test_explain_command_keeps_query_fields_only(self):
+        command = {'find': 'tools', 'filter': {'slug': 'x'}, 'limit': 1, 'lsid': {'id': 1}, '$db': 'app'}
+        self.assertEqual(explain_command('find', command), {
+            'explain': {'find': 'tools', 'filter': {'slug': 'x'}, 'limit': 1},
+            'verbosity': 'executionStats',
+        })
+        self.assertIsNone(explain_command('update', {'update': 'tools'}))
+        self.assertIsNone(explain_command('aggregate', {'aggregate': 'tools', 'pipeline': [{'$out': 'copy'}]}))
+
+    def test_collscan_summary(self):
+        summary = summarize_explain({
+            'queryPlanner': {'winningPlan': {'stage': 'LIMIT', 'inputStage': {'stage': 'COLLSCAN'}}},
+            'executionStats': {'nReturned': 1, 'totalDocsExamined': 5000, 'totalKeysExamined': 0},
+        })
+        self.assertTrue(summary['collscan'])
+        self.assertEqual(summary['stages'], ['LIMIT', 'COLLSCAN'])
+        self.assertEqual(summary['examined_per_returned'], 5000.0)
+        self.assertIsNone(summary['index'])
+
+    def test_aggregate_index_summary(self):
+        summary = summarize_explain({'stages': [{'$cursor': {
+            'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'id_1'}}},
+            'executionStats': {'nReturned': 3, 'totalDocsExamined': 3, 'totalKeysExamined': 3},
+        }}]})
+        self.assertFalse(summary['collscan'])
+        self.assertEqual(summary['index'], 'id_1')
+        self.assertEqual(summary['examined_per_returned'], 1.0)
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    """Test thresholding and aggregation per shape"""
+
+    def test_fast_commands_ignored(self):
+        log = SlowQueryLog(threshold_ms=100)
+        self.assertIsNone(log.record('app', 'tools', 'find', {'find': 'tools', 'filter': {}}, 5))
+        self.assertEqual(log.report()['shapes'], [])
+
+    def test_shapes_aggregate(self):
+        log = SlowQueryLog(threshold_ms=10)
+        for tool_id, ms in (('a', 20), ('b', 40)):
+            log.record('app', 'tools', 'find', {'find': 'tools', 'filter': {'id': tool_id}}, ms)
+        log.record('app', 'pages', 'find', {'find': 'pages', 'filter': {'slug': 'x'}}, 15)
+        report = log.report()
+        self.assertEqual(len(report['shapes']), 2)
+        top = report['shapes'][0]
+        self.assertEqual((top['collection'], top['count'], top['max_ms'], top['avg_ms']), ('tools', 2, 40, 30))
+        self.assertNotIn('sample', top)
+        self.assertEqual(len(log.due_for_explain()), 2)
+
+    def test_shape_limit(self):
+        log = SlowQueryLog(threshold_ms=0, max_shapes=1)
+        log.record('app', 'tools', 'find', {'find': 'tools', 'filter': {'id': 'a'}}, 1)
+        log.record('app', 'tools', 'find', {'find': 'tools', 'filter': {'slug': 'a'}}, 1)
+        self.assertEqual(log.report()['dropped_shapes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
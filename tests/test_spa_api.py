@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Unit tests for spa_api.py (tool records from captured JSON responses)
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from spa_api import extract_tool_records, merge_tool_records
+
+BASE = 'https://aitoolsdirectory.com'
+
+
+class TestSpaApi(unittest.TestCase):
+    """Test parsing tool records out of arbitrary API payloads"""
+
+    def test_nested_records_with_slug(self):
+        payload = {'data': {'items': [
+            {'name': 'Alpha', 'slug': 'alpha', 'logo': {'url': '/img/alpha.png'}, 'tags': [{'name': 'Chat'}]},
+            {'name': 'Beta', 'slug': 'beta', 'tags': ['Video', '']},
+        ]}}
+        tools = extract_tool_records(payload, BASE)
+        self.assertEqual([t['name'] for t in tools], ['Alpha', 'Beta'])
+        self.assertEqual(tools[0]['website_url'], f'{BASE}/tool/alpha')
+        self.assertEqual(tools[0]['image_url'], f'{BASE}/img/alpha.png')
+        self.assertEqual(tools[0]['tags'], ['Chat'])
+        self.assertEqual(tools[1]['tags'], ['Video'])
+
+    def test_link_with_tool_path_wins_over_slug(self):
+        payload = [{'title': 'Gamma', 'url': '/tool/gamma-ai', 'slug': 'ignored'}]
+        tools = extract_tool_records(payload, BASE)
+        self.assertEqual(tools[0]['website_url'], f'{BASE}/tool/gamma-ai')
+
+    def test_non_tool_objects_are_ignored(self):
+        payload = {'site': {'name': 'AI Tools Directory', 'url': BASE}, 'meta': {'total': 2}}
+        self.assertEqual(extract_tool_records(payload, BASE), [])
+
+    def test_merge_deduplicates_across_payloads(self):
+        page1 = {'results': [{'name': 'Alpha', 'slug': 'alpha'}]}
+        page2 = {'results': [{'name': 'Alpha', 'slug': 'alpha'}, {'name': 'Delta', 'slug': 'delta'}]}
+        tools = merge_tool_records([page1, page2], BASE)
+        self.assertEqual([t['name'] for t in tools], ['Alpha', 'Delta'])
+
+
+if __name__ == "__main__":
+    unittest.main()
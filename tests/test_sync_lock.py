@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sync_lock.py (lease lock and single-flight syncs)
+Runs against mongomock-motor (pip install mongomock-motor)
+"""
+import asyncio
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+try:
+    from mongomock_motor import AsyncMongoMockClient
+except ImportError:
+    AsyncMongoMockClient = None
+
+import sync_lock
+from sync_lock import LeaseLock, LeaseLost, SingleFlight
+
+
+def new_database():
+    return AsyncMongoMockClient()['lock_test']
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestLeaseLock(unittest.TestCase):
+    """Test taking, refusing and expiring the lease"""
+
+    def test_one_holder_at_a_time(self):
+        async def scenario():
+            database = new_database()
+            first, second = LeaseLock(database, 'sync'), LeaseLock(database, 'sync')
+            self.assertTrue(await first.acquire())
+            self.assertFalse(await second.acquire())
+            await first.release(result=3)
+            await asyncio.sleep(0.01)  # expires_at is stored at millisecond precision
+            self.assertTrue(await second.acquire())
+            await second.release()
+        asyncio.run(scenario())
+
+    def test_expired_lease_is_taken_over(self):
+        async def scenario():
+            database = new_database()
+            crashed, other = LeaseLock(database, 'sync', ttl_seconds=-1), LeaseLock(database, 'sync')
+            self.assertTrue(await crashed.acquire())
+            crashed._heartbeat.cancel()  # the process died
+            self.assertTrue(await other.acquire())
+            self.assertEqual((await other.holder())['owner'], other.owner)
+            await other.release()
+        asyncio.run(scenario())
+
+
+@unittest.skipUnless(AsyncMongoMockClient, 'mongomock-motor is not installed')
+class TestSingleFlight(unittest.TestCase):
+    """Test attaching to a running sync and stopping on a lost lease"""
+
+    def setUp(self):
+        self.patch = patch.object(sync_lock, 'HEARTBEAT_SECONDS', 0.05)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_second_trigger_attaches(self):
+        calls = []
+
+        async def sync():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return 5
+
+        async def scenario():
+            flight = SingleFlight('sync')
+            database = new_database()
+            return await asyncio.gather(flight.run(database, sync), flight.run(database, sync))
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((first['tools_added'], first['attached']), (5, False))
+        self.assertEqual((second['tools_added'], second['attached']), (5, True))
+
+    def test_lost_lease_cancels_sync(self):
+        stopped = []
+
+        async def sync():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                stopped.append(True)
+                raise
+            return 1
+
+        async def scenario():
+            database = new_database()
+            run = asyncio.create_task(SingleFlight('sync').run(database, sync))
+            await asyncio.sleep(0.01)
+            # Another replica took over the lease (e.g. after a long GC pause)
+            await database.locks.update_one({'_id': 'sync'}, {'$set': {'owner': 'other'}})
+            with self.assertRaises(LeaseLost):
+                await asyncio.wait_for(run, 1)
+            self.assertEqual((await database.locks.find_one({'_id': 'sync'}))['owner'], 'other')
+
+        asyncio.run(scenario())
+        self.assertEqual(stopped, [True])
+
+
+    def test_cancel_releases_lease(self):
+        async def sync():
+            await asyncio.sleep(5)
+
+        async def scenario():
+            database = new_database()
+            flight = SingleFlight('sync')
+            trigger = asyncio.create_task(flight.run(database, sync))
+            await asyncio.sleep(0.01)
+            trigger.cancel()  # the caller goes away; the shielded sync keeps running...
+            await asyncio.sleep(0.01)
+            self.assertTrue(flight.running)
+            await flight.cancel()  # ...until shutdown stops it
+            self.assertFalse(flight.running)
+            return await database.locks.find_one({'_id': 'sync'})
+
+        lock = asyncio.run(scenario())
+        self.assertEqual((lock['status'], lock['error']), ('finished', 'cancelled'))
+
+
+if __name__ == '__main__':
+    unittest.main()
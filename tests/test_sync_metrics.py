@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Unit tests for sync_metrics.py (phase spans and percentiles)
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sync_metrics import SyncMetrics, percentile
+
+
+class TestPercentile(unittest.TestCase):
+    """Test interpolated percentiles"""
+
+    def test_percentiles(self):
+        values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(percentile(values, 50), 5.5)
+        self.assertAlmostEqual(percentile(values, 95), 9.55)
+        self.assertEqual(percentile([3], 95), 3)
+
+
+class TestSyncMetrics(unittest.TestCase):
+    """Test span aggregation and the stored report"""
+
+    def test_phases_aggregate_samples(self):
+        metrics = SyncMetrics()
+        for seconds in (1.0, 2.0, 3.0):
+            metrics.record('detail_page', seconds)
+        metrics.record('db_save', 0.01)
+        phases = metrics.phases()
+        self.assertEqual(phases['detail_page']['count'], 3)
+        self.assertEqual(phases['detail_page']['p50_s'], 2.0)
+        self.assertEqual(phases['detail_page']['total_s'], 6.0)
+        self.assertEqual(phases['db_save']['max_s'], 0.01)
+        self.assertTrue(metrics.summary().strip().startswith('detail_page'))
+
+    def test_span_counts_failures(self):
+        metrics = SyncMetrics()
+        with self.assertRaises(ValueError):
+            with metrics.span('navigation'):
+                raise ValueError('timeout')
+        with metrics.span('navigation'):
+            pass
+        self.assertEqual(metrics.phases()['navigation']['count'], 2)
+        self.assertEqual(metrics.phases()['navigation']['errors'], 1)
+
+    def test_report_tracks_chromium_peak(self):
+        readings = iter([300.0, 500.0, 200.0])
+        metrics = SyncMetrics(chromium_probe=lambda: next(readings))
+        metrics.sample_memory()
+        metrics.sample_memory()
+        report = metrics.report()
+        self.assertEqual(report['peak_chromium_mb'], 500.0)
+        self.assertIn('peak_rss_mb', report)
+        self.assertIn('phases', report)
+
+
+if __name__ == "__main__":
+    unittest.main()
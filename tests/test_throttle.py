@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for throttle.py (adaptive per-host rate control)
+"""
+import asyncio
+import unittest
+import sys
+import os
+import time
+from datetime import datetime, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from throttle import AdaptiveThrottle, HostThrottle, parse_retry_after
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    """Test both Retry-After formats"""
+
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+
+    def test_http_date(self):
+        now = datetime(2025, 10, 22, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(parse_retry_after('Wed, 22 Oct 2025 12:00:30 GMT', now), 30.0)
+
+    def test_invalid_and_capped(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertEqual(parse_retry_after('999999'), 600)
+
+
+class TestHostThrottle(unittest.TestCase):
+    """Test speed-up, back-off and Retry-After handling"""
+
+    def test_speeds_up_while_healthy(self):
+        throttle = HostThrottle('example.com', 3, min_delay=1)
+        for _ in range(20):
+            throttle.record(200, 0.2)
+        self.assertEqual(throttle.delay, 1)
+
+    def test_backs_off_on_errors(self):
+        throttle = HostThrottle('example.com', 2, max_delay=10)
+        throttle.record(500, 0.2)
+        self.assertEqual(throttle.delay, 4)
+        throttle.record(None, None)
+        throttle.record(502, 0.2)
+        self.assertEqual(throttle.delay, 10)
+        self.assertEqual(throttle.report()['backoffs'], 3)
+
+    def test_backs_off_when_latency_rises(self):
+        throttle = HostThrottle('example.com', 2)
+        throttle.record(200, 0.1)
+        before = throttle.delay
+        for _ in range(5):
+            throttle.record(200, 2.0)
+        self.assertGreater(throttle.delay, before)
+
+    def test_recovers_after_latency_level_shift(self):
+        throttle = HostThrottle('example.com', 2, min_delay=1, max_delay=60)
+        for _ in range(10):
+            throttle.record(200, 0.1)
+        for _ in range(30):
+            throttle.record(200, 2.0)  # the host is now permanently slower
+        backoffs, delay = throttle.backoffs, throttle.delay
+        for _ in range(20):
+            throttle.record(200, 2.0)
+        self.assertEqual(throttle.backoffs, backoffs)  # the new level counts as normal...
+        self.assertEqual(throttle.delay, delay - 20 * 0.25)  # ...and the rate climbs back
+
+    def test_honors_retry_after(self):
+        throttle = HostThrottle('example.com', 1)
+        throttle.record(429, 0.1, retry_after='30')
+        self.assertGreaterEqual(throttle.delay, 30)
+        self.assertGreater(throttle.next_allowed - time.monotonic(), 25)
+        self.assertEqual(throttle.report()['retry_after_waits'], 1)
+
+    def test_wait_spaces_requests(self):
+        throttle = HostThrottle('example.com', 0.05, min_delay=0.05)
+
+        async def two_requests():
+            started = time.monotonic()
+            await throttle.wait()
+            await throttle.wait()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(two_requests()), 0.04)
+
+
+class TestAdaptiveThrottle(unittest.TestCase):
+    """Test per-host bookkeeping"""
+
+    def test_hosts_are_independent(self):
+        throttle = AdaptiveThrottle(2)
+        throttle.record('https://a.example/tool/x', 429, 0.1)
+        throttle.record('https://b.example/tool/y', 200, 0.1)
+        report = {r['host']: r for r in throttle.report()}
+        self.assertEqual(report['a.example']['delay_s'], 4)
+        self.assertEqual(report['b.example']['delay_s'], 1.75)
+        self.assertIn('a.example', throttle.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()